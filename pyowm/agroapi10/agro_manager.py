@@ -2,10 +2,14 @@
 Programmatic interface to OWM Agro API endpoints
 """
 
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pyowm.constants import AGRO_API_VERSION
 from pyowm.commons.http_client import HttpClient
 from pyowm.commons.databoxes import ImageType
-from pyowm.commons.image import Image
+from pyowm.commons.enums import ImageTypeEnum
+from pyowm.commons.image import Image, FileImage
 from pyowm.commons.tile import Tile
 from pyowm.agroapi10.uris import POLYGONS_URI, NAMED_POLYGON_URI, SOIL_URI, SATELLITE_IMAGERY_SEARCH_URI
 from pyowm.agroapi10.enums import PresetEnum, PaletteEnum
@@ -23,15 +27,19 @@ class AgroManager(object):
 
     :param API_key: the OWM Weather API key
     :type API_key: str
+    :param image_cache: optional cache of the downloaded satellite images: images found in the cache are not
+        downloaded again
+    :type image_cache: `pyowm.caches.imagecache.DiskImageCache` or `None`
     :returns: an `AgroManager` instance
     :raises: `AssertionError` when no API Key is provided
 
     """
 
-    def __init__(self, API_key):
+    def __init__(self, API_key, image_cache=None):
         assert API_key is not None, 'You must provide a valid API Key'
         self.API_key = API_key
         self.http_client = HttpClient()
+        self.image_cache = image_cache
 
     def agro_api_version(self):
         return AGRO_API_VERSION
@@ -155,7 +163,8 @@ class AgroManager(object):
 
     def search_satellite_imagery(self, polygon_id, acquired_from, acquired_to, img_type=None, preset=None,
                                  min_resolution=None, max_resolution=None, acquired_by=None, min_cloud_coverage=None,
-                                 max_cloud_coverage=None, min_valid_data_coverage=None, max_valid_data_coverage=None):
+                                 max_cloud_coverage=None, min_valid_data_coverage=None, max_valid_data_coverage=None,
+                                 as_result_set=False):
         """
         Searches on the Agro API the metadata for all available satellite images that contain the specified polygon and
         acquired during the specified time interval; and optionally matching the specified set of filters:
@@ -190,7 +199,11 @@ class AgroManager(object):
         :type min_valid_data_coverage: int
         :param max_valid_data_coverage: maximum valid data coverage percentage on acquired images
         :type max_valid_data_coverage: int
-        :return: a list of `pyowm.agro10.imagery.MetaImage` subtypes instances
+        :param as_result_set: if `True`, the whole indexed result set of the search is returned, so that it can be
+            queried locally many times: in this case image type and preset must be filtered on the result set
+        :type as_result_set: bool
+        :return: a list of `pyowm.agro10.imagery.MetaImage` subtypes instances, or a
+            `pyowm.agroapi10.search.SatelliteImagerySearchResultSet` instance if `as_result_set` is `True`
         """
         assert polygon_id is not None
         assert acquired_from is not None
@@ -214,6 +227,8 @@ class AgroManager(object):
             assert max_valid_data_coverage >= 0, 'Maximum valid data coverage must be non negative'
         if min_valid_data_coverage is not None and max_valid_data_coverage is not None:
             assert min_valid_data_coverage <= max_valid_data_coverage, 'Minimum valid data coverage must be lower than maximum valid data coverage'
+        if as_result_set:
+            assert img_type is None and preset is None, 'Image type and preset must be filtered on the result set'
 
         # prepare params
         params = dict(appid=self.API_key, polyid=polygon_id, start=acquired_from, end=acquired_to)
@@ -236,6 +251,8 @@ class AgroManager(object):
         status, data = self.http_client.get_json(SATELLITE_IMAGERY_SEARCH_URI, params=params)
 
         result_set = SatelliteImagerySearchResultSet(polygon_id, data, timeutils.now(timeformat='unix'))
+        if as_result_set:
+            return result_set
 
         # further filter by img_type and/or preset (if specified)
         if img_type is not None and preset is not None:
@@ -247,12 +264,16 @@ class AgroManager(object):
         else:
             return result_set.all()
 
-    def download_satellite_image(self, metaimage, x=None, y=None, zoom=None, palette=None):
+    def download_satellite_image(self, metaimage, x=None, y=None, zoom=None, palette=None, path_to_file=None):
         """
         Downloads the satellite image described by the provided metadata. In case the satellite image is a tile, then
         tile coordinates and zoom must be provided. An optional palette ID can be provided, if supported by the
         downloaded preset (currently only NDVI is supported)
 
+        If a target file is provided, the image data is streamed to it instead of being held in memory and the returned
+        image is a `pyowm.commons.image.FileImage` backed by that file: this is the way to go for large GeoTIFF images.
+        In case the download is interrupted, downloading again to the same file resumes it.
+
         :param metaimage: the satellite image's metadata, in the form of a `MetaImage` subtype instance
         :type metaimage: a `pyowm.agroapi10.imagery.MetaImage` subtype
         :param x: x tile coordinate (only needed in case you are downloading a tile image)
@@ -263,6 +284,8 @@ class AgroManager(object):
         :type zoom: int or `None`
         :param palette: ID of the color palette of the downloaded images. Values are provided by `pyowm.agroapi10.enums.PaletteEnum`
         :type palette: str or `None`
+        :param path_to_file: path to the file where the image data is downloaded to, if any
+        :type path_to_file: str or `None`
         :return: a `pyowm.agroapi10.imagery.SatelliteImage` instance containing both image's metadata and data
         """
         if palette is not None:
@@ -274,16 +297,12 @@ class AgroManager(object):
         # polygon PNG
         if isinstance(metaimage, MetaPNGImage):
             prepared_url = metaimage.url
-            status, data = self.http_client.get_png(
-                prepared_url, params=params)
-            img = Image(data, metaimage.image_type)
+            img = self._download_image(prepared_url, params, metaimage.image_type, path_to_file)
             return SatelliteImage(metaimage, img, downloaded_on=timeutils.now(timeformat='unix'), palette=palette)
         # GeoTIF
         elif isinstance(metaimage, MetaGeoTiffImage):
             prepared_url = metaimage.url
-            status, data = self.http_client.get_geotiff(
-                prepared_url, params=params)
-            img = Image(data, metaimage.image_type)
+            img = self._download_image(prepared_url, params, metaimage.image_type, path_to_file)
             return SatelliteImage(metaimage, img, downloaded_on=timeutils.now(timeformat='unix'), palette=palette)
         # tile PNG
         elif isinstance(metaimage, MetaTile):
@@ -291,14 +310,100 @@ class AgroManager(object):
             assert y is not None
             assert zoom is not None
             prepared_url = self._fill_url(metaimage.url, x, y, zoom)
-            status, data = self.http_client.get_png(
-                prepared_url, params=params)
-            img = Image(data, metaimage.image_type)
+            img = self._download_image(prepared_url, params, metaimage.image_type, path_to_file)
             tile = Tile(x, y, zoom, None, img)
             return SatelliteImage(metaimage, tile, downloaded_on=timeutils.now(timeformat='unix'), palette=palette)
         else:
             raise ValueError("Cannot download: unsupported MetaImage subtype")
 
+    def _download_image(self, url, params, image_type, path_to_file=None):
+        cache_key = None
+        if self.image_cache is not None:
+            cache_key = self.image_cache.key_for(url, params)
+        if path_to_file is None:
+            data = None if cache_key is None else self.image_cache.get(cache_key)
+            if data is None:
+                if image_type == ImageTypeEnum.GEOTIFF:
+                    status, data = self.http_client.get_geotiff(url, params=params)
+                else:
+                    status, data = self.http_client.get_png(url, params=params)
+                if cache_key is not None:
+                    self.image_cache.set(cache_key, data)
+            return Image(data, image_type)
+        if cache_key is None or not self.image_cache.get_to_file(cache_key, path_to_file):
+            if image_type == ImageTypeEnum.GEOTIFF:
+                self.http_client.get_geotiff_to_file(url, path_to_file, params=params)
+            else:
+                self.http_client.get_png_to_file(url, path_to_file, params=params)
+            if cache_key is not None:
+                self.image_cache.set_from_file(cache_key, path_to_file)
+        return FileImage(path_to_file, image_type)
+
+    def download_satellite_tiles(self, metatile, area, zooms, palette=None, max_workers=4, target_dir=None):
+        """
+        Downloads all of the tiles of the satellite image described by the provided metadata that cover the specified
+        area, at each one of the specified zoom levels. Tiles are downloaded concurrently by a bounded pool of worker
+        threads and are yielded as soon as they are available - zoom level by zoom level, row by row - so that only a
+        bounded number of them is held in memory. Optionally, tiles are also saved to disk into the specified
+        directory, as `<target_dir>/<zoom>/<x>/<y>.png` files.
+
+        The tiles covering an area are the ones covering its bounding box, whose corners are turned into tile
+        coordinates with `pyowm.commons.tile.Tile.geoocoords_to_tile_coords`.
+
+        :param metatile: the satellite image's metadata
+        :type metatile: `pyowm.agroapi10.imagery.MetaTile` instance
+        :param area: the area to be covered: either a polygon or a tuple with (lon_left, lat_bottom, lon_right,
+            lat_top) bounding box coordinates
+        :type area: `pyowm.agroapi10.polygon.Polygon`, `pyowm.utils.geo.Polygon` or tuple
+        :param zooms: the zoom levels
+        :type zooms: int or iterable of int (eg: `range(15, 18)`)
+        :param palette: ID of the color palette of the downloaded images. Values are provided by `pyowm.agroapi10.enums.PaletteEnum`
+        :type palette: str or `None`
+        :param max_workers: max number of tiles being downloaded at the same time. Defaults to 4
+        :type max_workers: int
+        :param target_dir: optional path to the directory where tiles are saved
+        :type target_dir: str or `None`
+        :return: a generator of `pyowm.agroapi10.imagery.SatelliteImage` instances
+        """
+        assert isinstance(metatile, MetaTile), 'Only tiles can be downloaded in bulk'
+        assert isinstance(max_workers, int) and max_workers > 0
+        if isinstance(zooms, int):
+            zooms = [zooms]
+        bbox = self._bbox_of(area)
+        tile_coords = [(x, y, zoom) for zoom in zooms for x, y in Tile.tile_coords_for_bbox(*bbox, zoom=zoom)]
+        return self._download_satellite_tiles(metatile, tile_coords, palette, max_workers, target_dir)
+
+    def _download_satellite_tiles(self, metatile, tile_coords, palette, max_workers, target_dir):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # keep at most two tiles per worker in memory
+            pending = deque()
+            for x, y, zoom in tile_coords:
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(self._download_satellite_tile, metatile, x, y, zoom, palette,
+                                               target_dir))
+            while pending:
+                yield pending.popleft().result()
+
+    def _download_satellite_tile(self, metatile, x, y, zoom, palette, target_dir):
+        sat_img = self.download_satellite_image(metatile, x=x, y=y, zoom=zoom, palette=palette)
+        if target_dir is not None:
+            tile_dir = os.path.join(target_dir, str(zoom), str(x))
+            os.makedirs(tile_dir, exist_ok=True)
+            sat_img.persist(os.path.join(tile_dir, '%s.png' % y))
+        return sat_img
+
+    def _bbox_of(self, area):
+        if isinstance(area, Polygon):
+            area = area.geopolygon
+        if isinstance(area, GeoPolygon):
+            points = area.points
+            lons = [p.lon for p in points]
+            lats = [p.lat for p in points]
+            return min(lons), min(lats), max(lons), max(lats)
+        assert len(area) == 4, 'Bounding boxes must have 4 coordinates'
+        return tuple(area)
+
     def stats_for_satellite_image(self, metaimage):
         """
         Retrieves statistics for the satellite image described by the provided metadata.
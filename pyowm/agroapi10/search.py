@@ -1,3 +1,5 @@
+import heapq
+from bisect import bisect_left, bisect_right
 from pyowm.utils import timeformatutils
 from pyowm.agroapi10.imagery import MetaPNGImage, MetaTile, MetaGeoTiffImage
 from pyowm.agroapi10.enums import PresetEnum
@@ -9,6 +11,10 @@ class SatelliteImagerySearchResultSet:
     Class representing a filterable result set by a satellite imagery search against the Agro API 1.0. Each result
     is a `pyowm.agroapi10.imagery.MetaImage` subtype instance
 
+    Results are indexed upon instantiation by preset, image type, satellite, acquisition time and cloud coverage, so
+    that they can be queried many times without scanning all of them at each query. Besides the `with_*` methods,
+    composable queries are supported: see `pyowm.agroapi10.search.SatelliteImageryQuery`
+
     """
 
     def __init__(self, polygon_id, list_of_dict, query_timestamp):
@@ -131,6 +137,24 @@ class SatelliteImagerySearchResultSet:
                                      acquisition_time, valid_data_percentage, cloud_coverage_percentage,
                                      sun_azimuth, sun_elevation, polygon_id=polygon_id, stats_url=stats_url_for_evi))
         self.metaimages = result
+        self._build_indexes()
+
+    def _build_indexes(self):
+        # indexes hold the positions of results in self.metaimages: keyed ones list them in ascending order, while
+        # sorted ones list them along with their sort keys
+        self._by_preset = dict()
+        self._by_img_type = dict()
+        self._by_satellite = dict()
+        for position, metaimage in enumerate(self.metaimages):
+            self._by_preset.setdefault(metaimage.preset, []).append(position)
+            self._by_img_type.setdefault(metaimage.image_type.name, []).append(position)
+            self._by_satellite.setdefault(metaimage.satellite_name, []).append(position)
+        by_time = sorted(range(len(self.metaimages)), key=lambda i: self.metaimages[i].acquisition_time())
+        self._acquisition_times = [self.metaimages[i].acquisition_time() for i in by_time]
+        self._positions_by_acquisition_time = by_time
+        by_clouds = sorted(range(len(self.metaimages)), key=lambda i: self.metaimages[i].cloud_coverage_percentage)
+        self._cloud_coverages = [self.metaimages[i].cloud_coverage_percentage for i in by_clouds]
+        self._positions_by_cloud_coverage = by_clouds
 
     def issued_on(self, timeformat='unix'):
         """Returns the UTC time telling when the query was performed against the OWM Agro API
@@ -173,7 +197,7 @@ class SatelliteImagerySearchResultSet:
 
         """
         assert isinstance(image_type, ImageType)
-        return list(filter(lambda x: x.image_type == image_type, self.metaimages))
+        return self.query().with_img_type(image_type).all()
 
     def with_preset(self, preset):
         """
@@ -186,7 +210,7 @@ class SatelliteImagerySearchResultSet:
 
         """
         assert isinstance(preset, str)
-        return list(filter(lambda x: x.preset == preset, self.metaimages))
+        return self.query().with_preset(preset).all()
 
     def with_img_type_and_preset(self, image_type, preset):
         """
@@ -203,4 +227,160 @@ class SatelliteImagerySearchResultSet:
         """
         assert isinstance(image_type, ImageType)
         assert isinstance(preset, str)
-        return list(filter(lambda x: x.image_type == image_type and x.preset == preset, self.metaimages))
+        return self.query().with_img_type(image_type).with_preset(preset).all()
+
+    def query(self):
+        """
+        Returns a query selecting all of the search results, to be narrowed down by chaining filters, eg:
+
+            result_set.query().with_preset(PresetEnum.NDVI).acquired_between(start, end).max_clouds(10)
+
+        Filters on satellite, acquisition time, cloud coverage and valid data coverage are only available on queries.
+
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        return SatelliteImageryQuery(self)
+
+
+class SatelliteImageryQuery:
+    """
+    Class representing a selection of the results of a `pyowm.agroapi10.search.SatelliteImagerySearchResultSet`,
+    which can be narrowed down further by chaining filters: each filter returns a new query and leaves the original one
+    unchanged. Filters are run against the indexes of the result set.
+
+    Selected results are returned in the same order as in the result set, unless the query was ranked with
+    `best_n_by_valid_data`: then they are sorted by decreasing valid data coverage percentage.
+
+    :param result_set: the result set to be queried
+    :type result_set: `pyowm.agroapi10.search.SatelliteImagerySearchResultSet`
+    :param positions: positions of the selected results in the result set, or `None` for all of them
+    :type positions: list or `None`
+    :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+    """
+
+    def __init__(self, result_set, positions=None):
+        assert isinstance(result_set, SatelliteImagerySearchResultSet)
+        self.result_set = result_set
+        self._positions = positions
+
+    def _narrow(self, positions):
+        # intersects the current selection with the specified positions, which must be in ascending order
+        if self._positions is None:
+            return SatelliteImageryQuery(self.result_set, list(positions))
+        if len(positions) == len(self.result_set):
+            return SatelliteImageryQuery(self.result_set, self._positions)
+        selected = set(positions)
+        return SatelliteImageryQuery(self.result_set, [p for p in self._positions if p in selected])
+
+    def with_img_type(self, image_type):
+        """
+        Selects the results having the specified image type
+
+        :param image_type: the desired image type (valid values are provided by the
+            `pyowm.commons.enums.ImageTypeEnum` enum)
+        :type image_type: `pyowm.commons.databoxes.ImageType` instance
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        assert isinstance(image_type, ImageType)
+        return self._narrow(self.result_set._by_img_type.get(image_type.name, []))
+
+    def with_preset(self, preset):
+        """
+        Selects the results having the specified preset
+
+        :param preset: the desired image preset (valid values are provided by the
+            `pyowm.agroapi10.enums.PresetEnum` enum)
+        :type preset: str
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        assert isinstance(preset, str)
+        return self._narrow(self.result_set._by_preset.get(preset, []))
+
+    def with_satellite(self, satellite_name):
+        """
+        Selects the results acquired by the specified satellite
+
+        :param satellite_name: the satellite name, as given by the Agro API (eg: "Landsat 8")
+        :type satellite_name: str
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        assert isinstance(satellite_name, str)
+        return self._narrow(self.result_set._by_satellite.get(satellite_name, []))
+
+    def acquired_between(self, start, end):
+        """
+        Selects the results acquired in the specified time window
+
+        :param start: lower edge of the time window (inclusive), as a UNIX timestamp, a `datetime.datetime` object or
+            an ISO8601-formatted string
+        :type start: int, `datetime.datetime` or str
+        :param end: upper edge of the time window (inclusive), in the same formats as *start*
+        :type end: int, `datetime.datetime` or str
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        start = timeformatutils.to_UNIXtime(start)
+        end = timeformatutils.to_UNIXtime(end)
+        assert start <= end, 'Start of the time window must come before its end'
+        times = self.result_set._acquisition_times
+        lo = bisect_left(times, start)
+        hi = bisect_right(times, end)
+        return self._narrow(sorted(self.result_set._positions_by_acquisition_time[lo:hi]))
+
+    def max_clouds(self, max_cloud_coverage):
+        """
+        Selects the results having at most the specified cloud coverage percentage
+
+        :param max_cloud_coverage: the maximum cloud coverage percentage (inclusive)
+        :type max_cloud_coverage: int or float
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        assert max_cloud_coverage >= 0, 'Maximum cloud coverage must be non negative'
+        hi = bisect_right(self.result_set._cloud_coverages, max_cloud_coverage)
+        return self._narrow(sorted(self.result_set._positions_by_cloud_coverage[:hi]))
+
+    def best_n_by_valid_data(self, n):
+        """
+        Selects the *n* results having the highest valid data coverage percentage among the selected ones, sorted by
+        decreasing valid data coverage percentage. Ties are broken by order in the result set.
+
+        :param n: the max number of results to be selected
+        :type n: int
+        :returns: a `pyowm.agroapi10.search.SatelliteImageryQuery` instance
+
+        """
+        assert isinstance(n, int) and n >= 0, 'n must be a non negative int'
+        metaimages = self.result_set.metaimages
+        positions = range(len(metaimages)) if self._positions is None else self._positions
+        best = heapq.nlargest(n, positions, key=lambda p: metaimages[p].valid_data_percentage)
+        return SatelliteImageryQuery(self.result_set, best)
+
+    def all(self):
+        """
+        Returns the selected results
+
+        :returns: a list of `pyowm.agroapi10.imagery.MetaImage` instances
+
+        """
+        metaimages = self.result_set.metaimages
+        if self._positions is None:
+            return list(metaimages)
+        return [metaimages[p] for p in self._positions]
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __len__(self):
+        if self._positions is None:
+            return len(self.result_set)
+        return len(self._positions)
+
+    def __repr__(self):
+        return '<%s.%s - %s results selected out of %s>' % (
+            __name__, self.__class__.__name__, len(self), len(self.result_set))
@@ -0,0 +1,278 @@
+"""
+Module containing an on-disk cache for satellite images and map tiles
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+class DiskImageCache(object):
+    """
+    On-disk cache of image data, bounded by the total size in bytes of the
+    cached images. Images are stored as files named after the SHA-256 digest
+    of the request which originated them (see `key_for`), so that the same
+    request always maps to the same file.
+
+    The cache is meant for immutable images (eg: satellite images and map
+    tiles), so cached items never expire: when the cache grows bigger than its
+    max size the least recently used images are evicted. Recency survives
+    restarts, as it is tracked through the modification time of the files.
+
+    Writes are atomic - images are written to temporary files which are then
+    renamed - so that concurrent readers, in the same process or not, never
+    read partially written images; images evicted while being looked up are
+    cache misses.
+
+    :param cache_dir: path to the directory holding the cached images, which
+        is created if missing
+    :type cache_dir: str
+    :param max_size: max total size in bytes of the cached images. Defaults
+        to 512 MB
+    :type max_size: int
+    :returns: a new *DiskImageCache* instance
+
+    """
+
+    _CACHE_MAX_SIZE = 512 * 1024 * 1024  # bytes
+    _TEMP_PREFIX = '.tmp-'
+    _IGNORED_PARAMS = ('appid',)  # params not affecting the returned images
+
+    def __init__(self, cache_dir, max_size=_CACHE_MAX_SIZE):
+        assert cache_dir is not None
+        assert isinstance(max_size, int) and max_size > 0, \
+            "wrong cache init parameters"
+        self.cache_dir = cache_dir
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._usage_recency = OrderedDict()  # key: size, least recent first
+        self._size = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def key_for(cls, url, params=None):
+        """
+        Returns the cache key of the request for the specified URL and query
+        parameters. The request is normalised beforehand: scheme and host are
+        lowercased, query parameters are sorted and the API key is dropped, so
+        that requests for the same image share the same key.
+
+        :param url: the URL of the request
+        :type url: str
+        :param params: the query parameters of the request, if any
+        :type params: dict or `None`
+        :returns: a str
+
+        """
+        scheme, netloc, path, query, _ = urlsplit(url)
+        query_params = parse_qsl(query, keep_blank_values=True)
+        if params is not None:
+            query_params.extend((k, str(v)) for k, v in params.items())
+        query_params = sorted((k, v) for k, v in query_params
+                              if k.lower() not in cls._IGNORED_PARAMS)
+        normalised = urlunsplit((scheme.lower(), netloc.lower(), path,
+                                 urlencode(query_params), ''))
+        return hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        In case of a hit, returns the cached image data and makes it the most
+        recently used
+
+        :param key: the cache key of the image
+        :type key: str
+        :returns: bytes in case of cache hit or ``None`` otherwise
+
+        """
+        path = self._path_of(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._touch(key, len(data))
+        return data
+
+    def get_to_file(self, key, path_to_file):
+        """
+        In case of a hit, copies the cached image to the specified file and
+        makes it the most recently used
+
+        :param key: the cache key of the image
+        :type key: str
+        :param path_to_file: path to the target file
+        :type path_to_file: str
+        :returns: ``True`` in case of cache hit or ``False`` otherwise
+
+        """
+        path = self._path_of(key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return False
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            with open(path_to_file, 'wb') as g:
+                shutil.copyfileobj(f, g)
+        self._touch(key, size)
+        return True
+
+    def set(self, key, data):
+        """
+        Adds the specified image data to the cache, evicting the least
+        recently used images in case the cache grows bigger than its max size.
+        Images bigger than the max size of the cache are not cached.
+
+        :param key: the cache key of the image
+        :type key: str
+        :param data: the image data
+        :type data: bytes
+
+        """
+        if len(data) > self._max_size:
+            return
+        self._store(key, lambda f: f.write(data))
+
+    def set_from_file(self, key, path_to_file):
+        """
+        Adds the image data held by the specified file to the cache, as done
+        by `set`
+
+        :param key: the cache key of the image
+        :type key: str
+        :param path_to_file: path to the source file
+        :type path_to_file: str
+
+        """
+        if os.path.getsize(path_to_file) > self._max_size:
+            return
+
+        def copy(f):
+            with open(path_to_file, 'rb') as source:
+                shutil.copyfileobj(source, f)
+        self._store(key, copy)
+
+    def remove(self, key):
+        """
+        Removes the specified image from the cache, if cached
+
+        :param key: the cache key of the image
+        :type key: str
+
+        """
+        with self._lock:
+            size = self._usage_recency.pop(key, None)
+            if size is not None:
+                self._size -= size
+            self._remove_file(self._path_of(key))
+
+    def clean(self):
+        """
+        Empties the cache
+
+        """
+        with self._lock:
+            for key in self._usage_recency:
+                self._remove_file(self._path_of(key))
+            self._usage_recency.clear()
+            self._size = 0
+
+    def size(self):
+        """
+        Returns the total size in bytes of the cached images
+
+        :returns: an int
+
+        """
+        with self._lock:
+            return self._size
+
+    @classmethod
+    def _is_key(cls, name):
+        return len(name) == 64 and all(c in '0123456789abcdef' for c in name)
+
+    def _path_of(self, key):
+        if not isinstance(key, str) or not self._is_key(key):
+            raise ValueError('Invalid cache key: %s' % key)
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _load(self):
+        # cached images are sorted by recency of use
+        entries = []
+        for dir_name in os.listdir(self.cache_dir):
+            dir_path = os.path.join(self.cache_dir, dir_name)
+            if not os.path.isdir(dir_path):
+                continue
+            for file_name in os.listdir(dir_path):
+                if not self._is_key(file_name):
+                    # eg: temporary files of ongoing writes
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dir_path, file_name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, file_name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._usage_recency[key] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _store(self, key, write):
+        path = self._path_of(key)
+        dir_path = os.path.dirname(path)
+        os.makedirs(dir_path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=dir_path, prefix=self._TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove_file(temp_path)
+            raise
+        with self._lock:
+            self._size += size - self._usage_recency.pop(key, 0)
+            self._usage_recency[key] = size
+            self._evict()
+
+    def _touch(self, key, size):
+        try:
+            os.utime(self._path_of(key))
+        except FileNotFoundError:
+            # evicted in the meantime
+            return
+        with self._lock:
+            self._size += size - self._usage_recency.pop(key, 0)
+            self._usage_recency[key] = size
+            self._evict()
+
+    def _evict(self):
+        while self._size > self._max_size and self._usage_recency:
+            key, size = self._usage_recency.popitem(last=False)
+            self._size -= size
+            self._remove_file(self._path_of(key))
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        with self._lock:
+            return len(self._usage_recency)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._usage_recency
+
+    def __repr__(self):
+        return "<%s.%s - cache_dir=%s, size=%s, max size=%s>" % \
+            (__name__, self.__class__.__name__, self.cache_dir, self.size(),
+             self._max_size)
@@ -1,11 +1,21 @@
-import requests
 import json
+import os
+import types
 from pyowm.caches import nullcache
 from pyowm.commons.enums import ImageTypeEnum
 from pyowm.exceptions import api_call_error, api_response_error, parse_response_error
+from pyowm.utils.lazyutils import LazyModule
 from pyowm.weatherapi25.configuration25 import API_AVAILABILITY_TIMEOUT, \
     API_SUBSCRIPTION_SUBDOMAINS, VERIFY_SSL_CERTS
 
+JSON_STREAM_CHUNK_SIZE = 8192
+DOWNLOAD_CHUNK_SIZE = 65536
+PARTIAL_DOWNLOAD_SUFFIX = '.part'
+PARTIAL_DOWNLOAD_VALIDATOR_SUFFIX = '.part.validator'
+
+# requests is only imported upon the first HTTP call
+requests = LazyModule('requests')
+
 
 class HttpClient(object):
 
@@ -24,9 +34,9 @@ class HttpClient(object):
             resp = requests.get(uri, params=params, headers=headers,
                                 timeout=self.timeout, verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -45,9 +55,9 @@ class HttpClient(object):
             resp = requests.get(uri, stream=True, params=params, headers=headers,
                                 timeout=self.timeout, verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -66,9 +76,9 @@ class HttpClient(object):
             resp = requests.get(uri, stream=True, params=params, headers=headers,
                                 timeout=self.timeout, verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -78,6 +88,103 @@ class HttpClient(object):
             raise parse_response_error.ParseResponseError('Impossible to parse'
                                                           'API response data')
 
+    def get_png_to_file(self, uri, path_to_file, params=None, headers=None,
+                        resume=True):
+        headers = dict(headers or {})
+        headers['Accept'] = ImageTypeEnum.PNG.mime_type
+        return self.download_to_file(uri, path_to_file, params=params,
+                                     headers=headers, resume=resume)
+
+    def get_geotiff_to_file(self, uri, path_to_file, params=None, headers=None,
+                            resume=True):
+        headers = dict(headers or {})
+        headers['Accept'] = ImageTypeEnum.GEOTIFF.mime_type
+        return self.download_to_file(uri, path_to_file, params=params,
+                                     headers=headers, resume=resume)
+
+    def download_to_file(self, uri, path_to_file, params=None, headers=None,
+                         chunk_size=DOWNLOAD_CHUNK_SIZE, resume=True):
+        # the payload is streamed chunk by chunk to a partial file, which
+        # replaces the target file only once its size has been verified: if
+        # the download is interrupted, the next call resumes it from where it
+        # stopped by means of an HTTP Range request. The validator (ETag or
+        # Last-Modified) of the resource is saved along with the partial file
+        # and sent as If-Range, so that the server sends the whole resource
+        # again if it changed in the meantime
+        partial_path = path_to_file + PARTIAL_DOWNLOAD_SUFFIX
+        validator_path = path_to_file + PARTIAL_DOWNLOAD_VALIDATOR_SUFFIX
+        offset = 0
+        validator = None
+        if resume and os.path.isfile(partial_path):
+            validator = HttpClient._read_validator(validator_path)
+            if validator is not None:
+                offset = os.path.getsize(partial_path)
+        request_headers = dict(headers or {})
+        # byte ranges must refer to the resource, not to an encoding of it
+        request_headers['Accept-Encoding'] = 'identity'
+        if offset:
+            request_headers['Range'] = 'bytes=%d-' % offset
+            request_headers['If-Range'] = validator
+        try:
+            resp = requests.get(uri, stream=True, params=params,
+                                headers=request_headers, timeout=self.timeout,
+                                verify=self.verify_ssl_certs)
+        except requests.exceptions.SSLError as e:
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
+        except requests.exceptions.ConnectionError as e:
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
+        except requests.exceptions.Timeout:
+            raise api_call_error.APICallTimeoutError('API call timeouted')
+        try:
+            if resp.status_code == 416 and offset:
+                # the partial file does not match the remote resource
+                resp.close()
+                HttpClient._remove_partial_download(partial_path,
+                                                    validator_path)
+                return self.download_to_file(uri, path_to_file, params=params,
+                                             headers=headers,
+                                             chunk_size=chunk_size,
+                                             resume=False)
+            if resp.status_code >= 400:
+                HttpClient.check_status_code(resp.status_code, resp.text)
+            if resp.status_code == 206:
+                start, expected_size = HttpClient._parse_content_range(
+                    resp.headers.get('Content-Range'))
+                if start != offset:
+                    raise api_call_error.APICallError(
+                        'Unexpected content range: %s'
+                        % resp.headers.get('Content-Range'))
+            else:
+                # the server sent the whole resource: the download restarts
+                # from the beginning
+                offset = 0
+                expected_size = HttpClient._content_length(resp)
+                HttpClient._write_validator(validator_path,
+                                            HttpClient._validator_of(resp))
+            size = offset
+            with open(partial_path, 'ab' if offset else 'wb') as f:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except requests.exceptions.RequestException as e:
+            raise api_call_error.APICallError('Impossible to read API '
+                                              'response data', e)
+        finally:
+            resp.close()
+        if expected_size is not None and size != expected_size:
+            if size > expected_size:
+                # can't be resumed
+                HttpClient._remove_partial_download(partial_path,
+                                                    validator_path)
+            raise api_call_error.APICallError(
+                'Incomplete download: %d bytes received out of %d'
+                % (size, expected_size))
+        os.replace(partial_path, path_to_file)
+        HttpClient._remove_partial_download(validator_path)
+        return resp.status_code, size
+
     def cacheable_get_json(self, uri, params=None, headers=None):
         # check if already cached
         cached_url_key = requests.Request('GET', uri, params=params).prepare().url
@@ -89,14 +196,54 @@ class HttpClient(object):
         self.cache.set(cached_url_key, json_string)
         return status_code, json_string
 
+    def get_json_stream(self, uri, params=None, headers=None,
+                        chunk_size=JSON_STREAM_CHUNK_SIZE):
+        # generator yielding the raw JSON payload in chunks, as they are
+        # downloaded: cached payloads are returned in one chunk, but
+        # streamed payloads are never cached as they are not fully held
+        # in memory
+        cached_url_key = requests.Request('GET', uri, params=params).prepare().url
+        cached = self.cache.get(cached_url_key)
+        if cached:
+            yield cached
+            return
+        try:
+            resp = requests.get(uri, stream=True, params=params, headers=headers,
+                                timeout=self.timeout, verify=self.verify_ssl_certs)
+        except requests.exceptions.SSLError as e:
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
+        except requests.exceptions.ConnectionError as e:
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
+        except requests.exceptions.Timeout:
+            raise api_call_error.APICallTimeoutError('API call timeouted')
+        try:
+            # reading the text of a streamed response downloads all of it
+            if resp.status_code >= 400:
+                HttpClient.check_status_code(resp.status_code, resp.text)
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                yield chunk
+        except requests.exceptions.RequestException as e:
+            raise api_call_error.APICallError('Impossible to read API '
+                                              'response data', e)
+        finally:
+            resp.close()
+
     def post(self, uri, params=None, data=None, headers=None):
         try:
-            resp = requests.post(uri, params=params, json=data, headers=headers,
-                                 timeout=self.timeout, verify=self.verify_ssl_certs)
+            if isinstance(data, (bytes, types.GeneratorType)):
+                # already encoded JSON payloads are sent as they are: the
+                # ones generated lazily are streamed with chunked encoding
+                resp = requests.post(uri, params=params, data=data,
+                                     headers=headers, timeout=self.timeout,
+                                     verify=self.verify_ssl_certs)
+            else:
+                resp = requests.post(uri, params=params, json=data,
+                                     headers=headers, timeout=self.timeout,
+                                     verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -112,9 +259,9 @@ class HttpClient(object):
             resp = requests.put(uri, params=params, json=data, headers=headers,
                                 timeout=self.timeout, verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -130,9 +277,9 @@ class HttpClient(object):
             resp = requests.delete(uri, params=params, json=data, headers=headers,
                                    timeout=self.timeout, verify=self.verify_ssl_certs)
         except requests.exceptions.SSLError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.ConnectionError as e:
-            raise api_call_error.APIInvalidSSLCertificateError(str(e))
+            raise api_call_error.APIInvalidSSLCertificateError(str(e), e)
         except requests.exceptions.Timeout:
             raise api_call_error.APICallTimeoutError('API call timeouted')
         HttpClient.check_status_code(resp.status_code, resp.text)
@@ -148,15 +295,70 @@ class HttpClient(object):
         if status_code < 400:
             return
         if status_code == 400:
-            raise api_call_error.APICallError(payload)
+            raise api_call_error.APICallError(payload, status_code=status_code)
         elif status_code == 401:
             raise api_response_error.UnauthorizedError('Invalid API Key provided')
         elif status_code == 404:
             raise api_response_error.NotFoundError('Unable to find the resource')
         elif status_code == 502:
-            raise api_call_error.BadGatewayError('Unable to contact the upstream server')
+            raise api_call_error.BadGatewayError('Unable to contact the upstream server',
+                                                 status_code=status_code)
         else:
-            raise api_call_error.APICallError(payload)
+            raise api_call_error.APICallError(payload, status_code=status_code)
+
+    @classmethod
+    def _parse_content_range(cls, content_range):
+        # eg: "bytes 200-999/1000" gives (200, 1000), while the total size is
+        # None when unknown (eg: "bytes 200-999/*")
+        try:
+            unit, spec = content_range.split(' ', 1)
+            byte_range, total = spec.split('/', 1)
+            start = int(byte_range.split('-', 1)[0])
+            return start, None if total.strip() == '*' else int(total)
+        except (AttributeError, ValueError):
+            raise api_call_error.APICallError('Invalid content range: %s'
+                                              % content_range)
+
+    @classmethod
+    def _content_length(cls, resp):
+        # the length of encoded payloads is not the length of their content
+        if resp.headers.get('Content-Encoding', 'identity') != 'identity':
+            return None
+        length = resp.headers.get('Content-Length')
+        return None if length is None else int(length)
+
+    @classmethod
+    def _validator_of(cls, resp):
+        # weak ETags can't be used in If-Range headers
+        etag = resp.headers.get('ETag')
+        if etag is not None and not etag.startswith('W/'):
+            return etag
+        return resp.headers.get('Last-Modified')
+
+    @classmethod
+    def _read_validator(cls, validator_path):
+        try:
+            with open(validator_path, 'r', encoding='utf-8') as f:
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def _write_validator(cls, validator_path, validator):
+        # partial downloads without validator are not resumed
+        if validator is None:
+            cls._remove_partial_download(validator_path)
+            return
+        with open(validator_path, 'w', encoding='utf-8') as f:
+            f.write(validator)
+
+    @classmethod
+    def _remove_partial_download(cls, *paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
 
     @classmethod
     def is_success(cls, status_code):
@@ -1,3 +1,6 @@
+import mmap
+import os
+import shutil
 from pyowm.commons.enums import ImageTypeEnum
 from pyowm.commons.databoxes import ImageType
 
@@ -46,3 +49,77 @@ class Image:
         with open(path_to_file, 'rb') as f:
             data = f.read()
         return Image(data, image_type=img_type)
+
+
+class FileImage(Image):
+
+    """
+    Wrapper class for an image whose data is kept in a file on disk instead
+    of in memory: the file is memory-mapped upon the first access to the image
+    data, so that only the parts of the image which are actually read are
+    loaded by the OS
+
+    :param path_to_file: path to the file holding the image data
+    :type path_to_file: str
+    :param image_type: the type of the image, if known
+    :type image_type: `pyowm.commons.databoxes.ImageType` or `None`
+    """
+
+    def __init__(self, path_to_file, image_type=None):
+        assert path_to_file is not None
+        assert os.path.isfile(path_to_file), 'Image file does not exist'
+        self.path_to_file = path_to_file
+        if image_type is not None:
+            assert isinstance(image_type, ImageType)
+        self.image_type = image_type
+        self._mmap = None
+
+    @property
+    def data(self):
+        """
+        The read-only, memory-mapped image data
+
+        :return: `mmap.mmap` (or empty `bytes` for empty files)
+        """
+        if self._mmap is None:
+            if self.size == 0:
+                # empty files can't be memory-mapped
+                return b''
+            with open(self.path_to_file, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    @property
+    def size(self):
+        """
+        The size in bytes of the image data
+
+        :return: int
+        """
+        return os.path.getsize(self.path_to_file)
+
+    def persist(self, path_to_file):
+        """
+        Saves the image to disk on a file, by copying the file holding the
+        image data
+
+        :param path_to_file: path to the target file
+        :type path_to_file: str
+        :return: `None`
+        """
+        if os.path.abspath(path_to_file) != os.path.abspath(self.path_to_file):
+            shutil.copyfile(self.path_to_file, path_to_file)
+
+    def close(self):
+        """
+        Releases the memory-mapping of the image data, if any
+
+        :return: `None`
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __repr__(self):
+        return '<%s.%s - path_to_file=%s, size=%s>' % (
+            __name__, self.__class__.__name__, self.path_to_file, self.size)
@@ -86,6 +86,35 @@ class Tile:
         y = int((1.0 - math.log(math.tan(math.radians(lat)) + (1 / math.cos(math.radians(lat)))) / math.pi) / 2.0 * n)
         return x, y
 
+    @classmethod
+    def tile_coords_for_bbox(cls, lon_left, lat_bottom, lon_right, lat_top, zoom):
+        """
+        Returns the coordinates of the tiles covering the bounding box having the specified lon/lat estrema at the
+        specified zoom level. Coordinates shall be provided in degrees and using the Mercator Projection
+        (http://en.wikipedia.org/wiki/Mercator_projection)
+
+        :param lon_left: the westernmost longitude of the bounding box
+        :type lon_left: int or float
+        :param lat_bottom: the southernmost latitude of the bounding box
+        :type lat_bottom: int or float
+        :param lon_right: the easternmost longitude of the bounding box
+        :type lon_right: int or float
+        :param lat_top: the northernmost latitude of the bounding box
+        :type lat_top: int or float
+        :param zoom: zoom level
+        :type zoom: int
+        :return: a list of (x, y) tuples containing the tile-coordinates, row by row from north-west to south-east
+        """
+        assert lon_left <= lon_right, 'Bounding box left longitude cannot be greater than right longitude'
+        assert lat_bottom <= lat_top, 'Bounding box bottom latitude cannot be greater than top latitude'
+        max_coord = 2 ** zoom - 1
+        x_min, y_min = Tile.geoocoords_to_tile_coords(lon_left, lat_top, zoom)
+        x_max, y_max = Tile.geoocoords_to_tile_coords(lon_right, lat_bottom, zoom)
+        # points on the east/south edges of the map belong to the last tiles
+        x_min, x_max = min(max(x_min, 0), max_coord), min(max(x_max, 0), max_coord)
+        y_min, y_max = min(max(y_min, 0), max_coord), min(max(y_max, 0), max_coord)
+        return [(x, y) for y in range(y_min, y_max + 1) for x in range(x_min, x_max + 1)]
+
     @classmethod
     def tile_coords_to_bbox(cls, x, y, zoom):
         """
@@ -16,10 +16,19 @@ class APICallError(OWMError):
     :param triggering_error: optional *Exception* object that triggered this
         error (defaults to ``None``)
     :type triggering_error: an *Exception* subtype
+    :param status_code: optional HTTP error status code returned by the API
+        (defaults to ``None``)
+    :type status_code: int
     """
-    def __init__(self, message, triggering_error=None):
+    def __init__(self, message, triggering_error=None, status_code=None):
         self._message = message
         self._triggering_error = triggering_error
+        self.status_code = status_code
+
+    @property
+    def triggering_error(self):
+        """The *Exception* object that triggered this error, if any"""
+        return self._triggering_error
 
     def __str__(self):
         """Redefine __str__ hook for pretty-printing"""
@@ -0,0 +1,114 @@
+"""
+Module containing functions for aggregating raw measurements locally, the
+same way the Stations API does
+"""
+
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from operator import le
+from pyowm.stationsapi30.buffer import ColumnarBuffer
+from pyowm.stationsapi30.measurement import AggregatedMeasurement
+
+
+AGGREGATION_PERIODS = dict(m=60, h=3600, d=86400)
+
+# AggregatedMeasurement attribute: Measurement field it is computed from
+AGGREGATED_FIELDS = dict(temp='temperature',
+                         humidity='humidity',
+                         wind='wind_speed',
+                         pressure='pressure',
+                         precipitation='rain_1h')
+
+_NAN = float('nan')
+
+
+def aggregate(buffer, aggregated_on):
+    """
+    Aggregates the measurements of a buffer on minute, hour or day, producing
+    the same kind of data returned by the Stations API: measurements are
+    grouped into UTC-aligned time buckets and, for each bucket, the min, max
+    and average values of each aggregated field are computed - along with
+    the number of values they are computed from (the weight). Fields having
+    no numeric values in a bucket are aggregated into empty dicts.
+
+    Values are read column-wise, and in case the measurements are sorted
+    chronologically bucket boundaries are found by binary search: so
+    *pyowm.stationsapi30.buffer.ColumnarBuffer* objects holding sorted
+    measurements are aggregated faster.
+
+    :param buffer: the buffer whose measurements are to be aggregated
+    :type buffer: *pyowm.stationsapi30.buffer.Buffer* or
+        *pyowm.stationsapi30.buffer.ColumnarBuffer* instance
+    :param aggregated_on: aggregation time-frame
+    :type aggregated_on: string between 'm','h' and 'd'
+    :returns: list of *pyowm.stationsapi30.measurement.AggregatedMeasurement*
+        objects, sorted chronologically
+    :raises: *ValueError* if the aggregation time-frame is unknown
+    """
+    assert buffer is not None
+    if aggregated_on not in AGGREGATION_PERIODS:
+        raise ValueError('"aggregated_on" must be among: m, h, d')
+    period = AGGREGATION_PERIODS[aggregated_on]
+    timestamps, columns = _columns_of(buffer)
+    if not _is_sorted(timestamps):
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        timestamps = array('q', [timestamps[i] for i in order])
+        columns = dict((attribute, array('d', [column[i] for i in order]))
+                       for attribute, column in columns.items())
+    result = []
+    start = 0
+    size = len(timestamps)
+    while start < size:
+        bucket = timestamps[start] - timestamps[start] % period
+        end = bisect_left(timestamps, bucket + period, start, size)
+        stats = dict((attribute, _stats(column[start:end]))
+                     for attribute, column in columns.items())
+        result.append(AggregatedMeasurement(buffer.station_id, bucket,
+                                            aggregated_on, **stats))
+        start = end
+    return result
+
+
+def _columns_of(buffer):
+    if isinstance(buffer, ColumnarBuffer):
+        timestamps = buffer.column('timestamp')
+        fields = buffer.fields()
+        columns = dict()
+        for attribute, field in AGGREGATED_FIELDS.items():
+            if field not in fields:
+                # aggregated into empty dicts
+                continue
+            column = buffer.column(field)
+            if not isinstance(column, memoryview):
+                column = array('d', [_to_float(v) for v in column])
+            columns[attribute] = column
+        return timestamps, columns
+    measurements = list(buffer)
+    timestamps = array('q', [m.timestamp for m in measurements])
+    columns = dict(
+        (attribute, array('d', [_to_float(getattr(m, field))
+                                for m in measurements]))
+        for attribute, field in AGGREGATED_FIELDS.items())
+    return timestamps, columns
+
+
+def _to_float(value):
+    # values which are not numbers (eg: dicts) can't be aggregated
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return _NAN
+
+
+def _is_sorted(values):
+    return all(map(le, values, islice(values, 1, None)))
+
+
+def _stats(values):
+    # NaNs, standing for missing values, are the only values not equal to
+    # themselves
+    values = [v for v in values if v == v]
+    if not values:
+        return dict()
+    return dict(min=min(values), max=max(values),
+                average=sum(values) / len(values), weight=len(values))
@@ -1,9 +1,17 @@
 import json
 import copy
+import math
+import heapq
+from array import array
+from itertools import islice
+from collections.abc import Sequence
 from pyowm.stationsapi30.measurement import Measurement
 from pyowm.utils import timeutils, timeformatutils
 
 
+_NAN = float('nan')
+
+
 class Buffer:
 
     station_id = None
@@ -94,7 +102,7 @@ class Buffer:
     def __add__(self, other):
         assert all([i.station_id == self.station_id for i in other])
         result = copy.deepcopy(self)
-        for m in other.measurements:
+        for m in other:
             result.append(m)
         return result
 
@@ -105,3 +113,409 @@ class Buffer:
         return '<%s.%s - station_id=%s, n_samples=%s>' \
                % (__name__, self.__class__.__name__,
                   self.station_id, len(self))
+
+
+class ColumnarBuffer:
+    """
+    A buffer of raw measurements of a station, holding them column-wise
+    rather than as a list of ``measurement.Measurement`` objects: timestamps
+    and numeric values are kept in typed arrays - where missing values are
+    NaNs - while other values are kept in lists. Columns are only created
+    when the first value for the corresponding field is appended.
+
+    It can be used in place of a ``Buffer``: measurements are appended and
+    iterated as ``measurement.Measurement`` objects, which are created upon
+    iteration. Appending is amortised O(1), merging with another buffer is
+    done in place and sorting only computes the order of the timestamps once.
+
+    Numeric values are stored as floats: columns whose values are all ints
+    give back ints. Columns receiving values that are not numbers (eg: dicts)
+    are turned into lists.
+
+    :param station_id: unique station identifier
+    :type station_id: str
+    :returns: a *ColumnarBuffer* instance
+    """
+
+    NUMERIC_FIELDS = ('temperature', 'wind_speed', 'wind_gust', 'wind_deg',
+                      'pressure', 'humidity', 'rain_1h', 'rain_6h', 'rain_24h',
+                      'snow_1h', 'snow_6h', 'snow_24h', 'dew_point', 'humidex',
+                      'heat_index', 'visibility_distance', 'clouds_distance')
+    OTHER_FIELDS = ('visibility_prefix', 'clouds_condition', 'clouds_cumulus',
+                    'weather_precipitation', 'weather_descriptor',
+                    'weather_intensity', 'weather_proximity',
+                    'weather_obscuration', 'weather_other')
+
+    station_id = None
+    created_at = None
+
+    def __init__(self, station_id):
+        assert station_id is not None
+        self.station_id = station_id
+        self.created_at = timeutils.now(timeformat='unix')
+        self.empty()
+
+    def creation_time(self, timeformat='unix'):
+        """Returns the UTC time of creation of this buffer
+
+        :param timeformat: the format for the time value. May be:
+            '*unix*' (default) for UNIX time, '*iso*' for ISO8601-formatted
+            string in the format ``YYYY-MM-DD HH:MM:SS+00`` or `date` for
+            a ``datetime.datetime`` object
+        :type timeformat: str
+        :returns: an int or a str or a ``datetime.datetime`` object or None
+        :raises: ValueError
+
+        """
+        if self.created_at is None:
+            return None
+        return timeformatutils.timeformat(self.created_at, timeformat)
+
+    def append(self, measurement):
+        """
+        Appends the values of the specified ``Measurement`` object to the
+        buffer
+        :param measurement: a ``measurement.Measurement`` instance
+
+        """
+        assert isinstance(measurement, Measurement)
+        assert measurement.station_id == self.station_id
+        size = len(self._timestamps)
+        self._timestamps.append(measurement.timestamp)
+        values = vars(measurement)
+        for field, column in self._columns.items():
+            value = values.get(field)
+            if value.__class__ is float and column.__class__ is array:
+                column.append(value)
+                if field in self._int_fields:
+                    self._int_fields.discard(field)
+            else:
+                self._append_value(field, column, value)
+        for field in self._missing_fields:
+            value = values.get(field)
+            if value is not None:
+                column = self._create_column(field, size)
+                self._append_value(field, column, value)
+
+    def append_from_dict(self, the_dict):
+        """
+        Creates a ``measurement.Measurement`` object from the supplied dict
+        and then appends it to the buffer
+        :param the_dict: dict
+
+        """
+        self.append(Measurement.from_dict(the_dict))
+
+    def append_from_json(self, json_string):
+        """
+        Creates a ``measurement.Measurement`` object from the supplied JSON
+        string and then appends it to the buffer
+        :param json_string: the JSON formatted string
+
+        """
+        self.append_from_dict(json.loads(json_string))
+
+    def extend(self, other):
+        """
+        Appends in place all the measurements of another buffer of the same
+        station. Columns of another ``ColumnarBuffer`` are appended as a whole.
+        :param other: a ``Buffer`` or ``ColumnarBuffer`` instance, or an
+            iterable of ``measurement.Measurement`` objects
+
+        """
+        if not isinstance(other, ColumnarBuffer):
+            for m in other:
+                self.append(m)
+            return
+        assert other.station_id == self.station_id
+        size = len(self._timestamps)
+        other_size = len(other._timestamps)
+        for field in self.NUMERIC_FIELDS + self.OTHER_FIELDS:
+            column = self._columns.get(field)
+            other_column = other._columns.get(field)
+            if other_column is None:
+                if column is not None:
+                    self._pad_column(column, other_size)
+                continue
+            if column is None:
+                column = self._create_column(field, size)
+            if isinstance(column, array) and isinstance(other_column, list):
+                column = self._to_list_column(field)
+            if isinstance(column, list) and isinstance(other_column, array):
+                column.extend(self._to_value(field, value, other)
+                              for value in other_column)
+            else:
+                column.extend(other_column)
+            if field not in other._int_fields:
+                self._int_fields.discard(field)
+        self._timestamps.extend(other._timestamps)
+
+    def empty(self):
+        """
+        Drops all measurements of this buffer instance
+
+        """
+        self._timestamps = array('q')
+        self._columns = dict()
+        self._missing_fields = self.NUMERIC_FIELDS + self.OTHER_FIELDS
+        self._int_fields = set()
+
+    def sort_chronologically(self):
+        """
+        Sorts the measurements of this buffer in chronological order
+
+        """
+        self._sort(reverse=False)
+
+    def sort_reverse_chronologically(self):
+        """
+        Sorts the measurements of this buffer in reverse chronological order
+
+        """
+        self._sort(reverse=True)
+
+    def column(self, field):
+        """
+        Returns a view on the values of the specified field for all the
+        measurements in the buffer, without copying them. Timestamps and
+        numeric values are given as a ``memoryview`` on the underlying typed
+        array, with NaNs for missing numeric values; other values are given
+        as a read-only sequence, with ``None`` for missing values. Views
+        must not be used across changes to the buffer. Fields without any
+        value (see `fields`) are given as a transient sequence of NaNs or
+        ``None`` values, which does not add a column to the buffer.
+        :param field: 'timestamp' or a ``measurement.Measurement`` field name
+        :type field: str
+        :returns: a ``memoryview`` or a read-only sequence
+        :raises: *ValueError* if the field is unknown
+
+        """
+        if field == 'timestamp':
+            return memoryview(self._timestamps)
+        if field not in self.NUMERIC_FIELDS + self.OTHER_FIELDS:
+            raise ValueError('Unknown measurement field: %s' % field)
+        column = self._columns.get(field)
+        if column is None:
+            if field in self.NUMERIC_FIELDS:
+                return memoryview(array('d', [_NAN]) * len(self._timestamps))
+            return _ColumnView([None] * len(self._timestamps))
+        if isinstance(column, array):
+            return memoryview(column)
+        return _ColumnView(column)
+
+    def fields(self):
+        """
+        Returns the names of the fields having a value for at least one of
+        the measurements in the buffer, timestamps excluded
+        :returns: a tuple of str
+
+        """
+        return tuple(field for field in self.NUMERIC_FIELDS + self.OTHER_FIELDS
+                     if field in self._columns)
+
+    def is_integral(self, field):
+        """
+        Tells if all the values of the specified numeric field are ints, in
+        which case they are given back as ints while iterating over the
+        buffer, even though the column holds floats
+        :param field: a numeric ``measurement.Measurement`` field name
+        :type field: str
+        :returns: bool
+
+        """
+        return field in self._int_fields
+
+    def to_buffer(self):
+        """
+        Returns a ``Buffer`` holding the measurements of this buffer
+
+        :returns: a ``Buffer`` instance
+        """
+        result = Buffer(self.station_id)
+        result.created_at = self.created_at
+        result.measurements = list(self)
+        return result
+
+    def _measurement_at(self, index):
+        kwargs = dict()
+        for field, column in self._columns.items():
+            value = self._to_value(field, column[index], self)
+            if value is not None:
+                kwargs[field] = value
+        return Measurement(self.station_id, self._timestamps[index], **kwargs)
+
+    @staticmethod
+    def _to_value(field, value, buffer):
+        if isinstance(value, float):
+            if math.isnan(value):
+                return None
+            if field in buffer._int_fields:
+                return int(value)
+        return value
+
+    def _create_column(self, field, size):
+        if field in self.NUMERIC_FIELDS:
+            column = array('d', [_NAN]) * size
+            self._int_fields.add(field)
+        else:
+            column = [None] * size
+        self._columns[field] = column
+        self._missing_fields = tuple(f for f in self._missing_fields
+                                     if f != field)
+        return column
+
+    def _append_value(self, field, column, value):
+        if isinstance(column, array):
+            if value is None:
+                column.append(_NAN)
+                return
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if not isinstance(value, int):
+                    self._int_fields.discard(field)
+                column.append(value)
+                return
+            column = self._to_list_column(field)
+        column.append(value)
+
+    def _to_list_column(self, field):
+        column = [self._to_value(field, value, self)
+                  for value in self._columns[field]]
+        self._int_fields.discard(field)
+        self._columns[field] = column
+        return column
+
+    @staticmethod
+    def _pad_column(column, size):
+        if isinstance(column, array):
+            column.extend(array('d', [_NAN]) * size)
+        else:
+            column.extend([None] * size)
+
+    def _sort(self, reverse):
+        timestamps = self._timestamps
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__,
+                       reverse=reverse)
+        self._timestamps = array('q', [timestamps[i] for i in order])
+        for field, column in self._columns.items():
+            if isinstance(column, array):
+                self._columns[field] = array('d', [column[i] for i in order])
+            else:
+                self._columns[field] = [column[i] for i in order]
+
+    # Magic methods
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def __iter__(self):
+        return (self._measurement_at(i) for i in range(len(self._timestamps)))
+
+    def __add__(self, other):
+        assert other.station_id == self.station_id
+        result = ColumnarBuffer(self.station_id)
+        result.created_at = self.created_at
+        result.extend(self)
+        result.extend(other)
+        return result
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __contains__(self, measurement):
+        if not isinstance(measurement, Measurement) or \
+                measurement.station_id != self.station_id:
+            return False
+        the_dict = measurement.to_dict()
+        return any(self._measurement_at(i).to_dict() == the_dict
+                   for i, ts in enumerate(self._timestamps)
+                   if ts == measurement.timestamp)
+
+    def __repr__(self):
+        return '<%s.%s - station_id=%s, n_samples=%s>' \
+               % (__name__, self.__class__.__name__,
+                  self.station_id, len(self))
+
+
+class _ColumnView(Sequence):
+    """
+    Read-only view on a list
+    """
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+
+DUPLICATE_POLICIES = ('first', 'last', 'keep_all')
+
+
+def merge(buffers, on_duplicate='first'):
+    """
+    Merges any number of buffers of the same station into a single ``Buffer``
+    sorted chronologically, with a k-way merge taking O(n log k) time for n
+    measurements in k buffers. Buffers are expected to be sorted
+    chronologically: the ones which are not are sorted before merging,
+    without altering them. Measurements are not copied.
+
+    Measurements having the same timestamp are duplicates, which are handled
+    according to the specified policy: '*first*' (default) keeps the one
+    coming from the earliest buffer in the provided sequence, '*last*' the
+    one coming from the latest buffer and '*keep_all*' keeps all of them.
+    A function can be provided as well: it is given the list of the
+    duplicates, in buffer order, and returns the measurement to be kept.
+
+    :param buffers: the ``Buffer`` or ``ColumnarBuffer`` objects to be merged
+    :type buffers: iterable
+    :param on_duplicate: the duplicates handling policy
+    :type on_duplicate: str or function
+    :returns: a ``Buffer`` instance
+    :raises: *ValueError* if no buffers are provided or the policy is unknown
+
+    """
+    buffers = list(buffers)
+    if not buffers:
+        raise ValueError('No buffers to be merged')
+    if not callable(on_duplicate) and on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError('"on_duplicate" must be a function or among: %s'
+                         % ', '.join(DUPLICATE_POLICIES))
+    station_id = buffers[0].station_id
+    assert all(b.station_id == station_id for b in buffers)
+    result = Buffer(station_id)
+    # buffer index and position break ties between equal timestamps, so
+    # that measurements themselves are never compared
+    streams = [_decorated(b, index) for index, b in enumerate(buffers)]
+    duplicates = []
+    for ts, _, _, m in heapq.merge(*streams):
+        if duplicates and duplicates[0].timestamp != ts:
+            result.measurements.extend(_deduplicated(duplicates, on_duplicate))
+            duplicates = []
+        duplicates.append(m)
+    if duplicates:
+        result.measurements.extend(_deduplicated(duplicates, on_duplicate))
+    return result
+
+
+def _decorated(buffer, index):
+    measurements = buffer.measurements if isinstance(buffer, Buffer) \
+        else list(buffer)
+    if any(a.timestamp > b.timestamp
+           for a, b in zip(measurements, islice(measurements, 1, None))):
+        measurements = sorted(measurements, key=lambda m: m.timestamp)
+    return ((m.timestamp, index, position, m)
+            for position, m in enumerate(measurements))
+
+
+def _deduplicated(duplicates, on_duplicate):
+    if len(duplicates) == 1 or on_duplicate == 'keep_all':
+        return duplicates
+    if on_duplicate == 'first':
+        return duplicates[:1]
+    if on_duplicate == 'last':
+        return duplicates[-1:]
+    return [on_duplicate(duplicates)]
@@ -0,0 +1,154 @@
+"""
+Module containing functions for encoding measurements into the JSON payloads
+accepted by the Stations API, in bulk
+"""
+
+import json
+from itertools import islice
+from operator import attrgetter
+from pyowm.stationsapi30.buffer import ColumnarBuffer
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Measurement fields, in the same order as they appear in the payload
+FIELDS = ('station_id', 'timestamp', 'temperature', 'wind_speed', 'wind_gust',
+          'wind_deg', 'pressure', 'humidity', 'rain_1h', 'rain_6h',
+          'rain_24h', 'snow_1h', 'snow_6h', 'snow_24h', 'dew_point',
+          'humidex', 'heat_index', 'visibility_distance', 'visibility_prefix',
+          'clouds_distance', 'clouds_condition', 'clouds_cumulus',
+          'weather_precipitation', 'weather_descriptor', 'weather_intensity',
+          'weather_proximity', 'weather_obscuration', 'weather_other')
+
+# each measurement is encoded by filling in its already encoded values
+_TEMPLATE = (
+    '{"station_id": %s, "dt": %s, "temperature": %s, "wind_speed": %s, '
+    '"wind_gust": %s, "wind_deg": %s, "pressure": %s, "humidity": %s, '
+    '"rain_1h": %s, "rain_6h": %s, "rain_24h": %s, "snow_1h": %s, '
+    '"snow_6h": %s, "snow_24h": %s, "dew_point": %s, "humidex": %s, '
+    '"heat_index": %s, "visibility_distance": %s, "visibility_prefix": %s, '
+    '"clouds": [{"distance": %s}, {"condition": %s}, {"cumulus": %s}], '
+    '"weather": [{"precipitation": %s}, {"descriptor": %s}, '
+    '{"intensity": %s}, {"proximity": %s}, {"obscuration": %s}, '
+    '{"other": %s}]}')
+
+_values_of = attrgetter(*FIELDS)
+_NONE = type(None)
+_NON_FINITE = {'nan': 'null', 'inf': 'Infinity', '-inf': '-Infinity'}
+
+
+def encode(measurements, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encodes measurements into the JSON payload to be posted to the Stations
+    API: a list holding one object per measurement, whose clouds and weather
+    fields are grouped into lists of single-key objects. No dict is actually
+    created out of the measurements.
+
+    :param measurements: the *pyowm.stationsapi30.measurement.Measurement*
+        objects to be encoded, or a *pyowm.stationsapi30.buffer.Buffer* or
+        *pyowm.stationsapi30.buffer.ColumnarBuffer* holding them
+    :type measurements: iterable
+    :param batch_size: number of measurements encoded at once
+    :type batch_size: int
+    :returns: the UTF-8 encoded JSON payload as bytes
+    """
+    return b''.join(iter_encode(measurements, batch_size=batch_size))
+
+
+def iter_encode(measurements, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Lazily encodes measurements into the JSON payload to be posted to the
+    Stations API, yielding one chunk of the payload every *batch_size*
+    measurements: this way only a batch of measurements at a time is held in
+    memory in encoded form.
+
+    Values are encoded column-wise, one batch at a time: columns of
+    *pyowm.stationsapi30.buffer.ColumnarBuffer* objects are encoded without
+    creating *Measurement* objects at all.
+
+    :param measurements: the *pyowm.stationsapi30.measurement.Measurement*
+        objects to be encoded, or a *pyowm.stationsapi30.buffer.Buffer* or
+        *pyowm.stationsapi30.buffer.ColumnarBuffer* holding them
+    :type measurements: iterable
+    :param batch_size: number of measurements encoded at once
+    :type batch_size: int
+    :returns: a generator of bytes
+    """
+    assert measurements is not None
+    assert isinstance(batch_size, int) and batch_size > 0
+    if isinstance(measurements, ColumnarBuffer):
+        batches = _columnar_batches(measurements, batch_size)
+    else:
+        batches = _batches(measurements, batch_size)
+    separator = b'['
+    for columns in batches:
+        rows = map(_TEMPLATE.__mod__, zip(*columns))
+        yield separator + ', '.join(rows).encode('utf-8')
+        separator = b', '
+    yield b']' if separator == b', ' else b'[]'
+
+
+def _batches(measurements, batch_size):
+    iterator = iter(measurements)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield [_encode_column(column)
+               for column in zip(*map(_values_of, batch))]
+
+
+def _columnar_batches(buffer, batch_size):
+    station_ids = [json.dumps(buffer.station_id)]
+    fields = ('timestamp',) + buffer.fields()
+    # fields without values are not read from the buffer
+    columns = [buffer.column(field) if field in fields else None
+               for field in FIELDS[1:]]
+    int_fields = set(filter(buffer.is_integral, fields))
+    for start in range(0, len(buffer), batch_size):
+        end = min(start + batch_size, len(buffer))
+        batch = [station_ids * (end - start)]
+        for field, column in zip(FIELDS[1:], columns):
+            if column is None:
+                batch.append(['null'] * (end - start))
+                continue
+            values = column[start:end]
+            if field == 'timestamp':
+                batch.append(list(map(int.__repr__, values)))
+            elif isinstance(column, memoryview):
+                batch.append(_encode_floats(values, field in int_fields))
+            else:
+                batch.append(_encode_column(values))
+        yield batch
+
+
+def _encode_floats(values, as_ints):
+    # missing values of ColumnarBuffer numeric columns are NaNs
+    if as_ints:
+        return ['null' if v != v else int.__repr__(int(v)) for v in values]
+    return [_NON_FINITE.get(r, r) for r in map(float.__repr__, values)]
+
+
+def _encode_column(values):
+    types = set(map(type, values))
+    if types == {_NONE}:
+        return ['null'] * len(values)
+    if types == {str}:
+        return list(map(json.encoder.encode_basestring_ascii, values))
+    if types <= {int, _NONE}:
+        return ['null' if v is None else int.__repr__(v) for v in values]
+    return [_encode_value(v) for v in values]
+
+
+def _encode_value(value):
+    cls = value.__class__
+    if value is None:
+        return 'null'
+    if cls is float and value - value == 0:
+        return float.__repr__(value)
+    if cls is int:
+        return int.__repr__(value)
+    if cls is str:
+        return json.encoder.encode_basestring_ascii(value)
+    # nested values, non-finite floats and any other type
+    return json.dumps(value)
@@ -0,0 +1,278 @@
+"""
+Module containing a pipeline that collects the measurements of a station and
+sends them to the Stations API in the background
+"""
+
+import threading
+import time
+from pyowm.stationsapi30 import upload
+from pyowm.stationsapi30.buffer import Buffer
+
+
+class IngestionPipeline(object):
+    """
+    Collects the measurements of a station into a buffer and sends them to
+    the Stations API from a background thread, either as soon as the buffer
+    holds *max_size* measurements or *max_age* seconds after the oldest
+    buffered measurement was appended, whichever comes first. Measurements
+    can be appended from any thread.
+
+    When a persistence backend is provided, measurements whose sending fails
+    are saved to it, and they are sent again when the pipeline is started
+    (eg: after a restart) or `replay` is called; otherwise they are dropped.
+    Metrics about the pipeline are given by `metrics`.
+
+    :param stations_manager: the object sending the measurements
+    :type stations_manager: *pyowm.stationsapi30.stations_manager.StationsManager*
+    :param station_id: unique station identifier
+    :type station_id: str
+    :param max_size: number of buffered measurements triggering a flush.
+        Defaults to 1000
+    :type max_size: int
+    :param max_age: max seconds a measurement waits in the buffer before
+        being sent. Defaults to 60
+    :type max_age: int or float
+    :param persistence_backend: optional backend where measurements which
+        could not be sent are saved
+    :type persistence_backend:
+        *pyowm.stationsapi30.persistence_backend.PersistenceBackend* or `None`
+    :returns: an *IngestionPipeline* instance
+    """
+
+    def __init__(self, stations_manager, station_id, max_size=1000,
+                 max_age=60, persistence_backend=None):
+        assert stations_manager is not None
+        assert station_id is not None
+        assert isinstance(max_size, int) and max_size > 0
+        assert max_age > 0
+        self.stations_manager = stations_manager
+        self.station_id = station_id
+        self.max_size = max_size
+        self.max_age = max_age
+        self.persistence_backend = persistence_backend
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._buffer = Buffer(station_id)
+        self._oldest = None
+        self._thread = None
+        self._stopping = False
+        self._counters = dict(measurements_sent=0, measurements_spilled=0,
+                              measurements_dropped=0, measurements_replayed=0,
+                              flushes=0, failed_flushes=0)
+        self._last_flush_latency = None
+        self._max_flush_latency = None
+
+    def start(self):
+        """
+        Sends the measurements saved to the persistence backend, if any, then
+        starts the background sender thread
+
+        """
+        if self.is_running():
+            return
+        self.replay()
+        with self._condition:
+            self._stopping = False
+        self._thread = threading.Thread(target=self._run,
+                                        name='pyowm-ingestion-%s'
+                                        % self.station_id)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """
+        Stops the background sender thread, waiting for the ongoing flush to
+        be completed
+
+        :param flush: if `True` (default) the buffered measurements are sent
+            before returning
+        :type flush: bool
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def is_running(self):
+        """
+        Tells if the background sender thread is running
+
+        :returns: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def append(self, measurement):
+        """
+        Appends the specified ``Measurement`` object to the buffer
+
+        :param measurement: a ``measurement.Measurement`` instance
+
+        """
+        with self._condition:
+            self._buffer.append(measurement)
+            if self._oldest is None:
+                # the sender thread has to start counting the buffer age
+                self._oldest = time.monotonic()
+                self._condition.notify_all()
+            elif len(self._buffer) >= self.max_size:
+                self._condition.notify_all()
+
+    def flush(self):
+        """
+        Sends the buffered measurements right away, from the calling thread
+
+        :returns: the int number of measurements which were sent
+        """
+        with self._flush_lock:
+            with self._condition:
+                buffer = self._buffer
+                self._buffer = Buffer(self.station_id)
+                self._oldest = None
+            if not len(buffer):
+                return 0
+            started_at = time.monotonic()
+            try:
+                self.stations_manager.send_buffer(buffer)
+                sent = True
+            except Exception as e:
+                self.last_error = e
+                self._spill(buffer)
+                sent = False
+            latency = time.monotonic() - started_at
+            with self._condition:
+                self._counters['flushes'] += 1
+                if sent:
+                    self._counters['measurements_sent'] += len(buffer)
+                else:
+                    self._counters['failed_flushes'] += 1
+                self._last_flush_latency = latency
+                if self._max_flush_latency is None or \
+                        latency > self._max_flush_latency:
+                    self._max_flush_latency = latency
+            return len(buffer) if sent else 0
+
+    def replay(self):
+        """
+        Sends the measurements saved to the persistence backend, which is then
+        cleared. Saved measurements are read and sent a few batches of
+        *max_size* measurements at a time, so that the backend is never
+        loaded into memory at once. In case of failure, sending stops and
+        only the measurements preceding the first failed batch are deleted
+        from the backend, where the others are kept: measurements of the same
+        read which were sent after that batch are then sent again by the next
+        replay.
+
+        :returns: the int number of measurements which were sent
+        """
+        if self.persistence_backend is None:
+            return 0
+        with self._flush_lock:
+            sent = 0
+            try:
+                # number of saved measurements up to the first failure
+                delivered = 0
+                failed = False
+                pieces = self.persistence_backend.iter_buffers(
+                    chunk_size=self.max_size * upload.DEFAULT_MAX_WORKERS)
+                try:
+                    for piece in pieces:
+                        results = self.stations_manager.send_buffer_in_chunks(
+                            piece, chunk_size=self.max_size)
+                        for result in results:
+                            if result.succeeded:
+                                sent += result.size
+                                if not failed:
+                                    delivered += result.size
+                            else:
+                                self.last_error = result.error
+                                failed = True
+                        if failed:
+                            break
+                finally:
+                    pieces.close()
+                if failed:
+                    self.persistence_backend.discard_first(delivered)
+                else:
+                    self.persistence_backend.clear()
+            except Exception as e:
+                self.last_error = e
+            with self._condition:
+                self._counters['measurements_replayed'] += sent
+            return sent
+
+    @property
+    def queue_depth(self):
+        """
+        The number of measurements waiting to be sent
+
+        :returns: int
+        """
+        with self._condition:
+            return len(self._buffer)
+
+    def metrics(self):
+        """
+        Returns the metrics of the pipeline: the number of measurements
+        waiting to be sent (*queue_depth*), sent, saved to the persistence
+        backend because of failures (*spilled*), dropped because of failures
+        and sent from the persistence backend (*replayed*), the number of
+        flushes and failed flushes and the latency in seconds of the last
+        and of the slowest flush
+
+        :returns: dict
+        """
+        with self._condition:
+            result = dict(self._counters)
+            result['queue_depth'] = len(self._buffer)
+            result['last_flush_latency'] = self._last_flush_latency
+            result['max_flush_latency'] = self._max_flush_latency
+            return result
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping and not self._is_due():
+                    self._condition.wait(self._time_to_next_flush())
+                if self._stopping:
+                    return
+            self.flush()
+
+    def _is_due(self):
+        if len(self._buffer) >= self.max_size:
+            return True
+        return self._oldest is not None and \
+            time.monotonic() - self._oldest >= self.max_age
+
+    def _time_to_next_flush(self):
+        if self._oldest is None:
+            return None
+        return max(0, self._oldest + self.max_age - time.monotonic())
+
+    def _spill(self, buffer):
+        if self.persistence_backend is not None:
+            try:
+                self.persistence_backend.append_buffer(buffer)
+                with self._condition:
+                    self._counters['measurements_spilled'] += len(buffer)
+                return
+            except Exception as e:
+                self.last_error = e
+        with self._condition:
+            self._counters['measurements_dropped'] += len(buffer)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __repr__(self):
+        return '<%s.%s - station_id=%s, queue_depth=%s, running=%s>' % (
+            __name__, self.__class__.__name__, self.station_id,
+            self.queue_depth, self.is_running())
@@ -5,7 +5,11 @@ of raw measurements I/O
 
 
 import os
+import re
 import json
+import itertools
+import sqlite3
+import threading
 from abc import ABCMeta, abstractmethod
 from pyowm.stationsapi30.buffer import Buffer
 
@@ -42,6 +46,74 @@ class PersistenceBackend:
         """
         pass
 
+    def append_buffer(self, buffer):
+        """
+        Adds data contained into a *pyowm.stationsapi30.buffer.Buffer* object
+        to the data already saved. By default, saved data is loaded and saved
+        again along with the new one: backends supporting appends override
+        this method.
+
+        :param buffer: the Buffer object whose data is to be added
+        :type buffer:  *pyowm.stationsapi30.buffer.Buffer* instance
+
+        """
+        result = self.load_to_buffer()
+        for msmt in buffer:
+            result.append(msmt)
+        self.persist_buffer(result)
+
+    def iter_buffers(self, chunk_size=1000):
+        """
+        Reads meteostation measurement data into a sequence of
+        *pyowm.stationsapi30.buffer.Buffer* objects, each one holding at most
+        the specified number of measurements. By default, saved data is
+        loaded at once and then split: backends able to read data lazily
+        override this method.
+
+        :param chunk_size: max number of measurements per buffer
+        :type chunk_size: int
+        :returns: a generator of *pyowm.stationsapi30.buffer.Buffer* instances
+
+        """
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        loaded = self.load_to_buffer()
+        result = Buffer(loaded.station_id)
+        for msmt in loaded:
+            result.append(msmt)
+            if len(result) == chunk_size:
+                yield result
+                result = Buffer(loaded.station_id)
+        if len(result):
+            yield result
+
+    def discard_first(self, count):
+        """
+        Deletes the first saved measurements, in the order in which they are
+        read by `iter_buffers` (eg: the ones which have already been sent).
+        By default, saved data is loaded and saved again without them:
+        backends able to delete data in place override this method.
+
+        :param count: number of measurements to be deleted
+        :type count: int
+        :returns: the int number of deleted measurements
+
+        """
+        assert isinstance(count, int) and count >= 0
+        loaded = self.load_to_buffer()
+        result = Buffer(loaded.station_id)
+        for msmt in itertools.islice(loaded, count, None):
+            result.append(msmt)
+        self.persist_buffer(result)
+        return len(loaded) - len(result)
+
+    def clear(self):
+        """
+        Deletes all of the saved data. By default, an empty buffer is saved:
+        backends not overwriting data when saving override this method.
+
+        """
+        self.persist_buffer(Buffer(self.load_to_buffer().station_id))
+
     def __repr__(self):
         return '<%s.%s>' % (__name__, self.__class__.__name__)
 
@@ -72,6 +144,9 @@ class JSONPersistenceBackend(PersistenceBackend):
         if self._station_id is None:
             raise ValueError('No station ID specified')
         result = Buffer(self._station_id)
+        # an empty file holds no data
+        if os.path.getsize(self._file_path) == 0:
+            return result
         with open(self._file_path, 'r') as f:
             list_of_dicts = json.load(f)
             for _dict in list_of_dicts:
@@ -84,3 +159,535 @@ class JSONPersistenceBackend(PersistenceBackend):
             for msmt in buffer:
                 data.append(msmt.to_JSON())
             f.write('[%s]' % ','.join(data))
+
+    def clear(self):
+        with open(self._file_path, 'w') as f:
+            f.write('[]')
+
+
+class JSONLinesPersistenceBackend(PersistenceBackend):
+
+    """
+    A `PersistenceBackend` saving data to JSON Lines segment files into a
+    directory: each line of a segment holds the JSON representation of a
+    *pyowm.stationsapi30.measurement.Measurement* object.
+
+    As with `JSONPersistenceBackend`, persisting a buffer replaces the saved
+    data; but appending a buffer (`append_buffer`) writes its measurements at
+    the end of the last segment - which are then usually dropped from the
+    buffer - so the cost of each append only depends on the number of new
+    measurements. Once a segment holds *segment_size* measurements, a new one
+    is started. Data is flushed on every append, while it is synced to disk
+    once every *sync_every* measurements and when the backend is closed.
+
+    Segments can be read back in chunks of bounded size and older segments can
+    be compacted into a single one, optionally dropping old measurements.
+
+    :param dir_path: path to the directory holding the segment files
+    :type dir_path: str
+    :param station_id: unique OWM-provided ID of the station whose data is read/saved
+    :type station_id: str
+    :param segment_size: max number of measurements per segment. Defaults to
+        10000
+    :type segment_size: int
+    :param sync_every: number of measurements after which data is synced to
+        disk. Defaults to 100, use 1 to sync on every save
+    :type sync_every: int
+    """
+
+    SEGMENT_FILENAME = 'segment-%08d.jsonl'
+    _SEGMENT_FILENAME_REGEX = re.compile(r'^segment-(\d{8})\.jsonl$')
+
+    def __init__(self, dir_path, station_id, segment_size=10000,
+                 sync_every=100):
+        assert dir_path is not None
+        assert os.path.isdir(dir_path)
+        assert isinstance(segment_size, int) and segment_size > 0
+        assert isinstance(sync_every, int) and sync_every > 0
+        self._dir_path = dir_path
+        self._station_id = station_id
+        self._segment_size = segment_size
+        self._sync_every = sync_every
+        self._file = None
+        self._unsynced = 0
+        numbers = self._segment_numbers()
+        self._active_number = numbers[-1] if numbers else 1
+        self._active_lines = self._repair_segment(self._active_number)
+
+    def segment_paths(self):
+        """
+        Returns the paths of the segment files, from the oldest to the newest
+
+        :returns: list of str
+        """
+        return [self._segment_path(n) for n in self._segment_numbers()]
+
+    def load_to_buffer(self):
+        if self._station_id is None:
+            raise ValueError('No station ID specified')
+        result = Buffer(self._station_id)
+        for _dict in self._iter_dicts():
+            result.append_from_dict(_dict)
+        return result
+
+    def iter_buffers(self, chunk_size=1000):
+        """
+        Reads meteostation measurement data into a sequence of
+        *pyowm.stationsapi30.buffer.Buffer* objects, each one holding at most
+        the specified number of measurements. Segments are read lazily, so
+        that only one buffer at a time is kept in memory.
+
+        :param chunk_size: max number of measurements per buffer
+        :type chunk_size: int
+        :returns: a generator of *pyowm.stationsapi30.buffer.Buffer* instances
+        :raises: *ValueError* when no station ID is specified
+        """
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        if self._station_id is None:
+            raise ValueError('No station ID specified')
+        result = Buffer(self._station_id)
+        for _dict in self._iter_dicts():
+            result.append_from_dict(_dict)
+            if len(result) == chunk_size:
+                yield result
+                result = Buffer(self._station_id)
+        if len(result):
+            yield result
+
+    def persist_buffer(self, buffer):
+        # data is written to new segments before the old ones are deleted, so
+        # that a crash can only lead to duplicates
+        old_numbers = self._segment_numbers()
+        self.close()
+        self._active_number = old_numbers[-1] + 1 if old_numbers else 1
+        self._active_lines = 0
+        self.append_buffer(buffer)
+        self.sync()
+        for number in old_numbers:
+            os.remove(self._segment_path(number))
+
+    def append_buffer(self, buffer):
+        for msmt in buffer:
+            if self._active_lines >= self._segment_size:
+                self._seal_active_segment()
+            if self._file is None:
+                self._file = open(self._segment_path(self._active_number),
+                                  'a', encoding='utf-8')
+            self._file.write(msmt.to_JSON() + '\n')
+            self._active_lines += 1
+            self._unsynced += 1
+        if self._file is not None:
+            self._file.flush()
+            if self._unsynced >= self._sync_every:
+                self.sync()
+
+    def discard_first(self, count):
+        """
+        Deletes the first saved measurements, from the oldest segment onwards
+        (eg: the ones which have already been sent). Segments holding only
+        deleted measurements are removed, while the segment holding the last
+        of them is rewritten: the other segments are left untouched, so that
+        saved data is never loaded into memory at once.
+
+        :param count: number of measurements to be deleted
+        :type count: int
+        :returns: the int number of deleted measurements
+        """
+        assert isinstance(count, int) and count >= 0
+        self.close()
+        discarded = 0
+        for number in self._segment_numbers():
+            if discarded == count:
+                break
+            path = self._segment_path(number)
+            lines = sum(1 for _ in self._iter_lines(number))
+            if discarded + lines <= count:
+                os.remove(path)
+                discarded += lines
+                if number == self._active_number:
+                    self._active_lines = 0
+                continue
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as out:
+                for line in itertools.islice(self._iter_lines(number),
+                                             count - discarded, None):
+                    out.write(line)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp_path, path)
+            if number == self._active_number:
+                self._active_lines = lines - (count - discarded)
+            discarded = count
+        return discarded
+
+    def clear(self):
+        self.close()
+        for path in self.segment_paths():
+            os.remove(path)
+        self._active_number = 1
+        self._active_lines = 0
+
+    def sync(self):
+        """
+        Forces the data saved so far to be written to disk
+
+        """
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """
+        Syncs the data saved so far to disk and releases the open segment
+        file. The backend can still be used afterwards.
+
+        """
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def compact(self, older_than=None):
+        """
+        Merges all of the segments but the newest one into a single segment,
+        optionally dropping the measurements recorded before the specified
+        time. Measurements are never lost if compaction is interrupted, but
+        some of them might then be found twice.
+
+        :param older_than: UNIX time: measurements having an earlier timestamp
+            are dropped. Defaults to `None`, meaning that no measurement is
+            dropped
+        :type older_than: int or `None`
+        :returns: the int number of dropped measurements
+        """
+        sealed = [n for n in self._segment_numbers()
+                  if n != self._active_number]
+        if not sealed:
+            return 0
+        target = self._segment_path(sealed[0])
+        temp_path = target + '.tmp'
+        dropped = 0
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for number in sealed:
+                for line in self._iter_lines(number):
+                    if older_than is not None and \
+                            json.loads(line)['timestamp'] < older_than:
+                        dropped += 1
+                        continue
+                    out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+            is_empty = out.tell() == 0
+        # the merged segment replaces the first one before the others are
+        # deleted, so that a crash can only lead to duplicates
+        if is_empty:
+            os.remove(temp_path)
+            os.remove(target)
+        else:
+            os.replace(temp_path, target)
+        for number in sealed[1:]:
+            os.remove(self._segment_path(number))
+        return dropped
+
+    def __repr__(self):
+        return '<%s.%s - dir_path=%s, segments=%s>' % (
+            __name__, self.__class__.__name__, self._dir_path,
+            len(self._segment_numbers()))
+
+    def _segment_path(self, number):
+        return os.path.join(self._dir_path, self.SEGMENT_FILENAME % number)
+
+    def _segment_numbers(self):
+        numbers = []
+        for filename in os.listdir(self._dir_path):
+            match = self._SEGMENT_FILENAME_REGEX.match(filename)
+            if match is not None:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _seal_active_segment(self):
+        self.close()
+        self._active_number += 1
+        self._active_lines = 0
+
+    def _repair_segment(self, number):
+        # drops the leftover of an interrupted write, so that new lines are
+        # not appended to it, and returns the number of complete lines
+        path = self._segment_path(number)
+        if not os.path.isfile(path):
+            return 0
+        lines = 0
+        valid_size = 0
+        with open(path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                lines += 1
+                valid_size += len(line)
+            f.truncate(valid_size)
+        return lines
+
+    def _iter_lines(self, number):
+        path = self._segment_path(number)
+        if not os.path.isfile(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # an unterminated line is the leftover of an interrupted write
+                if line.endswith('\n'):
+                    yield line
+
+    def _iter_dicts(self):
+        if self._file is not None:
+            self._file.flush()
+        for number in self._segment_numbers():
+            for line in self._iter_lines(number):
+                yield json.loads(line)
+
+
+class SQLitePersistenceBackend(PersistenceBackend):
+
+    """
+    A `PersistenceBackend` loading/saving data to a SQLite database. Each
+    *pyowm.stationsapi30.measurement.Measurement* object is stored as a row
+    holding its station ID, its timestamp and its JSON representation, rows
+    being indexed by station ID and timestamp: this way measurements of any
+    station recorded in any time window can be loaded or deleted without
+    reading the whole history.
+
+    :param db_path: path to the SQLite database file, which is created if it
+        does not exist (use ``:memory:`` for an in-memory database)
+    :type db_path: str
+    :param station_id: unique OWM-provided ID of the station whose data is
+        read/deleted by default
+    :type station_id: str
+
+    The backend can be used from multiple threads (eg: by a
+    *pyowm.stationsapi30.ingestion.IngestionPipeline*), as accesses to the
+    database connection are serialized.
+    """
+
+    def __init__(self, db_path, station_id):
+        assert db_path is not None
+        self._db_path = db_path
+        self._station_id = station_id
+        # the connection is shared among threads, guarded by the lock
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS measurements ('
+                'station_id TEXT NOT NULL, '
+                'timestamp INTEGER NOT NULL, '
+                'data TEXT NOT NULL)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS measurements_station_timestamp '
+                'ON measurements (station_id, timestamp)')
+
+    def load_to_buffer(self, from_timestamp=None, to_timestamp=None,
+                       station_id=None):
+        """
+        Reads meteostation measurement data recorded in the specified time
+        window into a *pyowm.stationsapi30.buffer.Buffer* object, sorted
+        chronologically.
+
+        :param from_timestamp: UNIX time of the beginning of the time window.
+            Defaults to `None`, meaning that the window is unbounded
+        :type from_timestamp: int or `None`
+        :param to_timestamp: UNIX time of the end of the time window, which is
+            included. Defaults to `None`, meaning that the window is unbounded
+        :type to_timestamp: int or `None`
+        :param station_id: ID of the station whose data is to be read.
+            Defaults to the station ID the backend was created with
+        :type station_id: str
+        :returns: a *pyowm.stationsapi30.buffer.Buffer* instance
+        :raises: *ValueError* when no station ID is specified or the end of
+            the time window is earlier than its beginning
+        """
+        where, params = self._where(from_timestamp, to_timestamp, station_id)
+        result = Buffer(params[0])
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT data FROM measurements WHERE %s '
+                'ORDER BY timestamp, rowid' % where, params).fetchall()
+        for row in rows:
+            result.append_from_dict(json.loads(row[0]))
+        return result
+
+    def iter_buffers(self, chunk_size=1000, station_id=None):
+        """
+        Reads meteostation measurement data into a sequence of
+        *pyowm.stationsapi30.buffer.Buffer* objects, each one holding at most
+        the specified number of measurements, sorted chronologically. Rows are
+        read one page at a time, so that only one buffer at a time is kept in
+        memory.
+
+        :param chunk_size: max number of measurements per buffer
+        :type chunk_size: int
+        :param station_id: ID of the station whose data is to be read.
+            Defaults to the station ID the backend was created with
+        :type station_id: str
+        :returns: a generator of *pyowm.stationsapi30.buffer.Buffer* instances
+        :raises: *ValueError* when no station ID is specified
+        """
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        where, params = self._where(None, None, station_id)
+        # keyset pagination: each page starts after the last row of the
+        # previous one
+        last_timestamp, last_rowid = None, None
+        while True:
+            if last_rowid is None:
+                page_where, page_params = where, params
+            else:
+                page_where = where + ' AND (timestamp > ? OR ' \
+                    '(timestamp = ? AND rowid > ?))'
+                page_params = params + [last_timestamp, last_timestamp,
+                                        last_rowid]
+            with self._lock:
+                rows = self._connection.execute(
+                    'SELECT timestamp, rowid, data FROM measurements '
+                    'WHERE %s ORDER BY timestamp, rowid LIMIT ?'
+                    % page_where, page_params + [chunk_size]).fetchall()
+            if not rows:
+                return
+            result = Buffer(params[0])
+            for row in rows:
+                result.append_from_dict(json.loads(row[2]))
+            yield result
+            if len(rows) < chunk_size:
+                return
+            last_timestamp, last_rowid = rows[-1][0], rows[-1][1]
+
+    def persist_buffer(self, buffer):
+        """
+        Saves data contained into a *pyowm.stationsapi30.buffer.Buffer* object
+        into the database, replacing the stored measurements of the station of
+        the buffer, within a single transaction
+
+        :param buffer: the Buffer object to be persisted
+        :type buffer:  *pyowm.stationsapi30.buffer.Buffer* instance
+
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM measurements WHERE station_id = ?',
+                (buffer.station_id,))
+            self._insert(buffer)
+
+    def delete(self, from_timestamp=None, to_timestamp=None, station_id=None):
+        """
+        Deletes the stored measurements recorded in the specified time window
+        (eg: the ones which have already been sent to the API)
+
+        :param from_timestamp: UNIX time of the beginning of the time window.
+            Defaults to `None`, meaning that the window is unbounded
+        :type from_timestamp: int or `None`
+        :param to_timestamp: UNIX time of the end of the time window, which is
+            included. Defaults to `None`, meaning that the window is unbounded
+        :type to_timestamp: int or `None`
+        :param station_id: ID of the station whose data is to be deleted.
+            Defaults to the station ID the backend was created with
+        :type station_id: str
+        :returns: the int number of deleted measurements
+        :raises: *ValueError* when no station ID is specified or the end of
+            the time window is earlier than its beginning
+        """
+        where, params = self._where(from_timestamp, to_timestamp, station_id)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'DELETE FROM measurements WHERE %s' % where, params)
+        return cursor.rowcount
+
+    def discard_first(self, count, station_id=None):
+        """
+        Deletes the first stored measurements, sorted chronologically as they
+        are read by `iter_buffers` (eg: the ones which have already been sent)
+
+        :param count: number of measurements to be deleted
+        :type count: int
+        :param station_id: ID of the station whose data is to be deleted.
+            Defaults to the station ID the backend was created with
+        :type station_id: str
+        :returns: the int number of deleted measurements
+        :raises: *ValueError* when no station ID is specified
+        """
+        assert isinstance(count, int) and count >= 0
+        where, params = self._where(None, None, station_id)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'DELETE FROM measurements WHERE rowid IN ('
+                'SELECT rowid FROM measurements WHERE %s '
+                'ORDER BY timestamp, rowid LIMIT ?)' % where,
+                params + [count])
+        return cursor.rowcount
+
+    def append_buffer(self, buffer):
+        """
+        Adds data contained into a *pyowm.stationsapi30.buffer.Buffer* object
+        to the stored measurements, within a single transaction
+
+        :param buffer: the Buffer object whose data is to be added
+        :type buffer:  *pyowm.stationsapi30.buffer.Buffer* instance
+
+        """
+        with self._lock, self._connection:
+            self._insert(buffer)
+
+    def clear(self):
+        """
+        Deletes all of the stored measurements of the station the backend was
+        created with
+
+        """
+        self.delete()
+
+    def station_ids(self):
+        """
+        Returns the IDs of the stations having stored measurements
+
+        :returns: list of str
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT DISTINCT station_id FROM measurements '
+                'ORDER BY station_id').fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """
+        Closes the connection to the database
+
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self):
+        return '<%s.%s - db_path=%s>' % (__name__, self.__class__.__name__,
+                                         self._db_path)
+
+    def _insert(self, buffer):
+        rows = ((msmt.station_id, msmt.timestamp, msmt.to_JSON())
+                for msmt in buffer)
+        self._connection.executemany(
+            'INSERT INTO measurements (station_id, timestamp, data) '
+            'VALUES (?, ?, ?)', rows)
+
+    def _where(self, from_timestamp, to_timestamp, station_id):
+        if station_id is None:
+            station_id = self._station_id
+        if station_id is None:
+            raise ValueError('No station ID specified')
+        if from_timestamp is not None and to_timestamp is not None \
+                and to_timestamp < from_timestamp:
+            raise ValueError("End timestamp can't be earlier than begin "
+                             "timestamp")
+        clauses = ['station_id = ?']
+        params = [station_id]
+        if from_timestamp is not None:
+            clauses.append('timestamp >= ?')
+            params.append(from_timestamp)
+        if to_timestamp is not None:
+            clauses.append('timestamp <= ?')
+            params.append(to_timestamp)
+        return ' AND '.join(clauses), params
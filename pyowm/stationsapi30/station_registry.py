@@ -0,0 +1,134 @@
+"""
+Module containing a local registry of the stations of a Stations API user
+"""
+
+import threading
+import time
+
+
+DEFAULT_TTL = 300
+
+
+class StationRegistry(object):
+    """
+    Thread-safe local registry of *pyowm.stationsapi30.station.Station*
+    objects, indexed by their OWM ID and by their external ID. The registry
+    keeps track of when it was last fully loaded, so that it can tell if its
+    contents are older than the specified time-to-live.
+
+    :param ttl: seconds after a full load after which the registry is stale.
+        Defaults to 300
+    :type ttl: int or float
+    :returns: a *StationRegistry* instance
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        assert ttl is not None and ttl >= 0
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._by_id = dict()
+        self._by_external_id = dict()
+        self._loaded_at = None
+
+    def is_stale(self):
+        """
+        Tells if the registry was never fully loaded or it was last fully
+        loaded more than *ttl* seconds ago
+
+        :returns: bool
+        """
+        with self._lock:
+            return self._loaded_at is None or \
+                time.monotonic() - self._loaded_at >= self.ttl
+
+    def load(self, stations):
+        """
+        Replaces the contents of the registry with the specified stations,
+        which are supposed to be all of the stations of the user
+
+        :param stations: the stations
+        :type stations: iterable of *pyowm.stationsapi30.station.Station*
+        """
+        with self._lock:
+            self._by_id = dict()
+            self._by_external_id = dict()
+            for station in stations:
+                self.put(station)
+            self._loaded_at = time.monotonic()
+
+    def put(self, station):
+        """
+        Adds a station to the registry, replacing the one having the same ID
+
+        :param station: the station
+        :type station: *pyowm.stationsapi30.station.Station*
+        """
+        assert station is not None and station.id is not None
+        with self._lock:
+            self.remove(station.id)
+            self._by_id[station.id] = station
+            self._by_external_id[station.external_id] = station
+
+    def remove(self, station_id):
+        """
+        Removes the station having the specified ID from the registry, if any
+
+        :param station_id: the OWM ID of the station
+        :type station_id: str
+        """
+        with self._lock:
+            station = self._by_id.pop(station_id, None)
+            if station is not None and \
+                    self._by_external_id.get(station.external_id) is station:
+                del self._by_external_id[station.external_id]
+
+    def get(self, station_id):
+        """
+        Returns the station having the specified OWM ID
+
+        :param station_id: the OWM ID of the station
+        :type station_id: str
+        :returns: a *pyowm.stationsapi30.station.Station* or `None`
+        """
+        with self._lock:
+            return self._by_id.get(station_id)
+
+    def get_by_external_id(self, external_id):
+        """
+        Returns the station having the specified external ID
+
+        :param external_id: the user-given ID of the station
+        :type external_id: str
+        :returns: a *pyowm.stationsapi30.station.Station* or `None`
+        """
+        with self._lock:
+            return self._by_external_id.get(external_id)
+
+    def stations(self):
+        """
+        Returns all of the stations in the registry
+
+        :returns: list of *pyowm.stationsapi30.station.Station*
+        """
+        with self._lock:
+            return list(self._by_id.values())
+
+    def invalidate(self):
+        """
+        Makes the registry stale, so that it is loaded again on next use
+
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._by_id)
+
+    def __contains__(self, station_id):
+        with self._lock:
+            return station_id in self._by_id
+
+    def __repr__(self):
+        return '<%s.%s - stations=%s, stale=%s>' % (
+            __name__, self.__class__.__name__, len(self), self.is_stale())
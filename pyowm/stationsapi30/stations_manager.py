@@ -3,10 +3,15 @@ Object that can read/write meteostations metadata and extract related
 measurements
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pyowm.commons.http_client import HttpClient
 from pyowm.stationsapi30.parsers.station_parser import StationParser
 from pyowm.stationsapi30.parsers.aggregated_measurement_parser import AggregatedMeasurementParser
 from pyowm.stationsapi30.uris import STATIONS_URI, NAMED_STATION_URI, MEASUREMENTS_URI
+from pyowm.stationsapi30 import encoder, upload
+from pyowm.stationsapi30.station_registry import StationRegistry, DEFAULT_TTL
+from pyowm.stationsapi30.aggregation import AGGREGATION_PERIODS
 from pyowm.constants import STATIONS_API_VERSION
 
 
@@ -17,16 +22,26 @@ class StationsManager(object):
     it implements CRUD methods on Station entities and the corresponding
     measured datapoints.
 
+    Stations are also kept into a local registry, which is refreshed from the
+    API at most once every *stations_ttl* seconds and updated whenever
+    stations are created, updated or deleted through the manager: the
+    `lookup_*` methods read from it, without calling the API as long as it is
+    fresh.
+
     :param API_key: the OWM Weather API key
     :type API_key: str
+    :param stations_ttl: seconds the local registry of stations is used for
+        before being refreshed. Defaults to 300
+    :type stations_ttl: int or float
     :returns: a *StationsManager* instance
     :raises: *AssertionError* when no API Key is provided
 
     """
 
-    def __init__(self, API_key):
+    def __init__(self, API_key, stations_ttl=DEFAULT_TTL):
         assert API_key is not None, 'You must provide a valid API Key'
         self.API_key = API_key
+        self.stations_registry = StationRegistry(ttl=stations_ttl)
         self.stations_parser = StationParser()
         self.aggregated_measurements_parser = AggregatedMeasurementParser()
         self.http_client = HttpClient()
@@ -48,7 +63,9 @@ class StationsManager(object):
             STATIONS_URI,
             params={'appid': self.API_key},
             headers={'Content-Type': 'application/json'})
-        return [self.stations_parser.parse_dict(item) for item in data]
+        stations = [self.stations_parser.parse_dict(item) for item in data]
+        self.stations_registry.load(stations)
+        return stations
 
     def get_station(self, id):
         """
@@ -63,7 +80,53 @@ class StationsManager(object):
             NAMED_STATION_URI % str(id),
             params={'appid': self.API_key},
             headers={'Content-Type': 'application/json'})
-        return self.stations_parser.parse_dict(data)
+        station = self.stations_parser.parse_dict(data)
+        self.stations_registry.put(station)
+        return station
+
+    def lookup_stations(self):
+        """
+        Returns all of the user's stations, as found in the local registry.
+        The registry is refreshed from the Stations API if stale.
+
+        :returns: list of *pyowm.stationsapi30.station.Station* objects
+        """
+        self._refresh_stations_registry()
+        return self.stations_registry.stations()
+
+    def lookup_station(self, id):
+        """
+        Returns the station having the specified ID, as found in the local
+        registry. The registry is refreshed from the Stations API if stale,
+        and stations missing from it are retrieved from the API.
+
+        :param id: the ID of the station
+        :type id: str
+        :returns: a *pyowm.stationsapi30.station.Station* object
+        """
+        self._refresh_stations_registry()
+        station = self.stations_registry.get(id)
+        if station is None:
+            station = self.get_station(id)
+        return station
+
+    def lookup_station_by_external_id(self, external_id):
+        """
+        Returns the station having the specified user-given ID, as found in
+        the local registry. The registry is refreshed from the Stations API
+        if stale.
+
+        :param external_id: the user-given ID of the station
+        :type external_id: str
+        :returns: a *pyowm.stationsapi30.station.Station* object or `None` if
+          no such station exists
+        """
+        self._refresh_stations_registry()
+        return self.stations_registry.get_by_external_id(external_id)
+
+    def _refresh_stations_registry(self):
+        if self.stations_registry.is_stale():
+            self.get_stations()
 
     def create_station(self, external_id, name, lat, lon, alt=None):
         """
@@ -98,7 +161,9 @@ class StationsManager(object):
             data=dict(external_id=external_id, name=name, lat=lat,
                       lon=lon, alt=alt),
             headers={'Content-Type': 'application/json'})
-        return self.stations_parser.parse_dict(payload)
+        station = self.stations_parser.parse_dict(payload)
+        self.stations_registry.put(station)
+        return station
 
     def update_station(self, station):
         """
@@ -116,6 +181,7 @@ class StationsManager(object):
             data=dict(external_id=station.external_id, name=station.name,
                       lat=station.lat, lon=station.lon, alt=station.alt),
             headers={'Content-Type': 'application/json'})
+        self.stations_registry.put(station)
 
     def delete_station(self, station):
         """
@@ -132,6 +198,7 @@ class StationsManager(object):
             NAMED_STATION_URI % str(station.id),
             params={'appid': self.API_key},
             headers={'Content-Type': 'application/json'})
+        self.stations_registry.remove(station.id)
 
     # Measurements-related methods
 
@@ -146,11 +213,7 @@ class StationsManager(object):
         """
         assert measurement is not None
         assert measurement.station_id is not None
-        status, _ = self.http_client.post(
-            MEASUREMENTS_URI,
-            params={'appid': self.API_key},
-            data=[self._structure_dict(measurement)],
-            headers={'Content-Type': 'application/json'})
+        self._post_measurements([measurement])
 
     def send_measurements(self, list_of_measurements):
         """
@@ -165,12 +228,50 @@ class StationsManager(object):
         """
         assert list_of_measurements is not None
         assert all([m.station_id is not None for m in list_of_measurements])
-        msmts = [self._structure_dict(m) for m in list_of_measurements]
-        status, _ = self.http_client.post(
-            MEASUREMENTS_URI,
-            params={'appid': self.API_key},
-            data=msmts,
-            headers={'Content-Type': 'application/json'})
+        self._post_measurements(list_of_measurements)
+
+    def send_measurements_in_chunks(self, list_of_measurements,
+                                    chunk_size=upload.DEFAULT_CHUNK_SIZE,
+                                    max_workers=upload.DEFAULT_MAX_WORKERS,
+                                    max_retries=upload.DEFAULT_MAX_RETRIES,
+                                    retry_delay=upload.DEFAULT_RETRY_DELAY):
+        """
+        Posts data about the provided Measurement objects to the Station API
+        in chunks of bounded size, which are posted concurrently. Chunks
+        whose post fails because of timeouts, connection failures, rate
+        limiting or server-side errors are posted again, one by one: failures
+        do not affect the other chunks and are reported instead of being
+        raised.
+
+        :param list_of_measurements: *pyowm.stationsapi30.measurement.Measurement*
+          objects to be posted
+        :type list_of_measurements: iterable of *pyowm.stationsapi30.measurement.Measurement*
+          instances
+        :param chunk_size: max number of measurements per post. Defaults to 500
+        :type chunk_size: int
+        :param max_workers: max number of concurrent posts. Defaults to 4
+        :type max_workers: int
+        :param max_retries: max number of times a failed chunk is posted
+          again. Defaults to 2
+        :type max_retries: int
+        :param retry_delay: seconds to wait before the first retry of a chunk,
+          doubling at each further retry. Defaults to 1
+        :type retry_delay: float
+        :returns: list of *pyowm.stationsapi30.upload.ChunkUploadResult*
+          objects, one per chunk and in the same order as the measurements
+        :raises: *ValueError* when any of the chunking parameters is invalid
+        """
+        assert list_of_measurements is not None
+        if isinstance(list_of_measurements, (list, tuple)):
+            assert all([m.station_id is not None for m in list_of_measurements])
+        else:
+            # iterators are checked while being consumed
+            list_of_measurements = self._with_station_ids(list_of_measurements)
+        uploader = upload.ChunkedUploader(
+            self._post_measurements, chunk_size=chunk_size,
+            max_workers=max_workers, max_retries=max_retries,
+            retry_delay=retry_delay)
+        return uploader.upload(list_of_measurements)
 
     def get_measurements(self, station_id, aggregated_on, from_timestamp,
                          to_timestamp, limit=100):
@@ -216,54 +317,164 @@ class StationsManager(object):
             headers={'Content-Type': 'application/json'})
         return [self.aggregated_measurements_parser.parse_dict(item) for item in data]
 
+    def iter_measurements(self, station_id, aggregated_on, from_timestamp,
+                          to_timestamp, limit=100, max_workers=4):
+        """
+        Iterates over all of the measurements of a specified station recorded
+        in the specified time window and aggregated on minute, hour or day,
+        regardless of how many they are.
+
+        The time window is split into consecutive sub-windows, each one
+        spanning as many aggregation periods as the max number of items
+        returned by each API call: sub-windows are fetched concurrently, and
+        again from their last returned measurement on in case they hold more
+        items than expected. Measurements are yielded in chronological order
+        and without duplicates, while only a bounded number of sub-windows is
+        kept in memory.
+
+        :param station_id: unique station identifier
+        :type station_id: str
+        :param aggregated_on: aggregation time-frame for this measurement
+        :type aggregated_on: string between 'm','h' and 'd'
+        :param from_timestamp: Unix timestamp corresponding to the beginning of
+          the time window
+        :type from_timestamp: int
+        :param to_timestamp: Unix timestamp corresponding to the end of the
+          time window
+        :type to_timestamp: int
+        :param limit: max number of items returned by each API call. Defaults
+          to 100
+        :type limit: int
+        :param max_workers: max number of concurrent API calls. Defaults to 4
+        :type max_workers: int
+        :returns: a generator of
+          *pyowm.stationsapi30.measurement.AggregatedMeasurement* objects
+        :raises: *ValueError* when the time window or the aggregation
+          time-frame are invalid
+        """
+        assert station_id is not None
+        assert aggregated_on is not None
+        assert from_timestamp is not None
+        assert from_timestamp > 0
+        assert to_timestamp is not None
+        assert to_timestamp > 0
+        if to_timestamp < from_timestamp:
+            raise ValueError("End timestamp can't be earlier than begin timestamp")
+        if aggregated_on not in AGGREGATION_PERIODS:
+            raise ValueError("Aggregation time-frame must be one of: %s"
+                             % ', '.join(sorted(AGGREGATION_PERIODS)))
+        assert isinstance(limit, int)
+        assert limit > 0
+        assert isinstance(max_workers, int)
+        assert max_workers > 0
+        return self._iter_measurements(station_id, aggregated_on,
+                                       from_timestamp, to_timestamp, limit,
+                                       max_workers)
+
+    def _iter_measurements(self, station_id, aggregated_on, from_timestamp,
+                           to_timestamp, limit, max_workers):
+        last_timestamp = None
+        for items in self._iter_window_measurements(
+                station_id, aggregated_on, from_timestamp, to_timestamp,
+                limit, max_workers):
+            for item in items:
+                # consecutive sub-windows may overlap on their boundaries
+                if last_timestamp is None or item.timestamp > last_timestamp:
+                    last_timestamp = item.timestamp
+                    yield item
+
+    def _iter_window_measurements(self, station_id, aggregated_on,
+                                  from_timestamp, to_timestamp, limit,
+                                  max_workers):
+        span = AGGREGATION_PERIODS[aggregated_on] * limit
+        windows = ((start, min(start + span - 1, to_timestamp))
+                   for start in range(from_timestamp, to_timestamp + 1, span))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # sub-windows are consumed in order, so that results stay sorted
+            pending = deque()
+            for window_from, window_to in windows:
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(
+                    self._get_window_measurements, station_id, aggregated_on,
+                    window_from, window_to, limit))
+            while pending:
+                yield pending.popleft().result()
+
+    def _get_window_measurements(self, station_id, aggregated_on,
+                                 from_timestamp, to_timestamp, limit):
+        result = []
+        while True:
+            items = self.get_measurements(station_id, aggregated_on,
+                                          from_timestamp, to_timestamp,
+                                          limit=limit)
+            items.sort(key=lambda m: m.timestamp)
+            result.extend(items)
+            if len(items) < limit or items[-1].timestamp >= to_timestamp:
+                return result
+            # the window holds more items than expected
+            from_timestamp = items[-1].timestamp + 1
+
     def send_buffer(self, buffer):
         """
         Posts to the Stations API data about the Measurement objects contained
         into the provided Buffer instance.
 
-        :param buffer: the *pyowm.stationsapi30.buffer.Buffer* instance whose
+        :param buffer: the *pyowm.stationsapi30.buffer.Buffer* or
+          *pyowm.stationsapi30.buffer.ColumnarBuffer* instance whose
           measurements are to be posted
-        :type buffer: *pyowm.stationsapi30.buffer.Buffer* instance
+        :type buffer: *pyowm.stationsapi30.buffer.Buffer* or
+          *pyowm.stationsapi30.buffer.ColumnarBuffer* instance
         :returns: `None` if creation is successful, an exception otherwise
         """
         assert buffer is not None
-        msmts = [self._structure_dict(m) for m in buffer.measurements]
+        self._post_measurements(buffer)
+
+    def send_buffer_in_chunks(self, buffer,
+                              chunk_size=upload.DEFAULT_CHUNK_SIZE,
+                              max_workers=upload.DEFAULT_MAX_WORKERS,
+                              max_retries=upload.DEFAULT_MAX_RETRIES,
+                              retry_delay=upload.DEFAULT_RETRY_DELAY):
+        """
+        Posts to the Stations API data about the Measurement objects contained
+        into the provided Buffer instance, in chunks of bounded size which are
+        posted concurrently. See `send_measurements_in_chunks` for details.
+
+        :param buffer: the *pyowm.stationsapi30.buffer.Buffer* or
+          *pyowm.stationsapi30.buffer.ColumnarBuffer* instance whose
+          measurements are to be posted
+        :type buffer: *pyowm.stationsapi30.buffer.Buffer* or
+          *pyowm.stationsapi30.buffer.ColumnarBuffer* instance
+        :param chunk_size: max number of measurements per post. Defaults to 500
+        :type chunk_size: int
+        :param max_workers: max number of concurrent posts. Defaults to 4
+        :type max_workers: int
+        :param max_retries: max number of times a failed chunk is posted
+          again. Defaults to 2
+        :type max_retries: int
+        :param retry_delay: seconds to wait before the first retry of a chunk,
+          doubling at each further retry. Defaults to 1
+        :type retry_delay: float
+        :returns: list of *pyowm.stationsapi30.upload.ChunkUploadResult*
+          objects, one per chunk and in the same order as the measurements
+        :raises: *ValueError* when any of the chunking parameters is invalid
+        """
+        assert buffer is not None
+        return self.send_measurements_in_chunks(
+            buffer, chunk_size=chunk_size, max_workers=max_workers,
+            max_retries=max_retries, retry_delay=retry_delay)
+
+    @staticmethod
+    def _with_station_ids(measurements):
+        for m in measurements:
+            assert m.station_id is not None
+            yield m
+
+    def _post_measurements(self, measurements):
+        # measurements are encoded in bulk and streamed as the JSON payload,
+        # one batch at a time: a retried post encodes them again
         status, _ = self.http_client.post(
             MEASUREMENTS_URI,
             params={'appid': self.API_key},
-            data=msmts,
+            data=encoder.iter_encode(measurements),
             headers={'Content-Type': 'application/json'})
-
-    def _structure_dict(self, measurement):
-        d = measurement.to_dict()
-        item = dict()
-        item['station_id'] = d['station_id']
-        item['dt'] = d['timestamp']
-        item['temperature'] = d['temperature']
-        item['wind_speed'] = d['wind_speed']
-        item['wind_gust'] = d['wind_gust']
-        item['wind_deg'] = d['wind_deg']
-        item['pressure'] = d['pressure']
-        item['humidity'] = d['humidity']
-        item['rain_1h'] = d['rain_1h']
-        item['rain_6h'] = d['rain_6h']
-        item['rain_24h'] = d['rain_24h']
-        item['snow_1h'] = d['snow_1h']
-        item['snow_6h'] = d['snow_6h']
-        item['snow_24h'] = d['snow_24h']
-        item['dew_point'] = d['dew_point']
-        item['humidex'] = d['humidex']
-        item['heat_index'] = d['heat_index']
-        item['visibility_distance'] = d['visibility_distance']
-        item['visibility_prefix'] = d['visibility_prefix']
-        item['clouds'] = [dict(distance=d['clouds_distance']),
-                          dict(condition=d['clouds_condition']),
-                          dict(cumulus=d['clouds_cumulus'])]
-        item['weather'] = [
-            dict(precipitation=d['weather_precipitation']),
-            dict(descriptor=d['weather_descriptor']),
-            dict(intensity=d['weather_intensity']),
-            dict(proximity=d['weather_proximity']),
-            dict(obscuration=d['weather_obscuration']),
-            dict(other=d['weather_other'])]
-        return item
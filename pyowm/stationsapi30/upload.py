@@ -0,0 +1,174 @@
+"""
+Module containing classes for uploading large amounts of measurements to the
+Stations API in size-bounded chunks, posted concurrently
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from pyowm.exceptions import api_call_error
+from pyowm.utils.lazyutils import LazyModule
+
+# requests is only imported when a failed post is to be told apart
+requests = LazyModule('requests')
+
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_DELAY = 1.0
+
+
+class ChunkUploadResult(object):
+    """
+    The outcome of the upload of a chunk of measurements
+
+    :param index: position of the chunk among the uploaded chunks, starting
+        from 0
+    :type index: int
+    :param measurements: the *pyowm.stationsapi30.measurement.Measurement*
+        objects of the chunk
+    :type measurements: list
+    :param attempts: how many times the chunk has been posted
+    :type attempts: int
+    :param error: the exception raised by the last failed post, or `None` if
+        the chunk was uploaded
+    :type error: Exception or `None`
+    :returns: a *ChunkUploadResult* instance
+    """
+
+    def __init__(self, index, measurements, attempts, error=None):
+        self.index = index
+        self.size = len(measurements)
+        self.attempts = attempts
+        self.error = error
+        # measurements are retained only when they need to be sent again
+        self.measurements = None if error is None else measurements
+
+    @property
+    def succeeded(self):
+        """
+        Tells if the chunk was uploaded
+
+        :returns: bool
+        """
+        return self.error is None
+
+    def __repr__(self):
+        return "<%s.%s - index=%s, size=%s, attempts=%s, succeeded=%s>" % (
+            __name__, self.__class__.__name__, self.index, self.size,
+            self.attempts, self.succeeded)
+
+
+class ChunkedUploader(object):
+    """
+    Posts measurements to the Stations API in chunks holding at most the
+    specified number of measurements. Chunks are posted concurrently by a
+    bounded pool of worker threads and are built while iterating over the
+    measurements, so that only a bounded number of them is held in memory at
+    any time. A chunk whose post fails because of a timeout, a connection
+    failure, rate limiting (HTTP 429) or a server-side error (HTTP 5xx) is
+    retried on its own, without affecting the other chunks: any other error
+    (eg: an invalid payload) fails the chunk right away.
+
+    :param post_chunk: function posting a list of measurements to the API
+    :type post_chunk: function
+    :param chunk_size: max number of measurements per chunk
+    :type chunk_size: int
+    :param max_workers: max number of chunks being posted at the same time
+    :type max_workers: int
+    :param max_retries: max number of times a failed chunk is posted again
+    :type max_retries: int
+    :param retry_delay: seconds to wait before the first retry of a chunk,
+        doubling at each further retry
+    :type retry_delay: float
+    :returns: a *ChunkedUploader* instance
+    :raises: *ValueError* when any of the parameters has an invalid value
+    """
+
+    def __init__(self, post_chunk, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_workers=DEFAULT_MAX_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 retry_delay=DEFAULT_RETRY_DELAY):
+        assert post_chunk is not None
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive int")
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError("max_workers must be a positive int")
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError("max_retries must be a non-negative int")
+        if retry_delay < 0:
+            raise ValueError("retry_delay must be non-negative")
+        self._post_chunk = post_chunk
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def chunks(self, measurements):
+        """
+        Splits the provided measurements into lists holding at most
+        *chunk_size* items each
+
+        :param measurements: the measurements to be split
+        :type measurements: iterable
+        :returns: a generator of lists
+        """
+        iterator = iter(measurements)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def upload(self, measurements):
+        """
+        Posts the provided measurements, chunk by chunk
+
+        :param measurements: the measurements to be posted
+        :type measurements: iterable
+        :returns: list of *ChunkUploadResult* objects, sorted by chunk index
+        """
+        results = []
+        # keep at most two chunks per worker in memory
+        max_pending = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for index, chunk in enumerate(self.chunks(measurements)):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(f.result() for f in done)
+                pending.add(executor.submit(self._upload_chunk, index, chunk))
+            results.extend(f.result() for f in wait(pending).done)
+        return sorted(results, key=lambda r: r.index)
+
+    def _upload_chunk(self, index, chunk):
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                self._post_chunk(chunk)
+                return ChunkUploadResult(index, chunk, attempts)
+            except Exception as e:
+                if not _is_transient(e) or attempts > self.max_retries:
+                    return ChunkUploadResult(index, chunk, attempts, e)
+                time.sleep(self.retry_delay * 2 ** (attempts - 1))
+
+
+def _is_transient(error):
+    # timeouts, connection failures, rate limiting and server-side errors
+    # may go away by themselves, while other errors (eg: invalid payloads)
+    # would be raised again
+    if isinstance(error, (api_call_error.APICallTimeoutError,
+                          api_call_error.BadGatewayError)):
+        return True
+    if isinstance(error, api_call_error.APIInvalidSSLCertificateError):
+        # connection failures are reported as certificate errors as well:
+        # actual certificate errors are not retried
+        cause = error.triggering_error
+        return isinstance(cause, requests.exceptions.ConnectionError) and \
+            not isinstance(cause, requests.exceptions.SSLError)
+    if not isinstance(error, api_call_error.APICallError) or \
+            error.status_code is None:
+        return False
+    return error.status_code == 429 or error.status_code >= 500
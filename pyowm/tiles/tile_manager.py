@@ -18,18 +18,21 @@ class TileManager(object):
     :type API_key: str
     :param map_layer: the layer for which you want tiles fetched. Allowed map layers are specified by the `pyowm.tiles.enum.MapLayerEnum` enumerator class.
     :type map_layer: str
+    :param image_cache: optional cache of the downloaded tiles: tiles found in the cache are not downloaded again
+    :type image_cache: `pyowm.caches.imagecache.DiskImageCache` or `None`
     :returns: a *TileManager* instance
     :raises: *AssertionError* when no API Key or no map layer is provided, or map layer name is not a string
 
     """
 
-    def __init__(self, API_key, map_layer):
+    def __init__(self, API_key, map_layer, image_cache=None):
         assert API_key is not None, 'You must provide a valid API Key'
         self.API_key = API_key
         assert map_layer is not None, 'You must provide a valid map layer name'
         assert isinstance(map_layer, str), 'Map layer name must be a string'
         self.map_layer = map_layer
         self.http_client = HttpClient()
+        self.image_cache = image_cache
 
     def get_tile(self, x, y, zoom):
         """
@@ -44,9 +47,16 @@ class TileManager(object):
         :returns: a `pyowm.tiles.Tile` instance
 
         """
-        status, data = self.http_client.get_png(
-            ROOT_TILE_URL % self.map_layer + '/%s/%s/%s.png' % (zoom, x, y),
-            params={'appid': self.API_key})
+        url = ROOT_TILE_URL % self.map_layer + '/%s/%s/%s.png' % (zoom, x, y)
+        params = {'appid': self.API_key}
+        data = None
+        if self.image_cache is not None:
+            cache_key = self.image_cache.key_for(url, params)
+            data = self.image_cache.get(cache_key)
+        if data is None:
+            status, data = self.http_client.get_png(url, params=params)
+            if self.image_cache is not None:
+                self.image_cache.set(cache_key, data)
         img = Image(data, ImageTypeEnum.PNG)
         return Tile(x, y, zoom, self.map_layer, img)
 
@@ -1,7 +1,11 @@
 
 import json
 import math
-import geojson
+from pyowm.utils.lazyutils import LazyModule
+
+
+# geojson is only imported upon first use of geometries
+geojson = LazyModule('geojson')
 
 
 EARTH_RADIUS_KM = 6378.1
@@ -39,6 +43,31 @@ def assert_is_lon(val):
         raise ValueError("Longitude value must be between -180 and 180")
 
 
+def great_circle_distance_km(lat1, lon1, lat2, lon2):
+    """
+    Returns the great circle distance in kilometers between two geographic
+    points, according to the haversine formula. The Earth's surface is
+    approximated to a sphere with radius = Earth's radius
+
+    :param lat1: decimal latitude of the first point
+    :type lat1: int or float
+    :param lon1: decimal longitude of the first point
+    :type lon1: int or float
+    :param lat2: decimal latitude of the second point
+    :type lat2: int or float
+    :param lon2: decimal longitude of the second point
+    :type lon2: int or float
+    :returns: float
+
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2.) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * \
+        math.sin(math.radians(lon2 - lon1) / 2.) ** 2
+    return 2. * EARTH_RADIUS_KM * math.asin(min(1., math.sqrt(a)))
+
+
 # classes
 
 class Geometry:
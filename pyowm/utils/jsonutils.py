@@ -0,0 +1,157 @@
+"""
+Module containing utilities for incrementally decoding JSON data
+"""
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITERS = ' \t\n\r,:]}'
+
+
+class _JSONReader(object):
+    """
+    Pull reader decoding JSON values out of an iterable of text or bytes
+    chunks, asking for further chunks only when the buffered data is not
+    enough to decode the next value.
+
+    :param chunks: iterable of str or bytes (UTF-8 encoded) chunks
+    :type chunks: iterable
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            chunk = self._text_decoder.decode(b'', final=True)
+        else:
+            if isinstance(chunk, bytes):
+                chunk = self._text_decoder.decode(chunk)
+        # drop the already consumed data, so that memory stays bounded
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return not self._eof or bool(chunk)
+
+    def peek(self):
+        """
+        Returns the next non-whitespace character, without consuming it
+
+        :returns: str
+        :raises: *ValueError* if data is over
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON data')
+
+    def expect(self, character):
+        """
+        Consumes the next non-whitespace character, which must be the
+        specified one
+
+        :param character: the expected character
+        :type character: str
+        :raises: *ValueError* if a different character is found
+        """
+        found = self.peek()
+        if found != character:
+            raise ValueError('Expected "%s" but found "%s" in JSON data' %
+                             (character, found))
+        self._pos += 1
+
+    def decode_value(self):
+        """
+        Decodes and consumes the next JSON value
+
+        :returns: the decoded value
+        :raises: *ValueError* if the data is malformed
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer,
+                                                           self._pos)
+                # a value not followed by a delimiter (eg: a number) may
+                # continue in the next chunk
+                if self._eof or (end < len(self._buffer) and
+                                 self._buffer[end] in _DELIMITERS):
+                    self._pos = end
+                    return value
+            except ValueError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def iter_array_items(chunks, key=None, members=None):
+    """
+    Lazily decodes the items of a JSON array out of an iterable of JSON text
+    chunks, yielding each item as soon as it is fully available. Only one
+    item at a time is kept in memory, regardless of the array length.
+
+    The array can either be the top-level JSON value (when ``key`` is
+    ``None``) or the value of the member of the top-level JSON object having
+    the specified key.
+
+    :param chunks: iterable of str or bytes (UTF-8 encoded) chunks
+    :type chunks: iterable
+    :param key: the key of the array in the top-level JSON object, or
+        ``None`` if the top-level JSON value is the array itself
+    :type key: str or ``None``
+    :param members: optional dict to be filled with the other members of
+        the top-level JSON object. The array key, if found, is mapped to the
+        number of items of the array
+    :type members: dict or ``None``
+    :returns: a generator of decoded items
+    :raises: *ValueError* if the JSON data is malformed
+    """
+    reader = _JSONReader(chunks)
+    if key is None:
+        for item in _iter_array(reader):
+            yield item
+        return
+    if members is None:
+        members = dict()
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.decode_value()
+        reader.expect(':')
+        if name == key:
+            members[key] = 0
+            for item in _iter_array(reader):
+                members[key] += 1
+                yield item
+        else:
+            members[name] = reader.decode_value()
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+        return
+    while True:
+        yield reader.decode_value()
+        if reader.peek() == ']':
+            reader.expect(']')
+            return
+        reader.expect(',')
@@ -0,0 +1,118 @@
+"""
+Module containing utilities for deferring the import of modules and the
+creation of objects until they are first needed
+"""
+
+import importlib
+import threading
+from collections.abc import MutableMapping
+
+
+class LazyModule(object):
+    """
+    Stand-in for a module, which is actually imported upon first access to
+    any of its attributes. Attributes are always looked up on the imported
+    module, so changes made to the module later on are seen.
+
+    :param name: the absolute name of the module (eg: ``requests``)
+    :type name: str
+    :returns: a *LazyModule* instance
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # only invoked for attributes not found on the stand-in itself
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        return "<%s.%s - name=%s, imported=%s>" % (
+            __name__, self.__class__.__name__, self._name,
+            self._module is not None)
+
+
+def instance_factory(class_path, *args, **kwargs):
+    """
+    Returns a function that imports the specified class and creates an
+    instance of it with the provided arguments
+
+    :param class_path: the dotted path of the class
+        (eg: ``pyowm.caches.nullcache.NullCache``)
+    :type class_path: str
+    :returns: a function taking no arguments
+    """
+    module_name, class_name = class_path.rsplit('.', 1)
+
+    def factory():
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)(*args, **kwargs)
+    return factory
+
+
+class LazyDict(MutableMapping):
+    """
+    Dictionary whose values are created upon first access to their keys, by
+    calling the function provided for each key. Once created, a value is kept
+    and returned on all subsequent accesses. Values can also be set and
+    deleted as with any dictionary. Values are created once even when their
+    keys are first accessed by several threads at the same time, and a
+    function failing to create a value is called again upon the next access.
+
+    :param factories: mapping between keys and the functions, taking no
+        arguments, that create the values of the keys
+    :type factories: dict
+    :returns: a *LazyDict* instance
+    """
+
+    def __init__(self, factories):
+        self._factories = dict(factories)
+        self._values = dict()
+        # reentrant, as factories may look up other keys
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._values:
+                # the factory is dropped only once the value is created
+                self._values[key] = self._factories[key]()
+                del self._factories[key]
+            return self._values[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._factories.pop(key, None)
+            self._values[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key in self._values:
+                del self._values[key]
+            else:
+                del self._factories[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._values or key in self._factories
+
+    def __iter__(self):
+        # a key is either among the created values or among the factories
+        with self._lock:
+            keys = list(self._values) + list(self._factories)
+        for key in keys:
+            yield key
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values) + len(self._factories)
+
+    def __repr__(self):
+        return "<%s.%s - keys=%s, created=%s>" % (
+            __name__, self.__class__.__name__, len(self), len(self._values))
@@ -0,0 +1,193 @@
+"""
+Module containing the binary, memory-mappable format of the city IDs registry.
+
+A binary registry file holds the same lines as the gzipped city ID files,
+in the same order. It consists of a fixed-size header followed by a sequence
+of 8-bytes aligned sections, all of them little-endian encoded:
+
+  * ``ids``, ``latitudes``, ``longitudes``: fixed-width columns holding the
+    city ID (unsigned 32 bits int) and the coordinates (64 bits floats) of
+    each line
+  * ``line_offsets``, ``lines``: string table of the UTF-8 encoded lines
+  * ``name_offsets``, ``names``: string table of the UTF-8 encoded lowercase
+    city names
+  * ``name_index``: positions of the lines sorted by lowercase city name
+  * ``id_index``: positions of the lines sorted by city ID
+  * ``countries``: fixed-width column holding the ASCII encoded 2-chars
+    country of each line, NUL-padded
+  * ``trigrams``, ``trigram_offsets``, ``trigram_postings``: inverted index
+    of the trigrams of the UTF-8 encoded lowercase city names. Trigrams are
+    sorted and stored as unsigned 32 bits ints (see `trigrams_of`); the
+    sorted positions of the lines whose name holds the trigram at position
+    *n* span from offset *n* to offset *n + 1* of the postings
+
+Each string table is made of newline-terminated strings, the string at
+position *n* spanning from offset *n* to offset *n + 1* minus one.
+"""
+
+import gzip
+import struct
+import sys
+from array import array
+
+
+FILENAME = 'cities.bin'
+MAGIC = b'PYOWMCID'
+VERSION = 2
+SECTIONS = ('ids', 'latitudes', 'longitudes', 'line_offsets', 'lines',
+            'name_offsets', 'names', 'name_index', 'id_index', 'countries',
+            'trigrams', 'trigram_offsets', 'trigram_postings')
+COUNTRY_SIZE = 2
+HEADER = struct.Struct('<8sII' + 'II' * len(SECTIONS))
+ALIGNMENT = 8
+
+
+def write(lines, fileobj):
+    """
+    Writes the provided city ID lines to a binary file object, using the
+    binary registry format
+
+    :param lines: the text lines of the city ID files, in the form
+        ``name,id,lat,lon,country``
+    :type lines: iterable of str
+    :param fileobj: the binary file object to write to
+    :type fileobj: file
+    :returns: the int number of written lines
+    """
+    lines = [l.strip() for l in lines]
+    lines = [l for l in lines if l]
+    splits = [l.rsplit(',', 4) for l in lines]
+    names = [tokens[0].lower().encode('utf-8') for tokens in splits]
+    ids = array('I', [int(tokens[1]) for tokens in splits])
+    positions = range(len(lines))
+    line_offsets, line_table = _string_table(
+        [l.encode('utf-8') for l in lines])
+    name_offsets, name_table = _string_table(names)
+    postings = dict()
+    for position, name in enumerate(names):
+        for trigram in trigrams_of(name):
+            postings.setdefault(trigram, array('I')).append(position)
+    trigrams = sorted(postings)
+    trigram_offsets = array('I', [0])
+    trigram_postings = array('I')
+    for trigram in trigrams:
+        trigram_postings.extend(postings[trigram])
+        trigram_offsets.append(len(trigram_postings))
+    sections = dict(
+        ids=_to_bytes(ids),
+        latitudes=_to_bytes(array('d', [float(t[2]) for t in splits])),
+        longitudes=_to_bytes(array('d', [float(t[3]) for t in splits])),
+        line_offsets=_to_bytes(line_offsets),
+        lines=line_table,
+        name_offsets=_to_bytes(name_offsets),
+        names=name_table,
+        name_index=_to_bytes(array('I', sorted(
+            positions, key=lambda p: (names[p], p)))),
+        id_index=_to_bytes(array('I', sorted(
+            positions, key=lambda p: (ids[p], p)))),
+        countries=b''.join(country_key(tokens[4]) for tokens in splits),
+        trigrams=_to_bytes(array('I', trigrams)),
+        trigram_offsets=_to_bytes(trigram_offsets),
+        trigram_postings=_to_bytes(trigram_postings))
+    layout = list()
+    offset = _aligned(HEADER.size)
+    for name in SECTIONS:
+        layout.extend((offset, len(sections[name])))
+        offset = _aligned(offset + len(sections[name]))
+    header = HEADER.pack(MAGIC, VERSION, len(lines), *layout)
+    fileobj.write(header)
+    written = len(header)
+    for name in SECTIONS:
+        fileobj.write(b'\0' * (_aligned(written) - written))
+        fileobj.write(sections[name])
+        written = _aligned(written) + len(sections[name])
+    return len(lines)
+
+
+def trigrams_of(name):
+    """
+    Returns the trigrams of an UTF-8 encoded lowercase city name, each one
+    given as the unsigned int whose big-endian representation is made of the
+    3 bytes of the trigram
+
+    :param name: the UTF-8 encoded lowercase city name
+    :type name: bytes
+    :returns: a set of int
+    """
+    return set(int.from_bytes(name[i:i + 3], 'big')
+               for i in range(len(name) - 2))
+
+
+def country_key(country):
+    """
+    Returns the fixed-width value held by the ``countries`` section for the
+    provided country
+
+    :param country: the 2-chars country
+    :type country: str
+    :returns: bytes
+    """
+    return country.encode('ascii')[:COUNTRY_SIZE].ljust(COUNTRY_SIZE, b'\0')
+
+
+def write_from_gzip_files(source_paths, target_path):
+    """
+    Writes the lines of the provided gzipped city ID files, in order, to a
+    binary registry file
+
+    :param source_paths: paths of the gzipped city ID files
+    :type source_paths: list of str
+    :param target_path: path of the binary registry file to be written
+    :type target_path: str
+    :returns: the int number of written lines
+    """
+    lines = list()
+    for path in source_paths:
+        with gzip.open(path, mode='rt', encoding='utf-8') as fh:
+            lines.extend(fh.readlines())
+    with open(target_path, 'wb') as fh:
+        return write(lines, fh)
+
+
+def read_header(buffer):
+    """
+    Reads the header of a binary registry
+
+    :param buffer: the binary registry data
+    :type buffer: bytes, mmap or any other object supporting the buffer
+        protocol
+    :returns: a tuple containing the int number of lines and a dict mapping
+        each section name to its (offset, size) tuple
+    :raises: *ValueError* if the data is not a binary registry or its format
+        version is not supported
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError('Not a binary city IDs registry')
+    fields = HEADER.unpack_from(buffer, 0)
+    if fields[0] != MAGIC:
+        raise ValueError('Not a binary city IDs registry')
+    if fields[1] != VERSION:
+        raise ValueError('Unsupported binary city IDs registry version: %d'
+                         % fields[1])
+    layout = fields[3:]
+    sections = dict((name, (layout[2 * i], layout[2 * i + 1]))
+                    for i, name in enumerate(SECTIONS))
+    return fields[2], sections
+
+
+def _string_table(strings):
+    offsets = array('I', [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s) + 1)
+    return offsets, b''.join(s + b'\n' for s in strings)
+
+
+def _to_bytes(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -1,13 +1,484 @@
+import bisect
 import gzip
+import heapq
+import itertools
+import math
+import mmap
+import os
+import sys
+from array import array
+from pyowm.utils import geo
+from pyowm.weatherapi25 import binarycityids
 from pyowm.weatherapi25.location import Location
 from pyowm.abstractions.decorators import deprecated
-from pkg_resources import resource_filename
 
 """
 Module containing a registry with lookup methods for OWM-provided city IDs
 """
 
 
+class _CityRecords(object):
+    """
+    Base class for the indexes over the lines of city IDs files. Lines are
+    identified by their position and split into tokens only when matched.
+    Geographic lookups are served by a grid of 1x1 degree cells, built upon
+    first geographic lookup.
+
+    Subclasses must implement `__len__`, `line`, `like`, `_coordinates`,
+    `_id_columns`, `_name_order`, `_name_key` and `_key`
+    """
+
+    _grid = None
+
+    def tokens(self, position):
+        """
+        Returns the tokens of the line at the specified position
+        :param position: int
+        :return: list of str
+        """
+        return self.split(self.line(position))
+
+    def country(self, position):
+        """
+        Returns the country of the line at the specified position
+        :param position: int
+        :return: str
+        """
+        return self.tokens(position)[-1]
+
+    def city_id(self, position):
+        """
+        Returns the city ID of the line at the specified position
+        :param position: int
+        :return: int
+        """
+        return int(self.tokens(position)[1])
+
+    def positions_for(self, name):
+        """
+        Returns the sorted positions of the lines whose lowercase city name
+        equals the provided lowercase string
+        :param name: str
+        :return: list of int
+        """
+        key = self._key(name)
+        order = self._name_order()
+        positions = []
+        i = self._bisect_names(key)
+        while i < len(order) and self._name_key(order[i]) == key:
+            positions.append(order[i])
+            i += 1
+        return positions
+
+    def prefixed(self, prefix):
+        """
+        Returns a generator of the positions of the lines whose lowercase city
+        name starts with the provided lowercase string, in alphabetical order
+        :param prefix: str
+        :return: generator of int
+        """
+        key = self._key(prefix)
+        order = self._name_order()
+        i = self._bisect_names(key)
+        while i < len(order) and self._name_key(order[i]).startswith(key):
+            yield order[i]
+            i += 1
+
+    def _bisect_names(self, key):
+        # leftmost position in name order whose name is not less than the key
+        order = self._name_order()
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_key(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def positions_for_ids(self, city_ids):
+        """
+        Returns a dict mapping each one of the provided city IDs to the
+        position of the line having that ID. IDs not found are not mapped.
+        The IDs are looked up in increasing order, each binary search starting
+        from where the previous one ended
+        :param city_ids: iterable of int
+        :return: dict
+        """
+        ids, order = self._id_columns()
+        result = dict()
+        lo = 0
+        for city_id in sorted(set(city_ids)):
+            hi = len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if ids[order[mid]] < city_id:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo == len(order):
+                break
+            if ids[order[lo]] == city_id:
+                result[city_id] = order[lo]
+        return result
+
+    def within(self, lat, lon, radius_km):
+        """
+        Returns the positions of the lines whose coordinates are within the
+        specified distance from the provided point, sorted by increasing
+        distance
+        :param lat: float
+        :param lon: float
+        :param radius_km: float
+        :return: list of int
+        """
+        return [p for _, p in self._within(lat, lon, radius_km)]
+
+    def nearest(self, lat, lon, k):
+        """
+        Returns the positions of the k lines whose coordinates are nearest to
+        the provided point, sorted by increasing distance
+        :param lat: float
+        :param lon: float
+        :param k: int
+        :return: list of int
+        """
+        grid = self._get_grid()
+        if not len(self):
+            return []
+        k = min(k, len(self))
+        # expand rings of cells around the point until k candidates are found:
+        # their k-th distance then bounds a circle containing the k nearest
+        lat_cell, lon_cell = self._cell_of(lat, lon)
+        candidates = set()
+        ring = 0
+        while len(candidates) < k:
+            for cell in self._ring_cells(lat_cell, lon_cell, ring):
+                candidates.update(grid.get(cell, ()))
+            ring += 1
+        lats, lons = self._coordinates()
+        radius = heapq.nsmallest(k, [geo.great_circle_distance_km(
+            lat, lon, lats[p], lons[p]) for p in candidates])[-1]
+        return [p for _, p in self._within(lat, lon, radius)[:k]]
+
+    def _within(self, lat, lon, radius_km):
+        grid = self._get_grid()
+        lats, lons = self._coordinates()
+        radius_deg = math.degrees(radius_km / geo.EARTH_RADIUS_KM)
+        lat_min = max(-90., lat - radius_deg)
+        lat_max = min(90., lat + radius_deg)
+        sin_radius = math.sin(min(math.pi / 2, radius_km / geo.EARTH_RADIUS_KM))
+        cos_lat = math.cos(math.radians(lat))
+        if lat_min <= -90. or lat_max >= 90. or sin_radius >= cos_lat:
+            lon_cells = range(360)
+        else:
+            # max longitude offset of the points of a spherical cap
+            radius_lon = math.degrees(math.asin(sin_radius / cos_lat))
+            lon_cells = [c % 360 for c in
+                         range(int(math.floor(lon - radius_lon)),
+                               int(math.floor(lon + radius_lon)) + 1)]
+            lon_cells = sorted(set(lon_cells))
+        lat_cells = range(self._cell_of(lat_min, 0.)[0],
+                          self._cell_of(lat_max, 0.)[0] + 1)
+        result = []
+        for lat_cell in lat_cells:
+            for lon_cell in lon_cells:
+                for p in grid.get((lat_cell, lon_cell), ()):
+                    distance = geo.great_circle_distance_km(lat, lon, lats[p],
+                                                            lons[p])
+                    if distance <= radius_km:
+                        result.append((distance, p))
+        result.sort()
+        return result
+
+    @staticmethod
+    def _cell_of(lat, lon):
+        return min(int(math.floor(lat)), 89), int(math.floor(lon)) % 360
+
+    @staticmethod
+    def _ring_cells(lat_cell, lon_cell, ring):
+        # cells at the specified Chebyshev distance from the given cell
+        cells = set()
+        for c in range(max(lat_cell - ring, -90), min(lat_cell + ring, 89) + 1):
+            if abs(c - lat_cell) == ring:
+                lon_cells = range(lon_cell - ring, lon_cell + ring + 1)
+            else:
+                lon_cells = (lon_cell - ring, lon_cell + ring)
+            cells.update((c, d % 360) for d in lon_cells)
+        return cells
+
+    def _get_grid(self):
+        if self._grid is None:
+            grid = dict()
+            lats, lons = self._coordinates()
+            for position in range(len(self)):
+                cell = self._cell_of(lats[position], lons[position])
+                bucket = grid.get(cell)
+                if bucket is None:
+                    bucket = grid[cell] = array('i')
+                bucket.append(position)
+            self._grid = grid
+        return self._grid
+
+    @staticmethod
+    def split(line):
+        # city names may have inner commas: the other 4 fields never do
+        return line.rsplit(',', 4)
+
+
+class _TextCityRecords(_CityRecords):
+    """
+    In-memory index over the lines of city IDs text files. Lines are kept as
+    stripped strings; a hash map allows constant time lookups of lines by
+    lowercase city name and the country of each line is kept aside for
+    filtering. Substring lookups are served by a trigram inverted index over
+    the lowercase city names, built upon first substring lookup. Lookups by
+    city ID and by city name prefix are binary searches on ID and name
+    indexes, built upon first lookup.
+
+    :param lines: the text lines of city IDs files
+    :type lines: iterable of str
+    """
+
+    def __init__(self, lines):
+        self.lines = [l.strip() for l in lines]
+        self.lines = [l for l in self.lines if l]
+        self.by_name = dict()
+        self.countries = list()
+        for position, line in enumerate(self.lines):
+            tokens = self.split(line)
+            self.by_name.setdefault(tokens[0].lower(), []).append(position)
+            self.countries.append(tokens[-1])
+        self._names = None
+        self._trigrams = None
+        self._coords = None
+        self._ids = None
+        self._id_values = None
+        self._lower_names = None
+        self._sorted_names = None
+
+    def __len__(self):
+        return len(self.lines)
+
+    def line(self, position):
+        return self.lines[position]
+
+    def country(self, position):
+        return self.countries[position]
+
+    def city_id(self, position):
+        return self._id_column()[position]
+
+    def positions_for(self, name):
+        return self.by_name.get(name, [])
+
+    def like(self, needle, country=None):
+        """
+        Returns the sorted positions of the lines whose lowercase city name
+        contains the provided lowercase string, optionally restricted to a
+        country
+        :param needle: str
+        :param country: str or `None`
+        :return: list of int
+        """
+        if len(needle) < 3:
+            candidates = self.by_name
+        else:
+            trigrams = self._get_trigrams()
+            postings = [trigrams.get(needle[i:i+3], ())
+                        for i in range(len(needle) - 2)]
+            shortest = min(postings, key=len)
+            candidates = [self._names[i] for i in shortest]
+        positions = [p for name in candidates if needle in name
+                     for p in self.by_name[name]]
+        if country is not None:
+            positions = [p for p in positions if self.countries[p] == country]
+        return sorted(positions)
+
+    def _coordinates(self):
+        if self._coords is None:
+            lats = array('d')
+            lons = array('d')
+            for line in self.lines:
+                tokens = self.split(line)
+                lats.append(float(tokens[2]))
+                lons.append(float(tokens[3]))
+            self._coords = (lats, lons)
+        return self._coords
+
+    def _id_column(self):
+        # IDs are parsed once, for ID lookups and rankings
+        if self._id_values is None:
+            self._id_values = array('I', [int(self.split(line)[1])
+                                          for line in self.lines])
+        return self._id_values
+
+    def _id_columns(self):
+        if self._ids is None:
+            ids = self._id_column()
+            order = array('I', sorted(range(len(ids)), key=ids.__getitem__))
+            self._ids = (ids, order)
+        return self._ids
+
+    def _name_order(self):
+        if self._sorted_names is None:
+            self._lower_names = [self.split(line)[0].lower()
+                                 for line in self.lines]
+            self._sorted_names = array('I', sorted(
+                range(len(self.lines)), key=self._lower_names.__getitem__))
+        return self._sorted_names
+
+    def _name_key(self, position):
+        return self._lower_names[position]
+
+    @staticmethod
+    def _key(name):
+        return name
+
+    def _get_trigrams(self):
+        if self._trigrams is None:
+            self._names = list(self.by_name)
+            trigrams = dict()
+            for i, name in enumerate(self._names):
+                for trigram in set(name[j:j+3] for j in range(len(name) - 2)):
+                    posting = trigrams.get(trigram)
+                    if posting is None:
+                        posting = trigrams[trigram] = array('i')
+                    posting.append(i)
+            self._trigrams = trigrams
+        return self._trigrams
+
+
+class _BinaryCityRecords(_CityRecords):
+    """
+    Index over a binary city IDs registry file (see the
+    `pyowm.weatherapi25.binarycityids` module), which is memory-mapped
+    read-only: nothing is parsed upon opening and the pages of the file are
+    shared among all the processes mapping it. Lookups by lowercase city
+    name and by city ID are binary searches on the name and ID indexes.
+    Substring lookups are served by the trigram index of the file, candidate
+    lines being filtered by country before their names are matched; needles
+    shorter than a trigram are searched on the table of lowercase city names.
+
+    :param path: path of the binary registry file
+    :type path: str
+    :raises: *ValueError* if the file is not a binary city IDs registry
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count, self._sections = binarycityids.read_header(self._mmap)
+        self._view = memoryview(self._mmap)
+        self._ids = self._column('ids', 'I')
+        self._lats = self._column('latitudes', 'd')
+        self._lons = self._column('longitudes', 'd')
+        self._line_offsets = self._column('line_offsets', 'I')
+        self._name_offsets = self._column('name_offsets', 'I')
+        self._name_index = self._column('name_index', 'I')
+        self._id_index = self._column('id_index', 'I')
+        self._trigrams = self._column('trigrams', 'I')
+        self._trigram_offsets = self._column('trigram_offsets', 'I')
+        self._trigram_postings = self._column('trigram_postings', 'I')
+
+    def __len__(self):
+        return self._count
+
+    def line(self, position):
+        return self._string('lines', self._line_offsets, position).decode(
+            'utf-8')
+
+    def like(self, needle, country=None):
+        """
+        Returns the sorted positions of the lines whose lowercase city name
+        contains the provided lowercase string, optionally restricted to a
+        country
+        :param needle: str
+        :param country: str or `None`
+        :return: list of int
+        """
+        key = needle.encode('utf-8')
+        if b'\n' in key:
+            return []
+        country_key = None
+        if country is not None:
+            country_key = binarycityids.country_key(country)
+        trigrams = binarycityids.trigrams_of(key)
+        if not trigrams:
+            return self._scan_names(key, country_key)
+        # the lines holding the rarest trigram of the needle are the candidates
+        candidates = None
+        for trigram in trigrams:
+            i = bisect.bisect_left(self._trigrams, trigram)
+            if i == len(self._trigrams) or self._trigrams[i] != trigram:
+                return []
+            posting = self._trigram_postings[self._trigram_offsets[i]:
+                                             self._trigram_offsets[i + 1]]
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        if country_key is not None:
+            candidates = [p for p in candidates
+                          if self._country_key(p) == country_key]
+        return [p for p in candidates if key in self._name_key(p)]
+
+    def country(self, position):
+        return self._country_key(position).rstrip(b'\0').decode('ascii')
+
+    def city_id(self, position):
+        return self._ids[position]
+
+    def _scan_names(self, key, country_key):
+        start, size = self._sections['names']
+        end = start + size
+        positions = []
+        found = self._mmap.find(key, start, end)
+        while found != -1:
+            position = bisect.bisect_right(self._name_offsets,
+                                           found - start) - 1
+            if country_key is None or \
+                    self._country_key(position) == country_key:
+                positions.append(position)
+            # skip to the next name
+            found = self._mmap.find(
+                key, start + self._name_offsets[position + 1], end)
+        return positions
+
+    def _country_key(self, position):
+        start = self._sections['countries'][0]
+        size = binarycityids.COUNTRY_SIZE
+        return self._mmap[start + position * size:
+                          start + (position + 1) * size]
+
+    def _coordinates(self):
+        return self._lats, self._lons
+
+    def _id_columns(self):
+        return self._ids, self._id_index
+
+    def _name_order(self):
+        return self._name_index
+
+    def _name_key(self, position):
+        return self._string('names', self._name_offsets, position)
+
+    @staticmethod
+    def _key(name):
+        return name.encode('utf-8')
+
+    def _string(self, section, offsets, position):
+        start = self._sections[section][0]
+        return self._mmap[start + offsets[position]:
+                          start + offsets[position + 1] - 1]
+
+    def _column(self, section, typecode):
+        offset, size = self._sections[section]
+        column = self._view[offset:offset + size].cast(typecode)
+        if sys.byteorder != 'little':
+            column = array(typecode, column)
+            column.byteswap()
+        return column
+
+
 class CityIDRegistry:
 
     MATCHINGS = {
@@ -16,7 +487,7 @@ class CityIDRegistry:
         'like': lambda city_name, toponym: city_name.lower() in toponym.lower()
     }
 
-    def __init__(self, filepath_regex):
+    def __init__(self, filepath_regex, binary_filepath=None):
         """
         Initialise a registry that can be used to lookup info about cities.
 
@@ -24,10 +495,20 @@ class CityIDRegistry:
                that store the city IDs information.
                Eg: ``folder1/folder2/%02d-%02d.txt``
         :type filepath_regex: str
+        :param binary_filepath: path of the binary city IDs registry file
+               that is generated at build time out of the city IDs files,
+               relative to this package unless absolute.
+               When the file exists, it is memory-mapped and used for all
+               lookups in place of the city IDs files. Defaults to ``None``
+        :type binary_filepath: str
         :returns: a *CityIDRegistry* instance
 
         """
         self._filepath_regex = filepath_regex
+        self._binary_filepath = binary_filepath
+        self._binary_records = None
+        self._records = dict()
+        self._all_records = None
 
     @deprecated(will_be='removed', on_version=(3, 0, 0))
     def id_for(self, city_name):
@@ -73,7 +554,48 @@ class CityIDRegistry:
         if country is not None and len(country) != 2:
             raise ValueError("Country must be a 2-char string")
         splits = self._filter_matching_lines(city_name, country, matching)
-        return [(int(item[1]), item[0], item[4]) for item in splits]
+        return [self._to_id_tuple(item) for item in splits]
+
+    def ids_for_many(self, city_names, country=None, matching='nocase'):
+        """
+        Bulk version of `ids_for`: returns a list having, for each one of the
+        provided city names, the list of tuples that `ids_for` would return
+        for it. Results are in the same order as the provided names.
+        Each city IDs file is read at most once and repeated names are looked
+        up once.
+        :param city_names: the city names whose IDs are looked up
+        :type city_names: iterable of str
+        :param country: two character str representing the country where to
+        search for the cities. Defaults to `None`, which means: search in all
+        countries.
+        :param matching: str among `exact` (literal, case-sensitive matching),
+        `nocase` (literal, case-insensitive matching) and `like` (matches cities
+        whose name contains as a substring the string fed to the function, no
+        matter the case). Defaults to `nocase`.
+        :raises ValueError if the value for `matching` is unknown
+        :return: list of lists of tuples
+        """
+        if matching not in self.MATCHINGS:
+            raise ValueError("Unknown type of matching: "
+                             "allowed values are %s" % ", ".join(self.MATCHINGS))
+        if country is not None and len(country) != 2:
+            raise ValueError("Country must be a 2-char string")
+        city_names = list(city_names)
+        if matching != 'like':
+            # names spread on more files are looked up on the index of all
+            # files, which is built reading each file once
+            subfiles = set(self._assess_subfile_from(city_name)
+                           for city_name in city_names if city_name)
+            if len(subfiles) > 1:
+                self._get_all_records()
+        results = dict()
+        for city_name in city_names:
+            if city_name and city_name not in results:
+                splits = self._filter_matching_lines(city_name, country,
+                                                     matching)
+                results[city_name] = [self._to_id_tuple(item)
+                                      for item in splits]
+        return [list(results.get(city_name, [])) for city_name in city_names]
 
     @deprecated(will_be='removed', on_version=(3, 0, 0))
     def location_for(self, city_name):
@@ -149,8 +671,142 @@ class CityIDRegistry:
         locations = self.locations_for(city_name, country, matching=matching)
         return [loc.to_geopoint() for loc in locations]
 
+    def autocomplete(self, prefix, country=None, limit=10, ranking='name'):
+        """
+        Returns a list of at most `limit` tuples in the form (long, str, str)
+        corresponding to the int IDs and relative toponyms and 2-chars country
+        of the cities whose name starts with the provided prefix, no matter
+        the case. The lookup is performed locally on the city IDs files.
+        If `country` is provided, the search is restricted to the cities of
+        the specified country.
+        :param prefix: the beginning of the city names
+        :type prefix: str
+        :param country: two character str representing the country where to
+        search for the city. Defaults to `None`, which means: search in all
+        countries.
+        :param limit: the max number of results, defaults to 10
+        :type limit: int
+        :param ranking: str among `name` (results are sorted alphabetically by
+        city name) and `id` (results are the cities with the lowest IDs,
+        sorted by ID). Defaults to `name`.
+        :raises ValueError if the value for `ranking` is unknown, if `limit`
+        is not greater than zero or if `country` is not a 2-char string
+        :return: list of tuples
+        """
+        if ranking not in ('name', 'id'):
+            raise ValueError("Unknown type of ranking: "
+                             "allowed values are name, id")
+        assert isinstance(limit, int), "'limit' must be an int"
+        if limit < 1:
+            raise ValueError("'limit' must be greater than zero")
+        if country is not None and len(country) != 2:
+            raise ValueError("Country must be a 2-char string")
+        if not prefix:
+            return []
+        records = self._get_all_records()
+        positions = records.prefixed(prefix.lower())
+        if country is not None:
+            positions = (p for p in positions if records.country(p) == country)
+        if ranking == 'name':
+            positions = itertools.islice(positions, limit)
+        else:
+            positions = heapq.nsmallest(limit, positions, key=records.city_id)
+        return [self._to_id_tuple(records.tokens(p)) for p in positions]
+
+    def location_for_id(self, city_id):
+        """
+        Returns the *Location* object corresponding to the city having the
+        provided ID. The lookup is performed locally on the city IDs files.
+
+        :param city_id: the OWM city ID
+        :type city_id: int
+        :returns: a *Location* instance or ``None`` if the lookup fails
+        """
+        return self.locations_for_ids([city_id])[0]
+
+    def locations_for_ids(self, city_ids):
+        """
+        Returns a list of *Location* objects corresponding to the cities
+        having the provided IDs, in the same order as the IDs. The lookup is
+        performed locally on the city IDs files: a batch of IDs is resolved
+        with a single pass on the sorted city IDs.
+
+        :param city_ids: the OWM city IDs
+        :type city_ids: iterable of int
+        :returns: a list whose items are *Location* instances or ``None`` for
+            the IDs whose lookup fails
+        """
+        city_ids = list(city_ids)
+        for city_id in city_ids:
+            assert isinstance(city_id, int), "City IDs must be ints"
+        records = self._get_all_records()
+        positions = records.positions_for_ids(city_ids)
+        locations = dict()
+        for city_id, position in positions.items():
+            tokens = records.tokens(position)
+            locations[city_id] = Location(tokens[0], float(tokens[3]),
+                                          float(tokens[2]), int(tokens[1]),
+                                          tokens[4])
+        return [locations.get(city_id) for city_id in city_ids]
+
+    def nearest_ids(self, lat, lon, k=1):
+        """
+        Returns a list of tuples in the form (long, str, str) corresponding to
+        the int IDs and relative toponyms and 2-chars country of the `k`
+        cities nearest to the provided geographic coordinates, sorted by
+        increasing distance. The lookup is performed locally on the city IDs
+        files.
+        :param lat: decimal latitude, must be between -90.0 and 90.0
+        :type lat: int or float
+        :param lon: decimal longitude, must be between -180.0 and 180.0
+        :type lon: int or float
+        :param k: the number of cities to be returned, defaults to 1
+        :type k: int
+        :raises ValueError if coordinates are out of bounds or `k` is not
+        greater than zero
+        :return: list of tuples
+        """
+        geo.assert_is_lat(lat)
+        geo.assert_is_lon(lon)
+        assert isinstance(k, int), "'k' must be an int"
+        if k < 1:
+            raise ValueError("'k' must be greater than zero")
+        records = self._get_all_records()
+        return [self._to_id_tuple(records.tokens(p))
+                for p in records.nearest(lat, lon, k)]
+
+    def ids_within(self, lat, lon, radius_km):
+        """
+        Returns a list of tuples in the form (long, str, str) corresponding to
+        the int IDs and relative toponyms and 2-chars country of the cities
+        within the specified distance from the provided geographic
+        coordinates, sorted by increasing distance. The lookup is performed
+        locally on the city IDs files.
+        :param lat: decimal latitude, must be between -90.0 and 90.0
+        :type lat: int or float
+        :param lon: decimal longitude, must be between -180.0 and 180.0
+        :type lon: int or float
+        :param radius_km: the distance in kilometers
+        :type radius_km: int or float
+        :raises ValueError if coordinates are out of bounds or the distance
+        is negative
+        :return: list of tuples
+        """
+        geo.assert_is_lat(lat)
+        geo.assert_is_lon(lon)
+        assert isinstance(radius_km, (int, float)), \
+            "'radius_km' must be an int or float"
+        if radius_km < 0:
+            raise ValueError("'radius_km' must not be negative")
+        records = self._get_all_records()
+        return [self._to_id_tuple(records.tokens(p))
+                for p in records.within(lat, lon, radius_km)]
+
     # helper functions
 
+    def _to_id_tuple(self, tokens):
+        return int(tokens[1]), tokens[0], tokens[4]
+
     def _filter_matching_lines(self, city_name, country, matching):
         """
         Returns an iterable whose items are the lists of split tokens of every
@@ -163,41 +819,30 @@ class CityIDRegistry:
         """
         result = list()
 
-        # find the right file to scan and extract its lines. Upon "like"
-        # matchings, just read all files
+        # 'exact' and 'nocase' matchings are hash lookups on the index of the
+        # right file. Upon "like" matchings, look into the trigram index of
+        # all files
         if matching == 'like':
-            lines = [l.strip() for l in self._get_all_lines()]
+            records = self._get_all_records()
+            positions = records.like(city_name.lower(), country)
         else:
-            filename = self._assess_subfile_from(city_name)
-            lines = [l.strip() for l in self._get_lines(filename)]
-
-        # look for toponyms matching the specified city_name and according to
-        # the specified matching style
-        for line in lines:
-            tokens = line.split(",")
-            # sometimes city names have an inner comma...
-            if len(tokens) == 6:
-                tokens = [tokens[0]+','+tokens[1], tokens[2], tokens[3],
-                          tokens[4], tokens[5]]
-            # check country
-            if country is not None:
-                if tokens[4] != country:
-                    continue
-
-            # check city_name
-            if self._city_name_matches(city_name, tokens[0], matching):
-                result.append(tokens)
+            records = self._get_records_for(city_name)
+            positions = [p for p in records.positions_for(city_name.lower())
+                         if country is None or records.country(p) == country]
+        result = [records.tokens(p) for p in positions]
 
-        return result
+        # check city_name according to the specified matching style
+        return [tokens for tokens in result
+                if self._city_name_matches(city_name, tokens[0], matching)]
 
     def _city_name_matches(self, city_name, toponym, matching):
         comparison_function = self.MATCHINGS[matching]
         return comparison_function(city_name, toponym)
 
     def _lookup_line_by_city_name(self, city_name):
-        filename = self._assess_subfile_from(city_name)
-        lines = self._get_lines(filename)
-        return self._match_line(city_name, lines)
+        records = self._get_records_for(city_name)
+        positions = records.positions_for(city_name.lower())
+        return records.line(positions[0]) if positions else None
 
     def _assess_subfile_from(self, city_name):
         c = ord(city_name.lower()[0])
@@ -214,14 +859,71 @@ class CityIDRegistry:
         else:
             raise ValueError('Error: city name must start with a letter')
 
+    @staticmethod
+    def _resource_path(filename):
+        # city ID files are installed alongside this module
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            filename)
+
     def _get_lines(self, filename):
-        res_name = resource_filename(__name__, filename)
+        res_name = self._resource_path(filename)
         with gzip.open(res_name, mode='r') as fh:
             lines = fh.readlines()
             if type(lines[0]) is bytes:
                 lines = map(lambda l: l.decode("utf-8"), lines)
             return lines
 
+    def _get_records_for(self, city_name):
+        """
+        Returns an in-memory index containing the lines of the city IDs file
+        where the provided city name is stored: this is the index of all
+        files, if already built, or else the index of that file only. Indexes
+        are built upon first request
+        :param city_name: str
+        :return: `_CityRecords`
+        """
+        filename = self._assess_subfile_from(city_name)
+        if self._all_records is not None:
+            return self._all_records
+        if self._get_binary_records() is not None:
+            return self._get_all_records()
+        records = self._records.get(filename)
+        if records is None:
+            records = _TextCityRecords(self._get_lines(filename))
+            self._records[filename] = records
+        return records
+
+    def _get_all_records(self):
+        """
+        Returns the index of the lines of all city ID files: this is the
+        memory-mapped binary registry, if available, or else an in-memory
+        index built upon first request. Per-file indexes are then dropped
+        :return: `_CityRecords`
+        """
+        if self._all_records is None:
+            records = self._get_binary_records()
+            if records is None:
+                records = _TextCityRecords(self._get_all_lines())
+            self._all_records = records
+            self._records.clear()
+        return self._all_records
+
+    def _get_binary_records(self):
+        """
+        Returns the memory-mapped binary city IDs registry, or `None` if no
+        such registry file is available. The file is mapped upon first request
+        :return: `_BinaryCityRecords` or `None`
+        """
+        if self._binary_records is None and self._binary_filepath is not None:
+            res_name = self._binary_filepath
+            if not os.path.isabs(res_name):
+                res_name = self._resource_path(res_name)
+            if os.path.isfile(res_name):
+                self._binary_records = _BinaryCityRecords(res_name)
+            else:
+                self._binary_filepath = None
+        return self._binary_records
+
     def _get_all_lines(self):
         all_lines = list()
         for city_name in ['a', 'g', 'm', 's']:  # all available city ID files
@@ -229,20 +931,6 @@ class CityIDRegistry:
             all_lines.extend(self._get_lines(filename))
         return all_lines
 
-    def _match_line(self, city_name, lines):
-        """
-        The lookup is case insensitive and returns the first matching line,
-        stripped.
-        :param city_name: str
-        :param lines: list of str
-        :return: str
-        """
-        for line in lines:
-            toponym = line.split(',')[0]
-            if toponym.lower() == city_name.lower():
-                return line.strip()
-        return None
-
     def __repr__(self):
         return "<%s.%s - filepath_regex=%s>" % (__name__, \
           self.__class__.__name__, self._filepath_regex)
@@ -1,9 +1,6 @@
 from pyowm.caches import nullcache
+from pyowm.utils.lazyutils import LazyDict, instance_factory
 from pyowm.weatherapi25 import weathercoderegistry, cityidregistry
-from pyowm.weatherapi25.parsers import  forecastparser, observationlistparser, observationparser,  stationhistoryparser, \
-    stationlistparser, stationparser, weatherhistoryparser
-from pyowm.uvindexapi30.parsers import UVIndexParser, UVIndexListParser
-from pyowm.pollutionapi30.parsers import COIndexParser, NO2IndexParser, SO2IndexParser, OzoneParser
 
 
 """
@@ -36,25 +33,27 @@ CITY_WEATHER_HISTORY_URL = ROOT_HISTORY_URL + '/history/city'
 STATION_WEATHER_HISTORY_URL = ROOT_API_URL + '/history/station'
 
 
-# Parser objects injection for OWM Weather API responses parsing
-parsers = {
-  'observation': observationparser.ObservationParser(),
-  'observation_list': observationlistparser.ObservationListParser(),
-  'forecast': forecastparser.ForecastParser(),
-  'weather_history': weatherhistoryparser.WeatherHistoryParser(),
-  'station_history': stationhistoryparser.StationHistoryParser(),
-  'station': stationparser.StationParser(),
-  'station_list': stationlistparser.StationListParser(),
-  'uvindex': UVIndexParser(),
-  'uvindex_list': UVIndexListParser(),
-  'coindex': COIndexParser(),
-  'ozone': OzoneParser(),
-  'no2index': NO2IndexParser(),
-  'so2index': SO2IndexParser()
-}
+# Parser objects injection for OWM Weather API responses parsing: each parser
+# module is imported and the parser is created upon first use
+parsers = LazyDict({
+  'observation': instance_factory('pyowm.weatherapi25.parsers.observationparser.ObservationParser'),
+  'observation_list': instance_factory('pyowm.weatherapi25.parsers.observationlistparser.ObservationListParser'),
+  'forecast': instance_factory('pyowm.weatherapi25.parsers.forecastparser.ForecastParser'),
+  'weather_history': instance_factory('pyowm.weatherapi25.parsers.weatherhistoryparser.WeatherHistoryParser'),
+  'station_history': instance_factory('pyowm.weatherapi25.parsers.stationhistoryparser.StationHistoryParser'),
+  'station': instance_factory('pyowm.weatherapi25.parsers.stationparser.StationParser'),
+  'station_list': instance_factory('pyowm.weatherapi25.parsers.stationlistparser.StationListParser'),
+  'uvindex': instance_factory('pyowm.uvindexapi30.parsers.UVIndexParser'),
+  'uvindex_list': instance_factory('pyowm.uvindexapi30.parsers.UVIndexListParser'),
+  'coindex': instance_factory('pyowm.pollutionapi30.parsers.COIndexParser'),
+  'ozone': instance_factory('pyowm.pollutionapi30.parsers.OzoneParser'),
+  'no2index': instance_factory('pyowm.pollutionapi30.parsers.NO2IndexParser'),
+  'so2index': instance_factory('pyowm.pollutionapi30.parsers.SO2IndexParser')
+})
 
 # City ID registry
-city_id_registry = cityidregistry.CityIDRegistry('cityids/%03d-%03d.txt.gz')
+city_id_registry = cityidregistry.CityIDRegistry(
+    'cityids/%03d-%03d.txt.gz', binary_filepath='cityids/cities.bin')
 
 # Cache provider to be used
 cache = nullcache.NullCache()
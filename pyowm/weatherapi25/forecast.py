@@ -76,6 +76,7 @@ class Forecast(object):
         self._reception_time = reception_time
         self._location = location
         self._weathers = weathers
+        self._status_index = None
 
     def __iter__(self):
         """
@@ -158,6 +159,54 @@ class Forecast(object):
         """
         return len(self._weathers)
 
+    def get_status_bitmasks(self, weather_code_registry):
+        """
+        Returns the list of weather status bitmasks of the *Weather* items
+        composing the forecast, in the same order, as assigned by the provided
+        *WeatherCodeRegistry* object. The list is computed once per registry
+        and then cached, until *Weather* items are added to, removed from or
+        replaced in the forecast (changes made to the *Weather* items
+        themselves are not detected).
+
+        :param weather_code_registry: a *WeatherCodeRegistry* object
+        :type weather_code_registry: *WeatherCodeRegistry*
+        :returns: a list of int
+
+        """
+        return self._get_status_index(weather_code_registry)[0]
+
+    def get_status_summary(self, weather_code_registry):
+        """
+        Returns the bitwise OR of the weather status bitmasks of all the
+        *Weather* items composing the forecast, as assigned by the provided
+        *WeatherCodeRegistry* object
+
+        :param weather_code_registry: a *WeatherCodeRegistry* object
+        :type weather_code_registry: *WeatherCodeRegistry*
+        :returns: int
+
+        """
+        return self._get_status_index(weather_code_registry)[1]
+
+    def _get_status_index(self, weather_code_registry):
+        # the cache is keyed on the registry and on the *Weather* items, held
+        # by identity, as the weathers list is shared with whoever built the
+        # forecast and may be changed in place
+        if self._status_index is None or \
+                self._status_index[0] is not weather_code_registry or \
+                len(self._status_index[1]) != len(self._weathers) or \
+                any(a is not b for a, b in zip(self._status_index[1],
+                                               self._weathers)):
+            weathers = tuple(self._weathers)
+            bitmasks = [weather_code_registry.bitmask_for_code(
+                            w.get_weather_code()) for w in weathers]
+            summary = 0
+            for bitmask in bitmasks:
+                summary |= bitmask
+            self._status_index = (weather_code_registry, weathers, bitmasks,
+                                  summary)
+        return self._status_index[2:]
+
     def actualize(self):
         """
         Removes from this forecast all the *Weather* objects having a reference
@@ -167,6 +216,7 @@ class Forecast(object):
         for w in self._weathers:
             if w.get_reference_time(timeformat='unix') < current_time:
                 self._weathers.remove(w)
+        self._status_index = None
 
     def to_JSON(self):
         """Dumps object fields into a JSON formatted string
@@ -76,8 +76,7 @@ class Forecaster(object):
         :returns: boolean
 
         """        
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "rain",
-                                          weather_code_registry)
+        return self._will_have("rain")
 
     @deprecated(will_be='removed', on_version=(3, 0, 0))
     def will_have_sun(self):
@@ -88,8 +87,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "sun",
-                                          weather_code_registry)
+        return self._will_have("sun")
 
     def will_have_clear(self):
         """
@@ -99,8 +97,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "sun",
-                                          weather_code_registry)
+        return self._will_have("sun")
 
     def will_have_fog(self):
         """
@@ -110,8 +107,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "fog",
-                                          weather_code_registry)
+        return self._will_have("fog")
 
     def will_have_clouds(self):
         """
@@ -121,9 +117,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(),
-                                          "clouds",
-                                          weather_code_registry)
+        return self._will_have("clouds")
 
     def will_have_snow(self):
         """
@@ -133,8 +127,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "snow",
-                                          weather_code_registry)
+        return self._will_have("snow")
 
     def will_have_storm(self):
         """
@@ -144,8 +137,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "storm",
-                                          weather_code_registry)
+        return self._will_have("storm")
 
     def will_have_tornado(self):
         """
@@ -155,8 +147,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "tornado",
-                                          weather_code_registry)
+        return self._will_have("tornado")
 
     def will_have_hurricane(self):
         """
@@ -166,8 +157,7 @@ class Forecaster(object):
         :returns: boolean
 
         """
-        return weatherutils.any_status_is(self._forecast.get_weathers(), "hurricane",
-                                          weather_code_registry)
+        return self._will_have("hurricane")
 
     def when_rain(self):
         """
@@ -176,9 +166,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "rain",
-                                             weather_code_registry)
+        return self._when("rain")
 
     @deprecated(will_be='removed', on_version=(3, 0, 0))
     def when_sun(self):
@@ -188,9 +176,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "sun",
-                                             weather_code_registry)
+        return self._when("sun")
 
     def when_clear(self):
         """
@@ -199,9 +185,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "sun",
-                                             weather_code_registry)
+        return self._when("sun")
 
 
     def when_fog(self):
@@ -211,9 +195,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "fog",
-                                             weather_code_registry)
+        return self._when("fog")
 
     def when_clouds(self):
         """
@@ -222,9 +204,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "clouds",
-                                             weather_code_registry)
+        return self._when("clouds")
 
     def when_snow(self):
         """
@@ -233,9 +213,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "snow",
-                                             weather_code_registry)
+        return self._when("snow")
 
     def when_storm(self):
         """
@@ -244,9 +222,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "storm",
-                                             weather_code_registry)
+        return self._when("storm")
 
     def when_tornado(self):
         """
@@ -255,9 +231,7 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "tornado",
-                                             weather_code_registry)
+        return self._when("tornado")
     def when_hurricane(self):
         """
         Returns a sublist of the *Weather* list in the forecast, containing
@@ -265,9 +239,39 @@ class Forecaster(object):
 
         :returns: a list of *Weather* objects
         """
-        return weatherutils.filter_by_status(self._forecast.get_weathers(),
-                                             "hurricane",
-                                             weather_code_registry)
+        return self._when("hurricane")
+
+    def _will_have(self, weather_condition):
+        """
+        Tells if into the forecast coverage exist one or more *Weather* items
+        related to the specified weather condition
+
+        :param weather_condition: the weather condition to be looked up
+        :type weather_condition: str
+        :returns: boolean
+
+        """
+        bitmask = weather_code_registry.bitmask_for(weather_condition)
+        return bool(self._forecast.get_status_summary(weather_code_registry)
+                    & bitmask)
+
+    def _when(self, weather_condition):
+        """
+        Returns a sublist of the *Weather* list in the forecast, containing
+        only items having the specified weather condition
+
+        :param weather_condition: the weather condition to be looked up
+        :type weather_condition: str
+        :returns: a list of *Weather* objects
+
+        """
+        bitmask = weather_code_registry.bitmask_for(weather_condition)
+        if not self._forecast.get_status_summary(weather_code_registry) \
+                & bitmask:
+            return []
+        bitmasks = self._forecast.get_status_bitmasks(weather_code_registry)
+        return [self._forecast.get(i) for i, item_bitmask in
+                enumerate(bitmasks) if item_bitmask & bitmask]
 
     def _will_be(self, timeobject, weather_condition):
         """
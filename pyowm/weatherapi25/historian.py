@@ -2,8 +2,8 @@
 Module containing weather history abstraction classes and data structures.
 """
 
+import math
 from pyowm.utils import temputils
-from operator import itemgetter
 
 
 class Historian(object):
@@ -11,15 +11,26 @@ class Historian(object):
     A class providing convenience methods for manipulating meteostation weather
     history data. The class encapsulates a *StationHistory* instance and
     provides abstractions on the top of it in order to let programmers exploit
-    meteostation weather history data in a human-friendly fashion
+    meteostation weather history data in a human-friendly fashion.
+    The measurements are read once from the *StationHistory* instance and
+    held as timestamp-sorted columns, so that series and statistics are
+    computed without rescanning the raw data: columns and statistics are
+    rebuilt whenever measurements are added to or removed from the station
+    history, while in-place changes to existing measurements are not detected
 
     :param station_history: a *StationHistory* instance
     :type station_history: *StationHistory*
     :returns: a *Historian* instance
     """
 
+    MEASURES = ('temperature', 'humidity', 'pressure', 'rain', 'wind')
+
     def __init__(self, station_history):
         self._station_history = station_history
+        self._columns_key = None
+        self._columns_cache = None
+        self._statistics_cache = dict()
+        self._sorted_values_cache = dict()
 
     def get_station_history(self):
         """
@@ -32,7 +43,7 @@ class Historian(object):
     def temperature_series(self, unit='kelvin'):
         """Returns the temperature time series relative to the meteostation, in
         the form of a list of tuples, each one containing the couple
-        timestamp-value
+        timestamp-value. The list is sorted by timestamp
 
         :param unit: the unit of measure for the temperature values. May be
             among: '*kelvin*' (default), '*celsius*' or '*fahrenheit*'
@@ -43,61 +54,108 @@ class Historian(object):
         """
         if unit not in ('kelvin', 'celsius', 'fahrenheit'):
             raise ValueError("Invalid value for parameter 'unit'")
-        result = []
-        for tstamp in self._station_history.get_measurements():
-            t = self._station_history.get_measurements()[tstamp]['temperature']
-            if unit == 'kelvin':
-                temp = t
-            if unit == 'celsius':
-                temp = temputils.kelvin_to_celsius(t)
-            if unit == 'fahrenheit':
-                temp = temputils.kelvin_to_fahrenheit(t)
-            result.append((tstamp, temp))
-        return result
+        timestamps, columns = self._columns()
+        values = columns['temperature']
+        if unit == 'kelvin':
+            return list(zip(timestamps, values))
+        if unit == 'celsius':
+            convert = temputils.kelvin_to_celsius
+        if unit == 'fahrenheit':
+            convert = temputils.kelvin_to_fahrenheit
+        return [(tstamp, None if t is None else convert(t))
+                for tstamp, t in zip(timestamps, values)]
 
     def humidity_series(self):
         """Returns the humidity time series relative to the meteostation, in
         the form of a list of tuples, each one containing the couple
-        timestamp-value
+        timestamp-value. The list is sorted by timestamp
 
         :returns: a list of tuples
         """
-        return [(tstamp, \
-                self._station_history.get_measurements()[tstamp]['humidity']) \
-                for tstamp in self._station_history.get_measurements()]
+        return self._series('humidity')
 
     def pressure_series(self):
         """Returns the atmospheric pressure time series relative to the
         meteostation, in the form of a list of tuples, each one containing the
-        couple timestamp-value
+        couple timestamp-value. The list is sorted by timestamp
 
         :returns: a list of tuples
         """
-        return [(tstamp, \
-                self._station_history.get_measurements()[tstamp]['pressure']) \
-                for tstamp in self._station_history.get_measurements()]
+        return self._series('pressure')
 
     def rain_series(self):
         """Returns the precipitation time series relative to the
         meteostation, in the form of a list of tuples, each one containing the
-        couple timestamp-value
+        couple timestamp-value. The list is sorted by timestamp
 
         :returns: a list of tuples
         """
-        return [(tstamp, \
-                self._station_history.get_measurements()[tstamp]['rain']) \
-                for tstamp in self._station_history.get_measurements()]
+        return self._series('rain')
 
     def wind_series(self):
         """Returns the wind speed time series relative to the
         meteostation, in the form of a list of tuples, each one containing the
-        couple timestamp-value
+        couple timestamp-value. The list is sorted by timestamp
 
         :returns: a list of tuples
         """
-        return [(timestamp, \
-                self._station_history.get_measurements()[timestamp]['wind']) \
-                for timestamp in self._station_history.get_measurements()]
+        return self._series('wind')
+
+    def statistics(self, measure, unit='kelvin', percentiles=None):
+        """Returns a dict of summary statistics for the series of the
+        specified measure, skipping samples having ``None`` values. The dict
+        keys are: '*count*' (number of samples), '*min*' and '*max*' (tuples
+        containing the min/max value preceeded by its timestamp), '*average*',
+        '*stddev*' (population standard deviation) and, if percentiles are
+        requested, '*percentiles*' (a dict mapping each requested percentile
+        to its linearly interpolated value).
+        Eg: ``{'count': 2, 'min': (1362933983, 27.3), 'max': (1362934043, 27.7),
+        'average': 27.5, 'stddev': 0.2, 'percentiles': {50: 27.5}}``
+
+        :param measure: the measure to be summarised, among '*temperature*',
+            '*humidity*', '*pressure*', '*rain*' and '*wind*'
+        :type measure: str
+        :param unit: the unit of measure for temperature values, ignored
+            for other measures. May be among: '*kelvin*' (default),
+            '*celsius*' or '*fahrenheit*'
+        :type unit: str
+        :param percentiles: the percentiles to be computed, each one
+            between 0 and 100 (default is ``None``, which stands for no
+            percentiles)
+        :type percentiles: list of int/float or ``None``
+        :returns: a dict
+        :raises: ValueError when invalid values are provided for the measure,
+            the unit of measure or the percentiles, or the measurement series
+            is empty
+        """
+        if measure not in self.MEASURES:
+            raise ValueError("Invalid value for parameter 'measure'")
+        if unit not in ('kelvin', 'celsius', 'fahrenheit'):
+            raise ValueError("Invalid value for parameter 'unit'")
+        if percentiles is not None and \
+                any(p < 0 or p > 100 for p in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        stats = self._statistics(measure)
+        if measure == 'temperature' and unit != 'kelvin':
+            if unit == 'celsius':
+                convert = temputils.kelvin_to_celsius
+                scale = 1.
+            if unit == 'fahrenheit':
+                convert = temputils.kelvin_to_fahrenheit
+                scale = temputils.FAHRENHEIT_DEGREE_SCALE
+        else:
+            convert = lambda value: value
+            scale = 1.
+        result = {'count': stats['count'],
+                  'min': (stats['min'][0], convert(stats['min'][1])),
+                  'max': (stats['max'][0], convert(stats['max'][1])),
+                  'average': convert(stats['average']),
+                  'stddev': stats['stddev'] * scale}
+        if percentiles is not None:
+            values = self._sorted_values(measure)
+            result['percentiles'] = {
+                p: convert(self._percentile(values, p)) for p in percentiles}
+        return result
 
     def max_temperature(self,  unit='kelvin'):
         """Returns a tuple containing the max value in the temperature
@@ -112,8 +170,7 @@ class Historian(object):
         """
         if unit not in ('kelvin', 'celsius', 'fahrenheit'):
             raise ValueError("Invalid value for parameter 'unit'")
-        maximum = max(self._purge_none_samples(self.temperature_series()),
-                   key=itemgetter(1))
+        maximum = self._statistics('temperature')['max']
         if unit == 'kelvin':
             result = maximum
         if unit == 'celsius':
@@ -135,8 +192,7 @@ class Historian(object):
         """
         if unit not in ('kelvin', 'celsius', 'fahrenheit'):
             raise ValueError("Invalid value for parameter 'unit'")
-        minimum = min(self._purge_none_samples(self.temperature_series()),
-                   key=itemgetter(1))
+        minimum = self._statistics('temperature')['min']
         if unit == 'kelvin':
             result = minimum
         if unit == 'celsius':
@@ -157,8 +213,7 @@ class Historian(object):
         """
         if unit not in ('kelvin', 'celsius', 'fahrenheit'):
             raise ValueError("Invalid value for parameter 'unit'")
-        average = self._average(self._purge_none_samples(
-                                                  self.temperature_series()))
+        average = self._statistics('temperature')['average']
         if unit == 'kelvin':
             result = average
         if unit == 'celsius':
@@ -174,8 +229,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return max(self._purge_none_samples(self.humidity_series()),
-                   key=itemgetter(1))
+        return self._statistics('humidity')['max']
         
     def min_humidity(self):
         """Returns a tuple containing the min value in the humidity
@@ -184,8 +238,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return min(self._purge_none_samples(self.humidity_series()),
-                   key=itemgetter(1))
+        return self._statistics('humidity')['min']
 
     def average_humidity(self):
         """Returns the average value in the humidity series
@@ -193,8 +246,7 @@ class Historian(object):
         :returns: a float
         :raises: ValueError when the measurement series is empty
         """
-        return self._average(self._purge_none_samples(
-                                                  self.humidity_series()))
+        return self._statistics('humidity')['average']
 
     def max_pressure(self):
         """Returns a tuple containing the max value in the pressure
@@ -203,8 +255,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return max(self._purge_none_samples(self.pressure_series()),
-                   key=itemgetter(1))
+        return self._statistics('pressure')['max']
         
     def min_pressure(self):
         """Returns a tuple containing the min value in the pressure
@@ -213,8 +264,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return min(self._purge_none_samples(self.pressure_series()),
-                   key=itemgetter(1))
+        return self._statistics('pressure')['min']
 
     def average_pressure(self):
         """Returns the average value in the pressure series
@@ -222,8 +272,7 @@ class Historian(object):
         :returns: a float
         :raises: ValueError when the measurement series is empty
         """
-        return self._average(self._purge_none_samples(
-                                                  self.pressure_series()))
+        return self._statistics('pressure')['average']
 
     def max_rain(self):
         """Returns a tuple containing the max value in the rain
@@ -232,8 +281,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return max(self._purge_none_samples(self.rain_series()),
-                   key=lambda item:item[1])
+        return self._statistics('rain')['max']
         
     def min_rain(self):
         """Returns a tuple containing the min value in the rain
@@ -242,8 +290,7 @@ class Historian(object):
         :returns: a tuple
         :raises: ValueError when the measurement series is empty
         """
-        return min(self._purge_none_samples(self.rain_series()),
-                   key=itemgetter(1))
+        return self._statistics('rain')['min']
 
     def average_rain(self):
         """Returns the average value in the rain series
@@ -251,19 +298,86 @@ class Historian(object):
         :returns: a float
         :raises: ValueError when the measurement series is empty
         """
-        return self._average(self._purge_none_samples(
-                                                  self.rain_series()))
-
-    def _purge_none_samples(self, list_of_tuples):
-        return [item for item in list_of_tuples if item[1] is not None]
-
-    def _average(self, list_of_tuples):
-        if len(list_of_tuples) == 0:
-            raise ValueError("Empty data series: impossible to compute average")
-        total = 0.0
-        for tpl in list_of_tuples:
-            total += tpl[1]
-        return total/len(list_of_tuples)
+        return self._statistics('rain')['average']
+
+    def _columns(self):
+        """
+        Returns the station history measurements as columns: a list of the
+        sorted timestamps and a dict mapping each measure to the list of its
+        values, aligned with the timestamps. Columns are built once and rebuilt
+        - dropping the cached statistics - when the measurements are replaced
+        or their number changes
+
+        :returns: a tuple
+        """
+        measurements = self._station_history.get_measurements()
+        key = (id(measurements), len(measurements))
+        if key != self._columns_key:
+            self._statistics_cache.clear()
+            self._sorted_values_cache.clear()
+            timestamps = sorted(measurements)
+            columns = dict()
+            for measure in self.MEASURES:
+                columns[measure] = [measurements[tstamp].get(measure)
+                                    for tstamp in timestamps]
+            self._columns_cache = (timestamps, columns)
+            self._columns_key = key
+        return self._columns_cache
+
+    def _series(self, measure):
+        timestamps, columns = self._columns()
+        return list(zip(timestamps, columns[measure]))
+
+    def _statistics(self, measure):
+        """
+        Computes in a single pass over the values of the specified measure -
+        skipping ``None`` values - the samples count, the min and max samples,
+        the average and the population standard deviation. Results are cached.
+
+        :returns: a dict
+        :raises: ValueError when the measurement series is empty
+        """
+        timestamps, columns = self._columns()
+        if measure not in self._statistics_cache:
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            minimum = maximum = None
+            for tstamp, value in zip(timestamps, columns[measure]):
+                if value is None:
+                    continue
+                count += 1
+                # Welford's online algorithm for mean and variance
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+                if minimum is None or value < minimum[1]:
+                    minimum = (tstamp, value)
+                if maximum is None or value > maximum[1]:
+                    maximum = (tstamp, value)
+            self._statistics_cache[measure] = None if count == 0 else \
+                dict(count=count, min=minimum, max=maximum, average=mean,
+                     stddev=math.sqrt(m2 / count))
+        stats = self._statistics_cache[measure]
+        if stats is None:
+            raise ValueError("Empty data series: impossible to compute "
+                             "statistics")
+        return stats
+
+    def _sorted_values(self, measure):
+        columns = self._columns()[1]
+        if measure not in self._sorted_values_cache:
+            self._sorted_values_cache[measure] = sorted(
+                value for value in columns[measure] if value is not None)
+        return self._sorted_values_cache[measure]
+
+    def _percentile(self, sorted_values, percentile):
+        position = (len(sorted_values) - 1) * percentile / 100.
+        lower = int(math.floor(position))
+        upper = min(lower + 1, len(sorted_values) - 1)
+        weight = position - lower
+        return sorted_values[lower] * (1 - weight) + \
+            sorted_values[upper] * weight
 
     def __repr__(self):
         return "<%s.%s>" % (__name__, self.__class__.__name__)
@@ -18,12 +18,16 @@ from pyowm.pollutionapi30 import airpollution_client
 from pyowm.uvindexapi30 import uv_client
 from pyowm.exceptions import api_call_error
 from pyowm.utils import timeformatutils, stringutils, timeutils, geo
-from pyowm.weatherapi25 import forecaster
-from pyowm.weatherapi25 import historian
-from pyowm.stationsapi30 import stations_manager
-from pyowm.alertapi30 import alert_manager
-from pyowm.tiles import tile_manager
-from pyowm.agroapi10 import agro_manager
+from pyowm.utils.lazyutils import LazyModule
+
+
+# modules only needed by some of the features are imported upon first use
+forecaster = LazyModule('pyowm.weatherapi25.forecaster')
+historian = LazyModule('pyowm.weatherapi25.historian')
+stations_manager = LazyModule('pyowm.stationsapi30.stations_manager')
+alert_manager = LazyModule('pyowm.alertapi30.alert_manager')
+tile_manager = LazyModule('pyowm.tiles.tile_manager')
+agro_manager = LazyModule('pyowm.agroapi10.agro_manager')
 
 
 class OWM25(owm.OWM):
@@ -171,21 +175,25 @@ class OWM25(owm.OWM):
         """
         return alert_manager.AlertManager(self._API_key)
 
-    def tile_manager(self, layer_name):
+    def tile_manager(self, layer_name, image_cache=None):
         """
         Gives a `pyowm.tiles.tile_manager.TileManager` instance that can be used to fetch tile images.
         :param layer_name: the layer name for the tiles (values can be looked up on `pyowm.tiles.enums.MapLayerEnum`)
+        :param image_cache: optional cache of the downloaded tiles
+        :type image_cache: `pyowm.caches.imagecache.DiskImageCache` or `None`
         :return: a `pyowm.tiles.tile_manager.TileManager` instance
         """
-        return tile_manager.TileManager(self._API_key, map_layer=layer_name)
+        return tile_manager.TileManager(self._API_key, map_layer=layer_name, image_cache=image_cache)
 
-    def agro_manager(self):
+    def agro_manager(self, image_cache=None):
         """
         Gives a `pyowm.agro10.agro_manager.AgroManager` instance that can be used to read/write data from the
         Agricultural API.
+        :param image_cache: optional cache of the downloaded satellite images
+        :type image_cache: `pyowm.caches.imagecache.DiskImageCache` or `None`
         :return: a `pyowm.agro10.agro_manager.AgroManager` instance
         """
-        return agro_manager.AgroManager(self._API_key)
+        return agro_manager.AgroManager(self._API_key, image_cache=image_cache)
 
     def is_API_online(self):
         """
@@ -434,6 +442,36 @@ class OWM25(owm.OWM):
             reached, *ValueError* when coordinates values are out of bounds or
             negative values are provided for limit
         """
+        uri, params = self._stations_in_bbox_query(
+            lat_top_left, lon_top_left, lat_bottom_right, lon_bottom_right,
+            cluster, limit)
+        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
+        return self._parsers['observation_list'].parse_JSON(json_data)
+
+    def iter_weather_at_stations_in_bbox(self, lat_top_left, lon_top_left,
+                                         lat_bottom_right, lon_bottom_right,
+                                         cluster=False, limit=None):
+        """
+        Same as :func:`weather_at_stations_in_bbox`, but returns a generator
+        that yields each *Observation* object as soon as it is parsed out of
+        the API response, which is downloaded and decoded incrementally.
+        Memory usage is therefore independent of the number of results.
+
+        :returns: a generator of *Observation* objects
+        :raises: *ParseResponseException* when OWM Weather API responses' data
+            cannot be parsed, *APICallException* when OWM Weather API can not be
+            reached, *ValueError* when coordinates values are out of bounds or
+            negative values are provided for limit
+        """
+        uri, params = self._stations_in_bbox_query(
+            lat_top_left, lon_top_left, lat_bottom_right, lon_bottom_right,
+            cluster, limit)
+        return self._parsers['observation_list'].parse_JSON_stream(
+            self._wapi.get_json_stream(uri, params=params))
+
+    def _stations_in_bbox_query(self, lat_top_left, lon_top_left,
+                                lat_bottom_right, lon_bottom_right, cluster,
+                                limit):
         assert type(cluster) is bool, "'cluster' must be a bool"
         assert type(limit) in (int, type(None)), \
                 "'limit' must be an int or None"
@@ -454,8 +492,7 @@ class OWM25(owm.OWM):
                                             self._API_key,
                                             self._subscription_type,
                                             self._use_ssl)
-        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
-        return self._parsers['observation_list'].parse_JSON(json_data)
+        return uri, params
 
     def weather_at_places_in_bbox(self, lon_left, lat_bottom, lon_right, lat_top,
                                   zoom=10, cluster=False):
@@ -486,6 +523,34 @@ class OWM25(owm.OWM):
             reached, *ValueError* when coordinates values are out of bounds or
             negative values are provided for limit
         """
+        uri, params = self._places_in_bbox_query(lon_left, lat_bottom,
+                                                 lon_right, lat_top, zoom,
+                                                 cluster)
+        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
+        return self._parsers['observation_list'].parse_JSON(json_data)
+
+    def iter_weather_at_places_in_bbox(self, lon_left, lat_bottom, lon_right,
+                                       lat_top, zoom=10, cluster=False):
+        """
+        Same as :func:`weather_at_places_in_bbox`, but returns a generator
+        that yields each *Observation* object as soon as it is parsed out of
+        the API response, which is downloaded and decoded incrementally.
+        Memory usage is therefore independent of the number of results.
+
+        :returns: a generator of *Observation* objects
+        :raises: *ParseResponseException* when OWM Weather API responses' data
+            cannot be parsed, *APICallException* when OWM Weather API can not be
+            reached, *ValueError* when coordinates values are out of bounds or
+            negative values are provided for limit
+        """
+        uri, params = self._places_in_bbox_query(lon_left, lat_bottom,
+                                                 lon_right, lat_top, zoom,
+                                                 cluster)
+        return self._parsers['observation_list'].parse_JSON_stream(
+            self._wapi.get_json_stream(uri, params=params))
+
+    def _places_in_bbox_query(self, lon_left, lat_bottom, lon_right, lat_top,
+                              zoom, cluster):
         geo.assert_is_lon(lon_left)
         geo.assert_is_lon(lon_right)
         geo.assert_is_lat(lat_bottom)
@@ -504,8 +569,7 @@ class OWM25(owm.OWM):
                                             self._API_key,
                                             self._subscription_type,
                                             self._use_ssl)
-        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
-        return self._parsers['observation_list'].parse_JSON(json_data)
+        return uri, params
 
     def weather_around_coords(self, lat, lon, limit=None):
         """
@@ -526,6 +590,28 @@ class OWM25(owm.OWM):
             reached, *ValueError* when coordinates values are out of bounds or
             negative values are provided for limit
         """
+        uri, params = self._around_coords_query(lat, lon, limit)
+        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
+        return self._parsers['observation_list'].parse_JSON(json_data)
+
+    def iter_weather_around_coords(self, lat, lon, limit=None):
+        """
+        Same as :func:`weather_around_coords`, but returns a generator
+        that yields each *Observation* object as soon as it is parsed out of
+        the API response, which is downloaded and decoded incrementally.
+        Memory usage is therefore independent of the number of results.
+
+        :returns: a generator of *Observation* objects
+        :raises: *ParseResponseException* when OWM Weather API responses' data
+            cannot be parsed, *APICallException* when OWM Weather API can not be
+            reached, *ValueError* when coordinates values are out of bounds or
+            negative values are provided for limit
+        """
+        uri, params = self._around_coords_query(lat, lon, limit)
+        return self._parsers['observation_list'].parse_JSON_stream(
+            self._wapi.get_json_stream(uri, params=params))
+
+    def _around_coords_query(self, lat, lon, limit):
         geo.assert_is_lon(lon)
         geo.assert_is_lat(lat)
         params = {'lon': lon, 'lat': lat, 'lang': self._language}
@@ -538,8 +624,7 @@ class OWM25(owm.OWM):
                                             self._API_key,
                                             self._subscription_type,
                                             self._use_ssl)
-        _, json_data = self._wapi.cacheable_get_json(uri, params=params)
-        return self._parsers['observation_list'].parse_JSON(json_data)
+        return uri, params
 
     def three_hours_forecast(self, name):
         """
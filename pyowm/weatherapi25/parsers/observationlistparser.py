@@ -4,6 +4,7 @@ returning lists of Observation objects
 """
 
 import json
+from pyowm.utils import jsonutils
 from pyowm.abstractions.jsonparser import JSONParser
 from pyowm.weatherapi25.parsers.observationparser import ObservationParser
 from pyowm.exceptions.parse_response_error import ParseResponseError
@@ -56,12 +57,49 @@ class ObservationListParser(JSONParser):
         if 'cnt' in d and d['cnt'] == 0:
             return []
         if 'list' in d:
-            return [observation_parser.parse_JSON(json.dumps(item)) \
-                    for item in d['list']]
+            return [observation_parser.parse_dict(item) for item in d['list']]
 
         # no way out..
         raise ParseResponseError(''.join([__name__,
                                 ': impossible to read JSON data']))
 
+    def parse_JSON_stream(self, JSON_chunks):
+        """
+        Lazily parses *Observation* instances out of raw JSON data provided
+        as an iterable of chunks, yielding each instance as soon as its data
+        has been decoded. Only one item at a time is held in memory.
+
+        :param JSON_chunks: iterable of raw JSON str or bytes chunks
+        :type JSON_chunks: iterable
+        :returns: a generator of *Observation* instances
+        :raises: *ParseResponseError* if it is impossible to find or parse the
+            data needed to build the result, *APIResponseError* if the OWM API
+            returns a HTTP status error
+
+        """
+        if JSON_chunks is None:
+            raise ParseResponseError('JSON data is None')
+        observation_parser = ObservationParser()
+        members = dict()
+        try:
+            for item in jsonutils.iter_array_items(JSON_chunks, key='list',
+                                                   members=members):
+                yield observation_parser.parse_dict(item)
+        except ValueError:
+            raise ParseResponseError(''.join([__name__,
+                                    ': impossible to read JSON data']))
+        if 'list' in members:
+            return
+        if 'cod' in members and members['cod'] not in ("200", 200):
+            if members['cod'] == "404" or members['cod'] == 404:
+                print("OWM API: data not found - response payload: " + json.dumps(members))
+                return
+            raise APIResponseError("OWM API: error - response payload: " + json.dumps(members), str(members['cod']))
+        if members.get('count') == "0" or members.get('cnt') == 0:
+            return
+        # no way out..
+        raise ParseResponseError(''.join([__name__,
+                                ': impossible to read JSON data']))
+
     def __repr__(self):
         return "<%s.%s>" % (__name__, self.__class__.__name__)
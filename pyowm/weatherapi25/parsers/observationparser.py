@@ -38,7 +38,21 @@ class ObservationParser(jsonparser.JSONParser):
         """
         if JSON_string is None:
             raise parse_response_error.ParseResponseError('JSON data is None')
-        d = loads(JSON_string)
+        return self.parse_dict(loads(JSON_string))
+
+    def parse_dict(self, d):
+        """
+        Parses an *Observation* instance out of a dictionary, as decoded from
+        raw JSON data.
+
+        :param d: the decoded JSON data
+        :type d: dict
+        :returns: an *Observation* instance or ``None`` if no data is available
+        :raises: *ParseResponseError* if it is impossible to find or parse the
+            data needed to build the result, *APIResponseError* if the
+            data embeds an HTTP status error
+
+        """
         # Check if server returned errors: this check overcomes the lack of use
         # of HTTP error status codes by the OWM API 2.5. This mechanism is
         # supposed to be deprecated as soon as the API fully adopts HTTP for
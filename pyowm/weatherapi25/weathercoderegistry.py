@@ -7,6 +7,11 @@ class WeatherCodeRegistry(object):
     """
     A registry class for looking up weather statuses from weather codes.
 
+    Upon instantiation the code ranges are compiled into a direct
+    code-to-status lookup table, so that each status lookup is a single list
+    access. Each status is also assigned a distinct bit, so that sets of
+    statuses can be represented and queried as integer bitmasks.
+
     :param code_ranges_dict: a dict containing the mapping between weather
         statuses (eg: "sun","clouds",etc) and weather code ranges
     :type code_ranges_dict: dict
@@ -16,22 +21,71 @@ class WeatherCodeRegistry(object):
 
     def __init__(self, code_ranges_dict):
         self._code_ranges_dict = code_ranges_dict
+        self._statuses = list(code_ranges_dict)
+        self._bitmasks = dict((status, 1 << i)
+                              for i, status in enumerate(self._statuses))
+        self._lookup_table = self._compile(code_ranges_dict)
+
+    def _compile(self, code_ranges_dict):
+        """
+        Builds the code-to-status lookup table: the item at position *n* is
+        the status mapped to weather code *n*, or ``None``. When ranges
+        overlap, the status coming first in the ranges dict wins.
+
+        :param code_ranges_dict: the weather statuses to code ranges mapping
+        :type code_ranges_dict: dict
+        :returns: list
+        """
+        ends = [_range['end'] for status in code_ranges_dict
+                for _range in code_ranges_dict[status]]
+        table = [None] * (max(ends) + 1 if ends else 0)
+        for status in reversed(self._statuses):
+            for _range in code_ranges_dict[status]:
+                start = max(_range['start'], 0)
+                for code in range(start, _range['end'] + 1):
+                    table[code] = status
+        return table
 
     def status_for(self, code):
         """
         Returns the weather status related to the specified weather status
         code, if any is stored, ``None`` otherwise.
 
-        :param code: the weather status code whose status is to be looked up
+        :param code: the weather status code whose status is to be looked up,
+            normalised with ``int()`` (so that eg: 800.0 is the same as 800)
         :type code: int
         :returns: the weather status str or ``None`` if the code is not mapped
         """
-        is_in = lambda start, end, n: True if start <= n <= end else False
-        for status in self._code_ranges_dict:
-            for _range in self._code_ranges_dict[status]:
-                if is_in(_range['start'],_range['end'],code):
-                    return status
-        return None
+        try:
+            code = int(code)
+            if code < 0:
+                return None
+            return self._lookup_table[code]
+        except (IndexError, TypeError, ValueError, OverflowError):
+            return None
+
+    def bitmask_for(self, status):
+        """
+        Returns the bitmask assigned to the specified weather status, or 0 if
+        the status is not known to this registry.
+
+        :param status: a weather status (eg: "rain")
+        :type status: str
+        :returns: int
+        """
+        return self._bitmasks.get(status, 0)
+
+    def bitmask_for_code(self, code):
+        """
+        Returns the bitmask of the weather status related to the specified
+        weather status code, or 0 if the code is not mapped.
+
+        :param code: the weather status code
+        :type code: int
+        :returns: int
+        """
+        status = self.status_for(code)
+        return 0 if status is None else self._bitmasks[status]
 
     def __repr__(self):
-        return "<%s.%s>" % (__name__, self.__class__.__name__)
\ No newline at end of file
+        return "<%s.%s>" % (__name__, self.__class__.__name__)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+import subprocess, sys, statistics
+
+
+"""
+This script measures the cold start time of the PyOWM library, that is the
+time taken by a fresh Python interpreter to import the library and to create
+an OWM object. Each measurement runs in a new interpreter, so that nothing is
+already imported.
+
+Usage:
+  python benchmark_import_time.py [number_of_runs]
+"""
+
+statement = '''
+import time
+start = time.perf_counter()
+import pyowm
+owm = pyowm.OWM()
+print(time.perf_counter() - start)
+'''
+
+heavy_modules = ['requests', 'pkg_resources', 'geojson',
+                 'pyowm.weatherapi25.parsers.observationparser']
+
+check = '''
+import sys
+import pyowm
+owm = pyowm.OWM()
+print(','.join(m for m in %r if m in sys.modules))
+''' % (heavy_modules,)
+
+
+def measure(runs):
+    timings = list()
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', statement])
+        timings.append(float(output.decode().strip()))
+    return timings
+
+
+def imported_heavy_modules():
+    output = subprocess.check_output([sys.executable, '-c', check])
+    return output.decode().strip() or 'none'
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print('Measuring "import pyowm; pyowm.OWM()" over %d runs ...' % (runs,))
+    timings = measure(runs)
+    print('  min:    %.1f ms' % (min(timings) * 1000,))
+    print('  median: %.1f ms' % (statistics.median(timings) * 1000,))
+    print('  max:    %.1f ms' % (max(timings) * 1000,))
+    print('Heavy modules imported: %s' % (imported_heavy_modules(),))
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import requests, sys, os, codecs, json, gzip, collections, csv
+from pyowm.weatherapi25 import binarycityids
 
 
 city_list_url = 'http://bulk.openweathermap.org/sample/city.list.json.gz'
@@ -15,7 +16,8 @@ ordered_csv_city_list = "city_list.ordered.csv"
 """
 This script is used to retrieve the city IDs list from the OWM web 2.5 API
 and then to divide the list into smaller chunks: each chunk is ordered by
-city ID and written to a separate file
+city ID and written to a separate file. The gzipped chunks are then also
+compiled into a binary, memory-mappable registry file
 
 URLs of source files:
   http://bulk.openweathermap.org/sample/city.list.json.gz
@@ -141,6 +143,15 @@ def write_subsets_to_files(ssets, outdir):
     print('... done')
 
 
+def write_binary_registry(outdir):
+    target = '%s%s%s' % (outdir, os.sep, binarycityids.FILENAME)
+    print('Writing binary registry: %s ...' % (target,))
+    sources = ['%s%s%s.txt.gz' % (outdir, os.sep, chunk)
+               for chunk in ('097-102', '103-108', '109-114', '115-122')]
+    binarycityids.write_from_gzip_files(sources, target)
+    print('... done')
+
+
 def gzip_csv_compress(plaintext_csv, target_gzip):
     print('G-zipping: %s -> %s ...' % (plaintext_csv, target_gzip))
     with open(plaintext_csv, 'r') as source:
@@ -173,5 +184,6 @@ if __name__ == '__main__':
     ssets = split_keyset(ordered_cities)
     write_subsets_to_files(ssets, target_folder)
     gzip_all(target_folder)
+    write_binary_registry(target_folder)
     print('Job finished')
 
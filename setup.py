@@ -1,8 +1,27 @@
 #!/usr/bin/env python
 
+import os
 from setuptools import setup
+from setuptools.command.build_py import build_py
 from pyowm import constants
 
+
+class BuildPyCommand(build_py):
+    """Also compiles the city ID files into the binary city IDs registry"""
+
+    def run(self):
+        build_py.run(self)
+        from pyowm.weatherapi25 import binarycityids
+        cityids = os.path.join('pyowm', 'weatherapi25', 'cityids')
+        sources = [os.path.join(cityids, '%s.txt.gz' % chunk)
+                   for chunk in ('097-102', '103-108', '109-114', '115-122')]
+        target = os.path.join(self.build_lib, cityids, binarycityids.FILENAME)
+        self.announce('compiling binary city IDs registry %s' % target, level=2)
+        if not self.dry_run:
+            self.mkpath(os.path.dirname(target))
+            binarycityids.write_from_gzip_files(sources, target)
+
+
 setup(
     name='pyowm',
     version=constants.PYOWM_VERSION,
@@ -26,6 +45,7 @@ setup(
     long_description="""PyOWM is a client Python wrapper library for OpenWeatherMap web APIs. It allows quick and easy 
     consumption of OWM data from Python applications via a simple object model and in a human-friendly fashion.""",
     include_package_data=True,
+    cmdclass={'build_py': BuildPyCommand},
     install_requires=[
         'requests>=2.20.0,<3',
         'geojson>=2.3.0,<3'
@@ -44,7 +64,7 @@ setup(
       "Intended Audience :: Developers",
       "Topic :: Software Development :: Libraries"],
     package_data={
-        '': ['*.gz', '*.xsd', '*.md', '*.txt', '*.json']
+        '': ['*.gz', '*.bin', '*.xsd', '*.md', '*.txt', '*.json']
     },
     keywords='openweathermap web api client weather forecast uv alerting owm pollution meteostation agro agriculture',
     license='MIT'
@@ -3,7 +3,7 @@
 import unittest
 import os
 import uuid
-from pyowm.commons.image import Image
+from pyowm.commons.image import Image, FileImage
 from pyowm.commons.enums import ImageTypeEnum
 
 
@@ -28,3 +28,46 @@ class TestImage(unittest.TestCase):
             self.fail()
         finally:
             os.remove(path)
+
+
+class TestFileImage(unittest.TestCase):
+
+    def test_data_is_memory_mapped(self):
+        path = '256x256.png'
+        with open(path, 'rb') as f:
+            expected = f.read()
+        i = FileImage(path, image_type=ImageTypeEnum.PNG)
+        self.assertEqual(len(expected), i.size)
+        self.assertEqual(len(expected), len(i.data))
+        self.assertEqual(expected[:8], i.data[:8])
+        self.assertEqual(expected, bytes(i.data))
+        i.close()
+        self.assertEqual(expected, bytes(i.data))
+        i.close()
+
+    def test_data_of_empty_files(self):
+        path = '%s.png' % uuid.uuid4()
+        try:
+            open(path, 'wb').close()
+            i = FileImage(path)
+            self.assertEqual(b'', i.data)
+            self.assertEqual(0, i.size)
+        finally:
+            os.remove(path)
+
+    def test_persist(self):
+        path = '%s.png' % uuid.uuid4()
+        try:
+            i = FileImage('256x256.png', image_type=ImageTypeEnum.PNG)
+            i.persist(path)
+            with open(path, 'rb') as f, open('256x256.png', 'rb') as g:
+                self.assertEqual(g.read(), f.read())
+            # persisting to the backing file is a no-op
+            i.persist('256x256.png')
+            self.assertEqual(os.path.getsize(path), i.size)
+        finally:
+            os.remove(path)
+
+    def test_fails_with_missing_file(self):
+        with self.assertRaises(AssertionError):
+            FileImage('%s.png' % uuid.uuid4())
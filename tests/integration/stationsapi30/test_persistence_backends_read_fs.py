@@ -1,10 +1,33 @@
 import unittest
 import os
 import tempfile
+import shutil
 import json
+import time
+from pyowm.exceptions.api_call_error import APICallError
+from pyowm.stationsapi30.ingestion import IngestionPipeline
 from pyowm.stationsapi30.measurement import Measurement
 from pyowm.stationsapi30.buffer import Buffer
-from pyowm.stationsapi30.persistence_backend import JSONPersistenceBackend
+from pyowm.stationsapi30.upload import ChunkedUploader
+from pyowm.stationsapi30.persistence_backend import JSONPersistenceBackend, \
+    JSONLinesPersistenceBackend, SQLitePersistenceBackend
+
+
+class MockStationsManager:
+
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.sent = []
+
+    def send_buffer(self, buffer):
+        if self.failing:
+            raise APICallError('unreachable')
+        self.sent.append([m.timestamp for m in buffer])
+
+    def send_buffer_in_chunks(self, buffer, chunk_size=500):
+        uploader = ChunkedUploader(self.send_buffer, chunk_size=chunk_size,
+                                   max_workers=1, retry_delay=0)
+        return uploader.upload(buffer)
 
 
 class TestJSONPersistenceBackendsReadFS(unittest.TestCase):
@@ -47,6 +70,402 @@ class TestJSONPersistenceBackendsReadFS(unittest.TestCase):
                 self.assertTrue(all(item in msmt.items()
                                     for item in self.data_dict.items()))
 
+    def test_json_persistence_backend_appends_and_clears(self):
+        with tempfile.NamedTemporaryFile() as tmp:
+            target_file = os.path.abspath(tmp.name)
+            be = JSONPersistenceBackend(target_file, 'mytest')
+            # an empty file holds no data
+            self.assertEqual(0, len(be.load_to_buffer()))
+            buffer = Buffer('mytest')
+            buffer.append(self.measurement)
+            be.append_buffer(buffer)
+            be.append_buffer(buffer)
+            self.assertEqual(2, len(be.load_to_buffer()))
+            be.clear()
+            self.assertEqual(0, len(be.load_to_buffer()))
+
+
+class TestJSONLinesPersistenceBackendsReadFS(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def buffer_of(self, *timestamps):
+        buffer = Buffer('mytest')
+        for ts in timestamps:
+            buffer.append(Measurement('mytest', ts, temperature=20,
+                                      weather_other=dict(key='val')))
+        return buffer
+
+    def timestamps_of(self, buffer):
+        return [m.timestamp for m in buffer]
+
+    def test_instantiation_fails_with_missing_dir(self):
+        with self.assertRaises(AssertionError):
+            JSONLinesPersistenceBackend(
+                os.path.join(self.dir_path, 'missing'), 'mytest')
+
+    def test_with_no_station_id_specified(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, None)
+        with self.assertRaises(ValueError):
+            be.load_to_buffer()
+        with self.assertRaises(ValueError):
+            list(be.iter_buffers())
+
+    def test_load_from_empty_dir(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest')
+        self.assertEqual(0, len(be.load_to_buffer()))
+        self.assertEqual([], list(be.iter_buffers()))
+        self.assertEqual([], be.segment_paths())
+
+    def test_append_and_load(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest')
+        be.append_buffer(self.buffer_of(1, 2))
+        be.append_buffer(self.buffer_of(3))
+        buf = be.load_to_buffer()
+        self.assertEqual([1, 2, 3], self.timestamps_of(buf))
+        msmt = list(buf)[0]
+        self.assertEqual(20, msmt.temperature)
+        self.assertEqual(dict(key='val'), msmt.weather_other)
+        be.close()
+
+        # a new backend on the same dir keeps on appending
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest')
+        be.append_buffer(self.buffer_of(4))
+        be.close()
+        self.assertEqual([1, 2, 3, 4],
+                         self.timestamps_of(be.load_to_buffer()))
+
+    def test_segments_are_rolled(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=2)
+        be.append_buffer(self.buffer_of(1, 2, 3))
+        be.append_buffer(self.buffer_of(4, 5))
+        be.close()
+        paths = be.segment_paths()
+        self.assertEqual(3, len(paths))
+        self.assertEqual('segment-00000001.jsonl', os.path.basename(paths[0]))
+        with open(paths[-1]) as f:
+            self.assertEqual(1, len(f.readlines()))
+        self.assertEqual([1, 2, 3, 4, 5],
+                         self.timestamps_of(be.load_to_buffer()))
+
+    def test_sync_every(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         sync_every=3)
+        be.append_buffer(self.buffer_of(1, 2))
+        self.assertEqual(2, be._unsynced)
+        be.append_buffer(self.buffer_of(3))
+        self.assertEqual(0, be._unsynced)
+        be.append_buffer(self.buffer_of(4))
+        be.close()
+        self.assertEqual(0, be._unsynced)
+        self.assertIsNone(be._file)
+
+    def test_iter_buffers(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=3)
+        be.append_buffer(self.buffer_of(*range(1, 8)))
+        result = [self.timestamps_of(b) for b in be.iter_buffers(chunk_size=2)]
+        self.assertEqual([[1, 2], [3, 4], [5, 6], [7]], result)
+        be.close()
+
+    def test_discard_first(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=3)
+        be.append_buffer(self.buffer_of(*range(1, 9)))
+        paths = be.segment_paths()
+        self.assertEqual(0, be.discard_first(0))
+        self.assertEqual(4, be.discard_first(4))
+        # the first segment is removed and the second one is rewritten
+        self.assertEqual(paths[1:], be.segment_paths())
+        self.assertEqual([5, 6, 7, 8], self.timestamps_of(be.load_to_buffer()))
+        be.append_buffer(self.buffer_of(9, 10))
+        self.assertEqual(3, len(be.segment_paths()))
+        self.assertEqual(6, be.discard_first(10))
+        self.assertEqual([], be.segment_paths())
+        be.append_buffer(self.buffer_of(11))
+        be.close()
+        self.assertEqual([11], self.timestamps_of(be.load_to_buffer()))
+
+    def test_interrupted_write_is_dropped(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest')
+        be.append_buffer(self.buffer_of(1, 2))
+        be.close()
+        with open(be.segment_paths()[-1], 'a') as f:
+            f.write('{"station_id": "myte')
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest')
+        be.append_buffer(self.buffer_of(3))
+        be.close()
+        self.assertEqual([1, 2, 3], self.timestamps_of(be.load_to_buffer()))
+
+    def test_compact(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=2)
+        be.append_buffer(self.buffer_of(*range(1, 8)))
+        self.assertEqual(4, len(be.segment_paths()))
+        dropped = be.compact()
+        self.assertEqual(0, dropped)
+        self.assertEqual(2, len(be.segment_paths()))
+        self.assertEqual(list(range(1, 8)),
+                         self.timestamps_of(be.load_to_buffer()))
+
+        # newly appended data keeps on going after the compacted data
+        be.append_buffer(self.buffer_of(8, 9))
+        be.close()
+        self.assertEqual(list(range(1, 10)),
+                         self.timestamps_of(be.load_to_buffer()))
+
+    def test_compact_dropping_old_measurements(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=2)
+        be.append_buffer(self.buffer_of(*range(1, 6)))
+        self.assertEqual(3, be.compact(older_than=4))
+        self.assertEqual([4, 5], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(2, len(be.segment_paths()))
+        self.assertEqual(0, be.compact(older_than=4))
+
+        # all of the compacted measurements are dropped
+        self.assertEqual(1, be.compact(older_than=100))
+        self.assertEqual([5], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(1, len(be.segment_paths()))
+        self.assertEqual(0, be.compact())
+        be.close()
+
+    def test_persist_replaces_saved_data(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=2)
+        be.append_buffer(self.buffer_of(1, 2, 3))
+        be.persist_buffer(self.buffer_of(4, 5, 6))
+        be.persist_buffer(self.buffer_of(4, 5, 6))
+        self.assertEqual([4, 5, 6], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(2, len(be.segment_paths()))
+
+        # the load-modify-persist pattern does not duplicate data
+        buf = be.load_to_buffer()
+        buf.append(Measurement('mytest', 7, temperature=20))
+        be.persist_buffer(buf)
+        be.append_buffer(self.buffer_of(8))
+        be.close()
+        self.assertEqual([4, 5, 6, 7, 8],
+                         self.timestamps_of(be.load_to_buffer()))
+
+        # persisting an empty buffer leaves no data
+        be.persist_buffer(Buffer('mytest'))
+        self.assertEqual([], be.segment_paths())
+        self.assertEqual(0, len(be.load_to_buffer()))
+
+    def test_append_buffer_and_clear(self):
+        be = JSONLinesPersistenceBackend(self.dir_path, 'mytest',
+                                         segment_size=2)
+        be.append_buffer(self.buffer_of(1, 2, 3))
+        be.append_buffer(self.buffer_of(4))
+        self.assertEqual([1, 2, 3, 4],
+                         self.timestamps_of(be.load_to_buffer()))
+        be.clear()
+        self.assertEqual([], be.segment_paths())
+        self.assertEqual(0, len(be.load_to_buffer()))
+        be.append_buffer(self.buffer_of(5))
+        be.close()
+        self.assertEqual([5], self.timestamps_of(be.load_to_buffer()))
+
+    def test_repr(self):
+        print(JSONLinesPersistenceBackend(self.dir_path, 'mytest'))
+
+
+class TestSQLitePersistenceBackendsReadFS(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.dir_path, 'measurements.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def buffer_of(self, station_id, *timestamps):
+        buffer = Buffer(station_id)
+        for ts in timestamps:
+            buffer.append(Measurement(station_id, ts, temperature=20,
+                                      weather_other=dict(key='val')))
+        return buffer
+
+    def timestamps_of(self, buffer):
+        return [m.timestamp for m in buffer]
+
+    def test_with_no_station_id_specified(self):
+        be = SQLitePersistenceBackend(self.db_path, None)
+        with self.assertRaises(ValueError):
+            be.load_to_buffer()
+        with self.assertRaises(ValueError):
+            be.delete()
+        self.assertEqual(0, len(be.load_to_buffer(station_id='mytest')))
+        be.close()
+
+    def test_with_wrong_time_window(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        with self.assertRaises(ValueError):
+            be.load_to_buffer(from_timestamp=10, to_timestamp=5)
+        with self.assertRaises(ValueError):
+            be.delete(from_timestamp=10, to_timestamp=5)
+        be.close()
+
+    def test_persist_and_load(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('mytest', 3, 1))
+        be.append_buffer(self.buffer_of('mytest', 2))
+        buf = be.load_to_buffer()
+        self.assertEqual('mytest', buf.station_id)
+        self.assertEqual([1, 2, 3], self.timestamps_of(buf))
+        msmt = list(buf)[0]
+        self.assertEqual(20, msmt.temperature)
+        self.assertEqual(dict(key='val'), msmt.weather_other)
+        be.close()
+
+        # data survives the backend
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        self.assertEqual([1, 2, 3], self.timestamps_of(be.load_to_buffer()))
+        be.close()
+
+    def test_load_time_window(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('mytest', *range(1, 11)))
+        self.assertEqual([3, 4, 5], self.timestamps_of(
+            be.load_to_buffer(from_timestamp=3, to_timestamp=5)))
+        self.assertEqual([9, 10], self.timestamps_of(
+            be.load_to_buffer(from_timestamp=9)))
+        self.assertEqual([1, 2], self.timestamps_of(
+            be.load_to_buffer(to_timestamp=2)))
+        self.assertEqual([], self.timestamps_of(
+            be.load_to_buffer(from_timestamp=20)))
+        be.close()
+
+    def test_per_station_filtering(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('mytest', 1, 2))
+        be.persist_buffer(self.buffer_of('other', 1, 3))
+        self.assertEqual(['mytest', 'other'], be.station_ids())
+        self.assertEqual([1, 2], self.timestamps_of(be.load_to_buffer()))
+        buf = be.load_to_buffer(station_id='other')
+        self.assertEqual('other', buf.station_id)
+        self.assertEqual([1, 3], self.timestamps_of(buf))
+        be.close()
+
+    def test_delete(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('mytest', *range(1, 6)))
+        be.persist_buffer(self.buffer_of('other', 1, 2))
+        self.assertEqual(2, be.delete(to_timestamp=2))
+        self.assertEqual([3, 4, 5], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(1, be.delete(from_timestamp=4, to_timestamp=4))
+        self.assertEqual([3, 5], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(2, be.delete(station_id='other'))
+        self.assertEqual(['mytest'], be.station_ids())
+        self.assertEqual(2, be.delete())
+        self.assertEqual([], be.station_ids())
+        be.close()
+
+    def test_iter_buffers(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.append_buffer(self.buffer_of('mytest', 5, 1, 3, 3, 2, 4, 3))
+        be.append_buffer(self.buffer_of('other', 1, 2))
+        result = [self.timestamps_of(b) for b in be.iter_buffers(chunk_size=2)]
+        self.assertEqual([[1, 2], [3, 3], [3, 4], [5]], result)
+        result = [self.timestamps_of(b) for b in be.iter_buffers(chunk_size=7)]
+        self.assertEqual([[1, 2, 3, 3, 3, 4, 5]], result)
+        result = [b.station_id for b in be.iter_buffers(station_id='other')]
+        self.assertEqual(['other'], result)
+        be.close()
+
+    def test_discard_first(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.append_buffer(self.buffer_of('mytest', 5, 1, 3, 3, 2, 4))
+        be.append_buffer(self.buffer_of('other', 1, 2))
+        self.assertEqual(3, be.discard_first(3))
+        self.assertEqual([3, 4, 5], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual(2, be.discard_first(5, station_id='other'))
+        self.assertEqual(3, be.discard_first(5))
+        self.assertEqual([], be.station_ids())
+        be.close()
+
+    def test_persist_replaces_stored_data_of_the_station(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('other', 1))
+        be.persist_buffer(self.buffer_of('mytest', 1, 2))
+        be.persist_buffer(self.buffer_of('mytest', 1, 2))
+        self.assertEqual([1, 2], self.timestamps_of(be.load_to_buffer()))
+
+        # the load-modify-persist pattern does not duplicate data
+        buf = be.load_to_buffer()
+        buf.append(Measurement('mytest', 3, temperature=20))
+        be.persist_buffer(buf)
+        self.assertEqual([1, 2, 3], self.timestamps_of(be.load_to_buffer()))
+        self.assertEqual([1], self.timestamps_of(
+            be.load_to_buffer(station_id='other')))
+        be.close()
+
+    def test_persist_is_transactional(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.persist_buffer(self.buffer_of('mytest', 5))
+        buffer = self.buffer_of('mytest', 1, 2)
+        buffer.measurements[1].timestamp = None
+        with self.assertRaises(Exception):
+            be.persist_buffer(buffer)
+        with self.assertRaises(Exception):
+            be.append_buffer(buffer)
+        self.assertEqual([5], self.timestamps_of(be.load_to_buffer()))
+        be.close()
+
+    def test_append_buffer_and_clear(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        be.append_buffer(self.buffer_of('mytest', 1))
+        be.append_buffer(self.buffer_of('mytest', 2))
+        be.append_buffer(self.buffer_of('other', 3))
+        self.assertEqual([1, 2], self.timestamps_of(be.load_to_buffer()))
+        be.clear()
+        self.assertEqual(0, len(be.load_to_buffer()))
+        self.assertEqual(['other'], be.station_ids())
+        be.close()
+
+    def test_ingestion_pipeline_spills_from_background_thread(self):
+        be = SQLitePersistenceBackend(self.db_path, 'mytest')
+        instance = IngestionPipeline(MockStationsManager(failing=True),
+                                     'mytest', max_size=1,
+                                     persistence_backend=be)
+        instance.start()
+        try:
+            instance.append(Measurement('mytest', 1, temperature=20))
+            deadline = time.monotonic() + 5
+            while instance.metrics()['failed_flushes'] == 0 and \
+                    time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            instance.stop(flush=False)
+        metrics = instance.metrics()
+        self.assertEqual(1, metrics['measurements_spilled'])
+        self.assertEqual(0, metrics['measurements_dropped'])
+        self.assertEqual([1], self.timestamps_of(be.load_to_buffer()))
+
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, 'mytest', persistence_backend=be)
+        self.assertEqual(1, instance.replay())
+        self.assertEqual([[1]], mgr.sent)
+        self.assertEqual(0, len(be.load_to_buffer()))
+        be.close()
+
+    def test_in_memory_database(self):
+        be = SQLitePersistenceBackend(':memory:', 'mytest')
+        be.append_buffer(self.buffer_of('mytest', 1))
+        self.assertEqual([1], self.timestamps_of(be.load_to_buffer()))
+        be.close()
+
+    def test_repr(self):
+        be = SQLitePersistenceBackend(':memory:', 'mytest')
+        print(be)
+        be.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,16 +1,22 @@
 import unittest
 import json
 import copy
+import os
+import shutil
+import tempfile
+import threading
+from pyowm.caches.imagecache import DiskImageCache
 from pyowm.constants import AGRO_API_VERSION
 from pyowm.commons.http_client import HttpClient
 from pyowm.commons.enums import ImageTypeEnum
-from pyowm.commons.image import Image
+from pyowm.commons.image import Image, FileImage
 from pyowm.commons.tile import Tile
 from pyowm.agroapi10.agro_manager import AgroManager
 from pyowm.agroapi10.polygon import Polygon, GeoPolygon, GeoPoint
 from pyowm.agroapi10.soil import Soil
 from pyowm.agroapi10.imagery import SatelliteImage, MetaPNGImage, MetaGeoTiffImage, MetaTile
 from pyowm.agroapi10.enums import PresetEnum, SatelliteEnum, PaletteEnum
+from pyowm.agroapi10.search import SatelliteImagerySearchResultSet
 
 
 class MockHttpClientPolygons(HttpClient):
@@ -92,6 +98,27 @@ class MockHttpClientReturningImage(HttpClient):
     def get_geotiff(self, uri, params=None, headers=None):
         return 200, self.d
 
+    def get_png_to_file(self, uri, path_to_file, params=None, headers=None, resume=True):
+        with open(path_to_file, 'wb') as f:
+            f.write(self.d)
+        return 200, len(self.d)
+
+    def get_geotiff_to_file(self, uri, path_to_file, params=None, headers=None, resume=True):
+        return self.get_png_to_file(uri, path_to_file, params=params, headers=headers, resume=resume)
+
+
+class MockHttpClientRecordingTiles(MockHttpClientReturningImage):
+
+    def __init__(self):
+        super(MockHttpClientRecordingTiles, self).__init__()
+        self.uris = []
+        self.lock = threading.Lock()
+
+    def get_png(self, uri, params=None, headers=None):
+        with self.lock:
+            self.uris.append(uri)
+        return 200, uri.encode()
+
 
 class MockHttpClientStats(HttpClient):
 
@@ -261,6 +288,80 @@ class TestAgroManager(unittest.TestCase):
         self.assertEqual(result.data.image_type, ImageTypeEnum.GEOTIFF)
         self.assertEqual(result.palette, PaletteEnum.GREEN)
 
+    def test_download_satellite_image_to_file(self):
+        instance = self.factory(MockHttpClientReturningImage)
+        metaimg = MetaGeoTiffImage('http://a.com', PresetEnum.FALSE_COLOR,
+                                   SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.tif')
+            result = instance.download_satellite_image(metaimg, path_to_file=path)
+            self.assertTrue(isinstance(result, SatelliteImage))
+            self.assertTrue(isinstance(result.data, FileImage))
+            self.assertEqual(path, result.data.path_to_file)
+            self.assertEqual(result.data.image_type, ImageTypeEnum.GEOTIFF)
+            self.assertEqual(MockHttpClientReturningImage.d, bytes(result.data.data))
+            result.data.close()
+        finally:
+            shutil.rmtree(target_dir)
+
+    def test_download_satellite_image_with_tile_png_to_file(self):
+        instance = self.factory(MockHttpClientReturningImage)
+        metaimg = MetaTile('http://a.com', PresetEnum.FALSE_COLOR,
+                           SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'tile.png')
+            result = instance.download_satellite_image(metaimg, x=1, y=2, zoom=3, path_to_file=path)
+            self.assertTrue(isinstance(result.data, Tile))
+            self.assertTrue(isinstance(result.data.image, FileImage))
+            self.assertEqual(result.data.image.image_type, ImageTypeEnum.PNG)
+            self.assertEqual(len(MockHttpClientReturningImage.d), result.data.image.size)
+        finally:
+            shutil.rmtree(target_dir)
+
+    def test_download_satellite_image_uses_image_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            instance = self.factory(MockHttpClientRecordingTiles)
+            instance.image_cache = DiskImageCache(cache_dir)
+            metaimg = MetaPNGImage('http://a.com/image?appid=key', PresetEnum.NDVI,
+                                   SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+            first = instance.download_satellite_image(metaimg, palette=PaletteEnum.GREEN)
+            second = instance.download_satellite_image(metaimg, palette=PaletteEnum.GREEN)
+            self.assertEqual(first.data.data, second.data.data)
+            self.assertEqual(1, len(instance.http_client.uris))
+            # palettes give different images
+            instance.download_satellite_image(metaimg, palette=PaletteEnum.BLACK_AND_WHITE)
+            self.assertEqual(2, len(instance.http_client.uris))
+            self.assertEqual(2, len(instance.image_cache))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_download_satellite_image_to_file_uses_image_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            instance = self.factory(MockHttpClientReturningImage)
+            instance.image_cache = DiskImageCache(cache_dir)
+            metaimg = MetaGeoTiffImage('http://a.com', PresetEnum.FALSE_COLOR,
+                                       SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+            first_path = os.path.join(cache_dir, 'first.tif')
+            instance.download_satellite_image(metaimg, path_to_file=first_path)
+            self.assertEqual(1, len(instance.image_cache))
+
+            # a cache hit does not download the image again
+            instance.http_client = None
+            second_path = os.path.join(cache_dir, 'second.tif')
+            result = instance.download_satellite_image(metaimg, path_to_file=second_path)
+            self.assertEqual(second_path, result.data.path_to_file)
+            self.assertEqual(MockHttpClientReturningImage.d, bytes(result.data.data))
+            result.data.close()
+            # so does it for images downloaded to memory
+            result = instance.download_satellite_image(metaimg)
+            self.assertEqual(MockHttpClientReturningImage.d, result.data.data)
+        finally:
+            shutil.rmtree(cache_dir)
+
     def test_download_satellite_image_with_tile_png_fails_without_tile_coords(self):
         instance = self.factory(MockHttpClientReturningImage)
         metaimg = MetaTile('http://a.com', PresetEnum.FALSE_COLOR,
@@ -272,6 +373,62 @@ class TestAgroManager(unittest.TestCase):
         with self.assertRaises(AssertionError):
             instance.download_satellite_image(metaimg, x=1, y=2)
 
+    def test_download_satellite_tiles(self):
+        instance = self.factory(MockHttpClientRecordingTiles)
+        metaimg = MetaTile('http://a.com/{z}/{x}/{y}', PresetEnum.FALSE_COLOR,
+                           SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        bbox = (12.45, 41.85, 12.55, 41.95)
+        results = instance.download_satellite_tiles(metaimg, bbox, range(13, 15), max_workers=3)
+        self.assertFalse(isinstance(results, list))
+        results = list(results)
+        expected = [(x, y, z) for z in (13, 14) for x, y in Tile.tile_coords_for_bbox(*bbox, zoom=z)]
+        self.assertEqual(expected, [(r.data.x, r.data.y, r.data.zoom) for r in results])
+        self.assertEqual(len(expected), len(instance.http_client.uris))
+        for r in results:
+            self.assertTrue(isinstance(r, SatelliteImage))
+            self.assertEqual('http://a.com/%s/%s/%s' % (r.data.zoom, r.data.x, r.data.y),
+                             r.data.image.data.decode())
+
+    def test_download_satellite_tiles_covering_polygon(self):
+        instance = self.factory(MockHttpClientRecordingTiles)
+        metaimg = MetaTile('http://a.com/{z}/{x}/{y}', PresetEnum.FALSE_COLOR,
+                           SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        geopolygon = GeoPolygon([[[12.45, 41.85], [12.55, 41.85], [12.55, 41.95], [12.45, 41.85]]])
+        polygon = Polygon('id', geopolygon=geopolygon)
+        expected = [(x, y) for x, y in Tile.tile_coords_for_bbox(12.45, 41.85, 12.55, 41.95, 14)]
+        for area in (geopolygon, polygon):
+            results = instance.download_satellite_tiles(metaimg, area, 14)
+            self.assertEqual(expected, [(r.data.x, r.data.y) for r in results])
+
+    def test_download_satellite_tiles_to_disk(self):
+        instance = self.factory(MockHttpClientRecordingTiles)
+        metaimg = MetaTile('http://a.com/{z}/{x}/{y}', PresetEnum.FALSE_COLOR,
+                           SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        target_dir = tempfile.mkdtemp()
+        try:
+            results = list(instance.download_satellite_tiles(metaimg, (12.49, 41.89, 12.49, 41.89), [10, 11],
+                                                             target_dir=target_dir))
+            self.assertEqual(2, len(results))
+            for r in results:
+                path = os.path.join(target_dir, str(r.data.zoom), str(r.data.x), '%s.png' % r.data.y)
+                with open(path, 'rb') as f:
+                    self.assertEqual(r.data.image.data, f.read())
+        finally:
+            shutil.rmtree(target_dir)
+
+    def test_download_satellite_tiles_fails_with_wrong_arguments(self):
+        instance = self.factory(MockHttpClientRecordingTiles)
+        metaimg = MetaPNGImage('http://a.com', PresetEnum.FALSE_COLOR,
+                               SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        with self.assertRaises(AssertionError):
+            instance.download_satellite_tiles(metaimg, (0, 0, 1, 1), 3)
+        metaimg = MetaTile('http://a.com', PresetEnum.FALSE_COLOR,
+                           SatelliteEnum.SENTINEL_2.name, 1378459200, 98.2, 0.3, 11.7, 7.89, 'a1b2c3d4')
+        with self.assertRaises(AssertionError):
+            instance.download_satellite_tiles(metaimg, (0, 0, 1), 3)
+        with self.assertRaises(AssertionError):
+            instance.download_satellite_tiles(metaimg, (0, 0, 1, 1), 3, max_workers=0)
+
     def test_download_satellite_image_with_tile_png(self):
         instance = self.factory(MockHttpClientReturningImage)
         metaimg = MetaTile('http://a.com', PresetEnum.FALSE_COLOR,
@@ -366,6 +523,16 @@ class TestAgroManager(unittest.TestCase):
         except:
             self.fail()
 
+    def test_search_satellite_imagery_as_result_set(self):
+        instance = self.factory(MockHttpClientImagerySearch)
+        result_set = instance.search_satellite_imagery('test_pol', 1480699083, 1480782083, as_result_set=True)
+        self.assertTrue(isinstance(result_set, SatelliteImagerySearchResultSet))
+        self.assertEqual(12, len(result_set))
+        self.assertEqual(2, len(result_set.query().with_img_type(ImageTypeEnum.PNG).with_preset(PresetEnum.EVI)))
+        with self.assertRaises(AssertionError):
+            instance.search_satellite_imagery('test_pol', 1480699083, 1480782083, preset=PresetEnum.EVI,
+                                              as_result_set=True)
+
     def test_search_satellite_imagery(self):
         instance = self.factory(MockHttpClientImagerySearch)
 
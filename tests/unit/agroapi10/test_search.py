@@ -2,7 +2,7 @@ import unittest
 import json
 from datetime import datetime
 from pyowm.commons.enums import ImageTypeEnum
-from pyowm.agroapi10.search import SatelliteImagerySearchResultSet
+from pyowm.agroapi10.search import SatelliteImagerySearchResultSet, SatelliteImageryQuery
 from pyowm.agroapi10.enums import PresetEnum
 from pyowm.utils.timeformatutils import UTC
 
@@ -108,3 +108,95 @@ class TestSatelliteImagerySearchResultSet(unittest.TestCase):
         self.assertEqual(1, len(result))
         result = self.test_instance.with_img_type_and_preset(ImageTypeEnum.GEOTIFF, PresetEnum.FALSE_COLOR)
         self.assertEqual(1, len(result))
+
+
+class TestSatelliteImageryQuery(unittest.TestCase):
+
+    @staticmethod
+    def record(dt, satellite, valid_data, clouds):
+        return {'dt': dt, 'type': satellite, 'dc': valid_data, 'cl': clouds,
+                'sun': {'azimuth': 126.742, 'elevation': 63.572},
+                'image': {'truecolor': 'http://a.com/image/truecolor/%d' % dt,
+                          'ndvi': 'http://a.com/image/ndvi/%d' % dt},
+                'data': {'ndvi': 'http://a.com/data/ndvi/%d' % dt}}
+
+    # records are not sorted by acquisition time on purpose
+    test_data = [record.__func__(1503000000, 'Landsat 8', 100, 1.56),
+                 record.__func__(1500000000, 'Sentinel-2', 80.5, 20),
+                 record.__func__(1502000000, 'Landsat 8', 95, 0),
+                 record.__func__(1501000000, 'Sentinel-2', 99, 7.5)]
+
+    test_instance = SatelliteImagerySearchResultSet('my_polygon', test_data, 1378459200)
+
+    def acquisition_times(self, metaimages):
+        return [mi.acquisition_time() for mi in metaimages]
+
+    def test_query(self):
+        query = self.test_instance.query()
+        self.assertTrue(isinstance(query, SatelliteImageryQuery))
+        self.assertEqual(12, len(query))
+        self.assertEqual(self.test_instance.metaimages, query.all())
+        self.assertEqual(self.test_instance.metaimages, list(query))
+
+    def test_with_satellite(self):
+        result = self.test_instance.query().with_satellite('Landsat 8').all()
+        self.assertEqual(6, len(result))
+        self.assertTrue(all(mi.satellite_name == 'Landsat 8' for mi in result))
+        self.assertEqual(0, len(self.test_instance.query().with_satellite('Landsat 7')))
+        with self.assertRaises(AssertionError):
+            self.test_instance.query().with_satellite(1234)
+
+    def test_acquired_between(self):
+        result = self.test_instance.query().acquired_between(1500000000, 1501000000).all()
+        self.assertEqual(6, len(result))
+        # results keep the order of the result set
+        self.assertEqual([1500000000] * 3 + [1501000000] * 3, self.acquisition_times(result))
+        self.assertEqual(3, len(self.test_instance.query().acquired_between('2017-08-06 06:13:20+00',
+                                                                    '2017-08-06 06:13:20+00')))
+        self.assertEqual(0, len(self.test_instance.query().acquired_between(1400000000, 1499999999)))
+        with self.assertRaises(AssertionError):
+            self.test_instance.query().acquired_between(1501000000, 1500000000)
+
+    def test_max_clouds(self):
+        result = self.test_instance.query().max_clouds(7.5).all()
+        self.assertEqual(9, len(result))
+        self.assertTrue(all(mi.cloud_coverage_percentage <= 7.5 for mi in result))
+        self.assertEqual(3, len(self.test_instance.query().max_clouds(0)))
+        with self.assertRaises(AssertionError):
+            self.test_instance.query().max_clouds(-1)
+
+    def test_best_n_by_valid_data(self):
+        result = self.test_instance.query().best_n_by_valid_data(4).all()
+        self.assertEqual([100, 100, 100, 99], [mi.valid_data_percentage for mi in result])
+        self.assertEqual(12, len(self.test_instance.query().best_n_by_valid_data(100)))
+        self.assertEqual(0, len(self.test_instance.query().best_n_by_valid_data(0)))
+        with self.assertRaises(AssertionError):
+            self.test_instance.query().best_n_by_valid_data(-1)
+
+    def test_composed_filters(self):
+        query = self.test_instance.query().with_img_type(ImageTypeEnum.PNG).with_preset(PresetEnum.NDVI)
+        self.assertEqual(4, len(query))
+        result = query.acquired_between(1500000000, 1501000000).max_clouds(10).all()
+        self.assertEqual(1, len(result))
+        self.assertEqual(1501000000, result[0].acquisition_time())
+        self.assertEqual(ImageTypeEnum.PNG, result[0].image_type)
+        self.assertEqual(PresetEnum.NDVI, result[0].preset)
+
+        # filters can be chained after ranking, and ranking is kept
+        result = query.best_n_by_valid_data(3).with_satellite('Landsat 8').all()
+        self.assertEqual([100, 95], [mi.valid_data_percentage for mi in result])
+
+        # queries are not changed by further filters
+        self.assertEqual(4, len(query))
+
+    def test_with_methods_match_queries(self):
+        self.assertEqual(self.test_instance.query().with_preset(PresetEnum.NDVI).all(),
+                         self.test_instance.with_preset(PresetEnum.NDVI))
+        self.assertEqual(self.test_instance.query().with_img_type(ImageTypeEnum.GEOTIFF).all(),
+                         self.test_instance.with_img_type(ImageTypeEnum.GEOTIFF))
+        self.assertEqual(4, len(self.test_instance.with_img_type(ImageTypeEnum.GEOTIFF)))
+        self.assertEqual(4, len(self.test_instance.with_img_type_and_preset(ImageTypeEnum.PNG,
+                                                                            PresetEnum.TRUE_COLOR)))
+
+    def test_repr(self):
+        self.assertIn('3 results selected out of 12', repr(self.test_instance.query().max_clouds(0)))
@@ -0,0 +1,179 @@
+"""
+Test case for imagecache.py module.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pyowm.caches.imagecache import DiskImageCache
+
+
+class TestDiskImageCache(unittest.TestCase):
+
+    __test_url = "http://Test.com/path/image.png?b=2&a=1&appid=my_key"
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_instantiation_fails_with_wrong_arguments(self):
+        self.assertRaises(AssertionError, DiskImageCache, None)
+        self.assertRaises(AssertionError, DiskImageCache, self.cache_dir, 0)
+        self.assertRaises(AssertionError, DiskImageCache, self.cache_dir, 1.5)
+
+    def test_instantiation_creates_cache_dir(self):
+        cache_dir = os.path.join(self.cache_dir, 'a', 'b')
+        DiskImageCache(cache_dir)
+        self.assertTrue(os.path.isdir(cache_dir))
+
+    def test_key_for_normalises_requests(self):
+        key = DiskImageCache.key_for(self.__test_url)
+        self.assertEqual(64, len(key))
+        self.assertEqual(key, DiskImageCache.key_for(
+            'http://test.com/path/image.png?a=1&b=2'))
+        self.assertEqual(key, DiskImageCache.key_for(
+            'http://test.com/path/image.png?appid=other_key',
+            params=dict(b=2, a='1')))
+        self.assertNotEqual(key, DiskImageCache.key_for(
+            'http://test.com/path/image.png?a=1&b=3'))
+        self.assertNotEqual(key, DiskImageCache.key_for(
+            'http://test.com/path/Image.png?a=1&b=2'))
+
+    def test_get_and_set(self):
+        instance = DiskImageCache(self.cache_dir)
+        key = instance.key_for(self.__test_url)
+        self.assertIsNone(instance.get(key))
+        instance.set(key, b'1234567890')
+        self.assertEqual(b'1234567890', instance.get(key))
+        self.assertIn(key, instance)
+        self.assertEqual(1, len(instance))
+        self.assertEqual(10, instance.size())
+        # overwriting
+        instance.set(key, b'12345')
+        self.assertEqual(b'12345', instance.get(key))
+        self.assertEqual(1, len(instance))
+        self.assertEqual(5, instance.size())
+        # no temporary files are left behind
+        self.assertEqual([key], os.listdir(os.path.join(self.cache_dir,
+                                                        key[:2])))
+
+    def test_get_and_set_fail_with_invalid_keys(self):
+        instance = DiskImageCache(self.cache_dir)
+        self.assertRaises(ValueError, instance.get, '../../etc/passwd')
+        self.assertRaises(ValueError, instance.set, 'abc', b'123')
+
+    def test_get_to_file_and_set_from_file(self):
+        instance = DiskImageCache(self.cache_dir)
+        key = instance.key_for(self.__test_url)
+        source = os.path.join(self.cache_dir, 'source.tif')
+        target = os.path.join(self.cache_dir, 'target.tif')
+        with open(source, 'wb') as f:
+            f.write(b'1234567890')
+        self.assertFalse(instance.get_to_file(key, target))
+        self.assertFalse(os.path.exists(target))
+        instance.set_from_file(key, source)
+        self.assertTrue(instance.get_to_file(key, target))
+        with open(target, 'rb') as f:
+            self.assertEqual(b'1234567890', f.read())
+        self.assertEqual(10, instance.size())
+
+    def test_least_recently_used_images_are_evicted(self):
+        instance = DiskImageCache(self.cache_dir, max_size=25)
+        keys = [instance.key_for('http://test.com/%d.png' % i)
+                for i in range(3)]
+        instance.set(keys[0], b'0' * 10)
+        instance.set(keys[1], b'1' * 10)
+        instance.get(keys[0])
+        instance.set(keys[2], b'2' * 10)
+        self.assertEqual(20, instance.size())
+        self.assertIsNone(instance.get(keys[1]))
+        self.assertEqual(b'0' * 10, instance.get(keys[0]))
+        self.assertEqual(b'2' * 10, instance.get(keys[2]))
+
+    def test_images_bigger_than_the_cache_are_not_cached(self):
+        instance = DiskImageCache(self.cache_dir, max_size=5)
+        key = instance.key_for(self.__test_url)
+        instance.set(key, b'1234567890')
+        self.assertIsNone(instance.get(key))
+        self.assertEqual(0, instance.size())
+
+    def test_cached_images_survive_restarts(self):
+        instance = DiskImageCache(self.cache_dir, max_size=25)
+        keys = [instance.key_for('http://test.com/%d.png' % i)
+                for i in range(3)]
+        instance.set(keys[0], b'0' * 10)
+        instance.set(keys[1], b'1' * 10)
+        os.utime(os.path.join(self.cache_dir, keys[0][:2], keys[0]),
+                 (1000, 1000))
+
+        instance = DiskImageCache(self.cache_dir, max_size=25)
+        self.assertEqual(2, len(instance))
+        self.assertEqual(20, instance.size())
+        # recency of use is read from disk
+        instance.set(keys[2], b'2' * 10)
+        self.assertIsNone(instance.get(keys[0]))
+        self.assertEqual(b'1' * 10, instance.get(keys[1]))
+
+        # a smaller cache evicts images upon instantiation
+        instance = DiskImageCache(self.cache_dir, max_size=15)
+        self.assertEqual(1, len(instance))
+
+    def test_images_removed_by_others_are_misses(self):
+        instance = DiskImageCache(self.cache_dir)
+        key = instance.key_for(self.__test_url)
+        instance.set(key, b'1234567890')
+        os.remove(os.path.join(self.cache_dir, key[:2], key))
+        self.assertIsNone(instance.get(key))
+        self.assertFalse(instance.get_to_file(
+            key, os.path.join(self.cache_dir, 'target.png')))
+
+    def test_remove_and_clean(self):
+        instance = DiskImageCache(self.cache_dir)
+        keys = [instance.key_for('http://test.com/%d.png' % i)
+                for i in range(3)]
+        for key in keys:
+            instance.set(key, b'123')
+        instance.remove(keys[0])
+        instance.remove(keys[0])
+        self.assertIsNone(instance.get(keys[0]))
+        self.assertEqual(6, instance.size())
+        instance.clean()
+        self.assertEqual(0, len(instance))
+        self.assertEqual(0, instance.size())
+        self.assertIsNone(instance.get(keys[1]))
+
+    def test_concurrent_reads_and_writes(self):
+        instance = DiskImageCache(self.cache_dir, max_size=1000)
+        keys = [instance.key_for('http://test.com/%d.png' % i)
+                for i in range(20)]
+        errors = []
+
+        def work(n):
+            try:
+                for i, key in enumerate(keys):
+                    data = bytes([i]) * 100
+                    instance.set(key, data)
+                    result = instance.get(keys[(i + n) % len(keys)])
+                    # images are never read partially written
+                    if result is not None:
+                        self.assertEqual(100, len(result))
+                        self.assertEqual(1, len(set(result)))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], errors)
+        self.assertLessEqual(instance.size(), 1000)
+        self.assertEqual(instance.size(), 100 * len(instance))
+
+    def test_repr(self):
+        instance = DiskImageCache(self.cache_dir, max_size=100)
+        self.assertIn('max size=100', repr(instance))
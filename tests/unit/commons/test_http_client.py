@@ -3,6 +3,9 @@
 import unittest
 import requests
 import json
+import os
+import shutil
+import tempfile
 from pyowm.exceptions import api_call_error, api_response_error, parse_response_error
 from pyowm.commons.http_client import HttpClient
 
@@ -16,6 +19,58 @@ class MockResponse:
     def json(self):
         return json.loads(self.text)
 
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i+chunk_size]
+
+    def close(self):
+        pass
+
+
+class MockStreamedResponse(MockResponse):
+    def __init__(self, status, payload, headers=None):
+        super(MockStreamedResponse, self).__init__(status, payload)
+        self.headers = headers or dict()
+
+
+def range_serving_get(payload, requests_headers, honour_range=True,
+                      sent_size=None, etag='"v1"'):
+    # emulates a server streaming the payload, possibly from the requested
+    # offset on if the resource did not change; only the first sent_size
+    # bytes are sent, if specified
+    def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                           timeout=None, verify=False):
+        requests_headers.append(headers)
+        range_header = headers.get('Range')
+        if range_header is None or not honour_range or \
+                headers.get('If-Range') != etag:
+            status, start = 200, 0
+            response_headers = {'Content-Length': str(len(payload))}
+        else:
+            start = int(range_header[len('bytes='):-1])
+            if start >= len(payload):
+                return MockStreamedResponse(416, b'')
+            status = 206
+            response_headers = {
+                'Content-Length': str(len(payload) - start),
+                'Content-Range': 'bytes %d-%d/%d' % (start, len(payload) - 1,
+                                                     len(payload))}
+        if etag is not None:
+            response_headers['ETag'] = etag
+        body = payload[start:]
+        if sent_size is not None:
+            body = body[:sent_size]
+        return MockStreamedResponse(status, body, response_headers)
+    return monkey_patched_get
+
+
+def write_partial_download(path, data, validator='"v1"'):
+    with open(path + '.part', 'wb') as f:
+        f.write(data)
+    if validator is not None:
+        with open(path + '.part.validator', 'w') as f:
+            f.write(validator)
+
 
 class MockCache:
     def __init__(self, expected_back):
@@ -100,6 +155,59 @@ class TestHTTPClient(unittest.TestCase):
 
         requests.post = self.requests_original_post
 
+    def test_post_encoded_data(self):
+        expected_data = '{"key": "value"}'
+        sent = []
+
+        def monkey_patched_post(uri, params=None, headers=None, data=None,
+                                timeout=None, verify=False):
+            sent.append(data)
+            return MockResponse(201, expected_data)
+
+        requests.post = monkey_patched_post
+        try:
+            status, data = HttpClient().post('http://anyurl.com',
+                                             data=b'[{"key": 7}]')
+            self.assertEqual(json.loads(expected_data), data)
+            self.assertEqual([b'[{"key": 7}]'], sent)
+        finally:
+            requests.post = self.requests_original_post
+
+    def test_post_streamed_encoded_data(self):
+        sent = []
+
+        def monkey_patched_post(uri, params=None, headers=None, data=None,
+                                timeout=None, verify=False):
+            sent.append(b''.join(data))
+            return MockResponse(201, '{}')
+
+        def payload():
+            yield b'[{"key": 7}'
+            yield b']'
+
+        requests.post = monkey_patched_post
+        try:
+            HttpClient().post('http://anyurl.com', data=payload())
+            self.assertEqual([b'[{"key": 7}]'], sent)
+        finally:
+            requests.post = self.requests_original_post
+
+    def test_post_keeps_the_connection_error(self):
+        error = requests.exceptions.ConnectionError('refused')
+
+        def monkey_patched_post(uri, params=None, headers=None, json=None,
+                                timeout=None, verify=False):
+            raise error
+
+        requests.post = monkey_patched_post
+        try:
+            with self.assertRaises(
+                    api_call_error.APIInvalidSSLCertificateError) as ctx:
+                HttpClient().post('http://anyurl.com', data=dict(key='value'))
+            self.assertIs(error, ctx.exception.triggering_error)
+        finally:
+            requests.post = self.requests_original_post
+
     def test_put(self):
         expected_data = '{"key": "value"}'
 
@@ -149,8 +257,12 @@ class TestHTTPClient(unittest.TestCase):
             HttpClient.check_status_code(404, msg)
         with self.assertRaises(api_call_error.BadGatewayError):
             HttpClient.check_status_code(502, msg)
-        with self.assertRaises(api_call_error.APICallError):
+        with self.assertRaises(api_call_error.APICallError) as ctx:
             HttpClient.check_status_code(555, msg)
+        self.assertEqual(555, ctx.exception.status_code)
+        with self.assertRaises(api_call_error.APICallError) as ctx:
+            HttpClient.check_status_code(429, msg)
+        self.assertEqual(429, ctx.exception.status_code)
 
     def test_is_success(self):
         self.assertTrue(HttpClient.is_success(200))
@@ -234,6 +346,77 @@ class TestHTTPClient(unittest.TestCase):
         except api_call_error.APICallTimeoutError:
             requests.get = self.requests_original_get
 
+    def test_get_json_stream(self):
+        expected_data = '{"name": "james bond", "designation": "007"}'
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            self.assertTrue(stream)
+            return MockResponse(200, expected_data)
+
+        requests.get = monkey_patched_get
+        chunks = list(HttpClient().get_json_stream('http://anyurl.com',
+                                                   chunk_size=5))
+        requests.get = self.requests_original_get
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(expected_data, ''.join(chunks))
+
+    def test_get_json_stream_yields_chunks_before_the_end_of_the_body(self):
+        expected_data = '{"name": "james bond", "designation": "007"}'
+        sent = []
+
+        class MockSlowResponse(MockResponse):
+            def __init__(self, status, payload):
+                self.status_code = status
+                self.content = payload
+
+            @property
+            def text(self):
+                raise AssertionError('The whole body must not be read')
+
+            def iter_content(self, chunk_size=1):
+                for i in range(0, len(self.content), chunk_size):
+                    sent.append(i)
+                    yield self.content[i:i+chunk_size]
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            return MockSlowResponse(200, expected_data)
+
+        requests.get = monkey_patched_get
+        try:
+            chunks = HttpClient().get_json_stream('http://anyurl.com',
+                                                  chunk_size=5)
+            self.assertEqual(expected_data[:5], next(chunks))
+            self.assertEqual(1, len(sent))
+            self.assertEqual(expected_data, expected_data[:5] + ''.join(chunks))
+        finally:
+            requests.get = self.requests_original_get
+
+    def test_get_json_stream_with_cache_hit(self):
+        cached_data = '{"name": "james bond", "designation": "007"}'
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            self.fail('The API must not be called')
+
+        requests.get = monkey_patched_get
+        chunks = list(HttpClient(cache=MockCache(cached_data))
+                      .get_json_stream('http://anyurl.com'))
+        requests.get = self.requests_original_get
+        self.assertEqual([cached_data], chunks)
+
+    def test_get_json_stream_when_API_error(self):
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            return MockResponse(401, '{"message": "unauthorized"}')
+
+        requests.get = monkey_patched_get
+        self.assertRaises(api_response_error.UnauthorizedError, list,
+                          HttpClient().get_json_stream('http://anyurl.com'))
+        requests.get = self.requests_original_get
+
     def test_get_png(self):
         expected_data = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x01\x03\x00\x00\x00%\xdbV\xca\x00\x00\x00\x03PLTE\x00p\xff\xa5G\xab\xa1\x00\x00\x00\x01tRNS\xcc\xd24V\xfd\x00\x00\x00\nIDATx\x9ccb\x00\x00\x00\x06\x00\x0367|\xa8\x00\x00\x00\x00IEND\xaeB`\x82'
 
@@ -259,3 +442,228 @@ class TestHTTPClient(unittest.TestCase):
         self.assertIsInstance(data, bytes)
         self.assertEqual(expected_data, data)
         requests.get = self.requests_original_get
+
+    def test_download_to_file(self):
+        payload = bytes(range(256)) * 10
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            requests.get = range_serving_get(payload, requests_headers)
+            status, size = HttpClient().get_png_to_file('http://anyurl.com',
+                                                        path)
+            self.assertEqual(200, status)
+            self.assertEqual(len(payload), size)
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+            self.assertFalse(os.path.exists(path + '.part'))
+            self.assertEqual('image/png', requests_headers[0]['Accept'])
+            self.assertEqual('identity',
+                             requests_headers[0]['Accept-Encoding'])
+            self.assertNotIn('Range', requests_headers[0])
+            self.assertEqual(['image.png'], os.listdir(target_dir))
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_resumes_interrupted_downloads(self):
+        payload = bytes(range(256)) * 10
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.tif')
+            # the connection drops after 1000 bytes
+            requests.get = range_serving_get(payload, requests_headers,
+                                             sent_size=1000)
+            with self.assertRaises(api_call_error.APICallError):
+                HttpClient().get_geotiff_to_file('http://anyurl.com', path)
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(1000, os.path.getsize(path + '.part'))
+            with open(path + '.part.validator') as f:
+                self.assertEqual('"v1"', f.read())
+
+            requests.get = range_serving_get(payload, requests_headers)
+            status, size = HttpClient().get_geotiff_to_file(
+                'http://anyurl.com', path)
+            self.assertEqual(206, status)
+            self.assertEqual(len(payload), size)
+            self.assertEqual('bytes=1000-', requests_headers[1]['Range'])
+            self.assertEqual('"v1"', requests_headers[1]['If-Range'])
+            self.assertEqual('identity',
+                             requests_headers[1]['Accept-Encoding'])
+            self.assertEqual('image/tiff', requests_headers[1]['Accept'])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+            self.assertEqual(['image.tif'], os.listdir(target_dir))
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_restarts_when_resource_changed(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'abcde', validator='"v0"')
+            requests.get = range_serving_get(payload, requests_headers)
+            status, size = HttpClient().download_to_file('http://anyurl.com',
+                                                         path)
+            # the server sends the whole new resource rather than a range
+            self.assertEqual(200, status)
+            self.assertEqual(len(payload), size)
+            self.assertEqual('bytes=5-', requests_headers[0]['Range'])
+            self.assertEqual('"v0"', requests_headers[0]['If-Range'])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+            self.assertEqual(['image.png'], os.listdir(target_dir))
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_restarts_without_validator(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'01234', validator=None)
+            requests.get = range_serving_get(payload, requests_headers)
+            status, size = HttpClient().download_to_file('http://anyurl.com',
+                                                         path)
+            self.assertEqual(200, status)
+            self.assertNotIn('Range', requests_headers[0])
+            self.assertNotIn('If-Range', requests_headers[0])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_uses_last_modified_as_validator(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            requests_headers.append(headers)
+            return MockStreamedResponse(200, payload[:4], {
+                'Content-Length': str(len(payload)),
+                'ETag': 'W/"weak"',
+                'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            requests.get = monkey_patched_get
+            with self.assertRaises(api_call_error.APICallError):
+                HttpClient().download_to_file('http://anyurl.com', path)
+            with self.assertRaises(api_call_error.APICallError):
+                HttpClient().download_to_file('http://anyurl.com', path)
+            # weak ETags can't be used to resume downloads
+            self.assertEqual('Wed, 21 Oct 2015 07:28:00 GMT',
+                             requests_headers[1]['If-Range'])
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_without_resuming(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'abc')
+            requests.get = range_serving_get(payload, requests_headers)
+            HttpClient().download_to_file('http://anyurl.com', path,
+                                          resume=False)
+            self.assertNotIn('Range', requests_headers[0])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_when_server_ignores_ranges(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'01234')
+            requests.get = range_serving_get(payload, requests_headers,
+                                             honour_range=False)
+            status, size = HttpClient().download_to_file('http://anyurl.com',
+                                                         path)
+            self.assertEqual(200, status)
+            self.assertEqual('bytes=5-', requests_headers[0]['Range'])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_restarts_when_range_is_not_satisfiable(self):
+        payload = b'0123456789'
+        requests_headers = []
+        target_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'0123456789abcdef')
+            requests.get = range_serving_get(payload, requests_headers)
+            status, size = HttpClient().download_to_file('http://anyurl.com',
+                                                         path)
+            self.assertEqual(200, status)
+            self.assertEqual(2, len(requests_headers))
+            self.assertNotIn('Range', requests_headers[1])
+            with open(path, 'rb') as f:
+                self.assertEqual(payload, f.read())
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_fails_with_unexpected_content_range(self):
+        target_dir = tempfile.mkdtemp()
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            return MockStreamedResponse(206, b'56789', {
+                'Content-Range': 'bytes 5-9/10'})
+
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            write_partial_download(path, b'012')
+            requests.get = monkey_patched_get
+            with self.assertRaises(api_call_error.APICallError):
+                HttpClient().download_to_file('http://anyurl.com', path)
+            self.assertFalse(os.path.exists(path))
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_download_to_file_fails_with_error_status_code(self):
+        target_dir = tempfile.mkdtemp()
+
+        def monkey_patched_get(uri, stream=True, params=None, headers=None,
+                               timeout=None, verify=False):
+            return MockStreamedResponse(404, 'not found')
+
+        try:
+            path = os.path.join(target_dir, 'image.png')
+            requests.get = monkey_patched_get
+            with self.assertRaises(api_response_error.NotFoundError):
+                HttpClient().download_to_file('http://anyurl.com', path)
+            self.assertEqual([], os.listdir(target_dir))
+        finally:
+            requests.get = self.requests_original_get
+            shutil.rmtree(target_dir)
+
+    def test_parse_content_range(self):
+        self.assertEqual((200, 1000),
+                         HttpClient._parse_content_range('bytes 200-999/1000'))
+        self.assertEqual((200, None),
+                         HttpClient._parse_content_range('bytes 200-999/*'))
+        with self.assertRaises(api_call_error.APICallError):
+            HttpClient._parse_content_range(None)
+        with self.assertRaises(api_call_error.APICallError):
+            HttpClient._parse_content_range('bytes abc')
@@ -17,4 +17,26 @@ class TestTile(unittest.TestCase):
         instance = Tile(0, 0, 18, 'temperature', Image(b'x/1'))
         result = instance.bounding_polygon()
         self.assertIsInstance(result, Polygon)
-        print(result.geojson())
\ No newline at end of file
+        print(result.geojson())
+    def test_tile_coords_for_bbox(self):
+        # the whole world at zoom 1 is made of 4 tiles
+        self.assertEqual([(0, 0), (1, 0), (0, 1), (1, 1)],
+                         Tile.tile_coords_for_bbox(-180, -85, 180, 85, 1))
+        # a single point
+        x, y = Tile.geoocoords_to_tile_coords(12.49, 41.89, 15)
+        self.assertEqual([(x, y)],
+                         Tile.tile_coords_for_bbox(12.49, 41.89, 12.49, 41.89, 15))
+        # tiles are sorted row by row
+        result = Tile.tile_coords_for_bbox(12.45, 41.85, 12.55, 41.95, 13)
+        self.assertEqual(sorted(result, key=lambda c: (c[1], c[0])), result)
+        xs = set(c[0] for c in result)
+        ys = set(c[1] for c in result)
+        self.assertEqual(len(xs) * len(ys), len(result))
+        for x, y in result:
+            lon_left, lat_bottom, lon_right, lat_top = Tile.tile_coords_to_bbox(x, y, 13)
+            self.assertTrue(lon_left <= 12.55 and lon_right >= 12.45)
+            self.assertTrue(lat_bottom <= 41.95 and lat_top >= 41.85)
+
+    def test_tile_coords_for_bbox_fails_with_wrong_bbox(self):
+        self.assertRaises(AssertionError, Tile.tile_coords_for_bbox, 10, 0, 5, 1, 3)
+        self.assertRaises(AssertionError, Tile.tile_coords_for_bbox, 0, 10, 1, 5, 3)
@@ -0,0 +1,91 @@
+import unittest
+from pyowm.stationsapi30.measurement import Measurement, AggregatedMeasurement
+from pyowm.stationsapi30.buffer import Buffer, ColumnarBuffer
+from pyowm.stationsapi30.aggregation import aggregate
+
+
+class TestAggregation(unittest.TestCase):
+
+    station_id = 'mytest'
+    day = 1378425600  # 2013-09-06 00:00:00 UTC
+
+    def buffers_of(self, *measurements):
+        result = []
+        for kls in (Buffer, ColumnarBuffer):
+            buffer = kls(self.station_id)
+            for m in measurements:
+                buffer.append(m)
+            result.append(buffer)
+        return result
+
+    def msmt(self, timestamp, **kwargs):
+        return Measurement(self.station_id, timestamp, **kwargs)
+
+    def test_aggregate_fails_with_wrong_time_frame(self):
+        with self.assertRaises(ValueError):
+            aggregate(Buffer(self.station_id), 'y')
+        with self.assertRaises(AssertionError):
+            aggregate(None, 'm')
+
+    def test_aggregate_empty_buffer(self):
+        for buffer in self.buffers_of():
+            self.assertEqual([], aggregate(buffer, 'h'))
+
+    def test_aggregate_on_hour(self):
+        buffers = self.buffers_of(
+            self.msmt(self.day + 10, temperature=10, humidity=50.5),
+            self.msmt(self.day + 3599, temperature=20, pressure=1000),
+            self.msmt(self.day + 1800, temperature=30.0),
+            self.msmt(self.day + 3600, temperature=5, rain_1h=0.2))
+        for buffer in buffers:
+            result = aggregate(buffer, 'h')
+            self.assertEqual(2, len(result))
+            first, second = result
+            self.assertTrue(isinstance(first, AggregatedMeasurement))
+            self.assertEqual(self.station_id, first.station_id)
+            self.assertEqual('h', first.aggregated_on)
+            self.assertEqual(self.day, first.timestamp)
+            self.assertEqual(dict(min=10, max=30, average=20, weight=3),
+                             first.temp)
+            self.assertEqual(dict(min=50.5, max=50.5, average=50.5, weight=1),
+                             first.humidity)
+            self.assertEqual(dict(min=1000, max=1000, average=1000, weight=1),
+                             first.pressure)
+            self.assertEqual(dict(), first.wind)
+            self.assertEqual(dict(), first.precipitation)
+            self.assertEqual(self.day + 3600, second.timestamp)
+            self.assertEqual(dict(min=5, max=5, average=5, weight=1),
+                             second.temp)
+            self.assertEqual(dict(min=0.2, max=0.2, average=0.2, weight=1),
+                             second.precipitation)
+        # aggregating does not add columns for fields without values
+        self.assertEqual(('temperature', 'pressure', 'humidity', 'rain_1h'),
+                         buffers[1].fields())
+
+    def test_aggregate_on_minute_and_day(self):
+        buffers = self.buffers_of(
+            self.msmt(self.day + 86400 + 61, wind_speed=4),
+            self.msmt(self.day + 59, wind_speed=1),
+            self.msmt(self.day, wind_speed=3),
+            self.msmt(self.day + 60, wind_speed=2))
+        for buffer in buffers:
+            by_minute = aggregate(buffer, 'm')
+            self.assertEqual([self.day, self.day + 60, self.day + 86460],
+                             [a.timestamp for a in by_minute])
+            self.assertEqual(dict(min=1, max=3, average=2, weight=2),
+                             by_minute[0].wind)
+            by_day = aggregate(buffer, 'd')
+            self.assertEqual([self.day, self.day + 86400],
+                             [a.timestamp for a in by_day])
+            self.assertEqual(3, by_day[0].wind['weight'])
+            self.assertEqual('d', by_day[0].aggregated_on)
+
+    def test_aggregate_skips_values_that_are_not_numbers(self):
+        buffers = self.buffers_of(
+            self.msmt(self.day, temperature=dict(min=0, max=100)),
+            self.msmt(self.day + 1, temperature=12))
+        for buffer in buffers:
+            result = aggregate(buffer, 'm')
+            self.assertEqual(1, len(result))
+            self.assertEqual(dict(min=12, max=12, average=12, weight=1),
+                             result[0].temp)
@@ -1,9 +1,10 @@
 import unittest
 import json
+import math
 from copy import deepcopy
 from datetime import datetime as dt
 from pyowm.stationsapi30.measurement import Measurement
-from pyowm.stationsapi30.buffer import Buffer
+from pyowm.stationsapi30.buffer import Buffer, ColumnarBuffer, merge
 from pyowm.utils.timeformatutils import UTC, to_date, to_ISO8601
 
 
@@ -134,3 +135,236 @@ class TestBuffer(unittest.TestCase):
         buf = Buffer(self.station_id)
         buf.append(self.m2)
         str(buf)
+
+    def test_add_columnar_buffer(self):
+        buf1 = Buffer(station_id=self.station_id)
+        buf1.append(self.m1)
+        buf2 = ColumnarBuffer(station_id=self.station_id)
+        buf2.append(self.m2)
+        result = buf1 + buf2
+        self.assertEqual(2, len(result))
+        self.assertEqual(self.m2.to_dict(), result.measurements[1].to_dict())
+
+
+class TestColumnarBuffer(unittest.TestCase):
+
+    ts = 1378459200
+    station_id = 'mytest'
+
+    m1 = Measurement(station_id, ts, temperature=21.5, wind_speed=2.1,
+                     wind_gust=67, humidex=77, clouds_condition='NSC')
+    m2 = Measurement(station_id, ts+500, temperature=20, wind_speed=8.5,
+                     humidex=0, pressure=1012)
+    m3 = Measurement(station_id, ts-1000, wind_speed=4.4, wind_gust=-12,
+                     humidex=2, weather_other=dict(key='val'))
+
+    def _buffer(self, *measurements):
+        buf = ColumnarBuffer(self.station_id)
+        for m in measurements:
+            buf.append(m)
+        return buf
+
+    def _assertMeasurementsEqual(self, expected, result):
+        self.assertEqual([m.to_dict() for m in expected],
+                         [m.to_dict() for m in result])
+
+    def test_assertions_on_instantiation(self):
+        with self.assertRaises(AssertionError):
+            ColumnarBuffer(None)
+
+    def test_creation_time(self):
+        buf = ColumnarBuffer(self.station_id)
+        ts = buf.creation_time()
+        self.assertEqual(to_ISO8601(ts), buf.creation_time(timeformat='iso'))
+        with self.assertRaises(ValueError):
+            buf.creation_time(timeformat='unknown')
+
+    def test_append(self):
+        buf = ColumnarBuffer(self.station_id)
+        self.assertEqual(0, len(buf))
+        buf.append(self.m1)
+        self.assertEqual(1, len(buf))
+        self.assertTrue(self.m1 in buf)
+        self.assertFalse(self.m2 in buf)
+
+        with self.assertRaises(AssertionError):
+            buf.append('not_a_measurement')
+        msmt = deepcopy(self.m1)
+        msmt.station_id = 'another_id'
+        with self.assertRaises(AssertionError):
+            buf.append(msmt)
+
+    def test_append_from_dict_and_json(self):
+        buf = ColumnarBuffer(self.station_id)
+        buf.append_from_dict(self.m1.to_dict())
+        buf.append_from_json(self.m2.to_JSON())
+        self._assertMeasurementsEqual([self.m1, self.m2], buf)
+
+    def test_iteration_gives_back_appended_values(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        self._assertMeasurementsEqual([self.m1, self.m2, self.m3], buf)
+        for item in buf:
+            self.assertTrue(isinstance(item, Measurement))
+        result = list(buf)
+        self.assertIsInstance(result[0].wind_gust, int)
+        self.assertIsInstance(result[1].temperature, float)
+        self.assertIsNone(result[1].wind_gust)
+        self.assertEqual(dict(key='val'), result[2].weather_other)
+
+    def test_columns(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        self.assertEqual([self.ts, self.ts+500, self.ts-1000],
+                         buf.column('timestamp').tolist())
+        temperatures = buf.column('temperature').tolist()
+        self.assertEqual([21.5, 20.], temperatures[:2])
+        self.assertTrue(math.isnan(temperatures[2]))
+        self.assertEqual(['NSC', None, None],
+                         list(buf.column('clouds_condition')))
+        self.assertEqual(3, len(buf.column('snow_1h')))
+        with self.assertRaises(ValueError):
+            buf.column('unknown')
+
+    def test_columns_of_fields_without_values(self):
+        buf = self._buffer(Measurement(self.station_id, self.ts,
+                                       temperature=20))
+        self.assertEqual(('temperature',), buf.fields())
+        self.assertTrue(math.isnan(buf.column('snow_1h')[0]))
+        self.assertEqual([None], list(buf.column('clouds_condition')))
+        # reading missing fields does not add columns
+        self.assertEqual(('temperature',), buf.fields())
+        self.assertEqual(1, len(buf._columns))
+        self._assertMeasurementsEqual(
+            [Measurement(self.station_id, self.ts, temperature=20)], buf)
+
+    def test_is_integral(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        self.assertTrue(buf.is_integral('wind_gust'))
+        self.assertTrue(buf.is_integral('humidex'))
+        self.assertFalse(buf.is_integral('temperature'))
+        self.assertFalse(buf.is_integral('snow_1h'))
+        buf.append(Measurement(self.station_id, self.ts, wind_gust=1.5))
+        self.assertFalse(buf.is_integral('wind_gust'))
+
+    def test_non_numeric_values_in_numeric_fields(self):
+        m4 = Measurement(self.station_id, self.ts, temperature=dict(min=0))
+        buf = self._buffer(self.m1, m4, self.m2)
+        self._assertMeasurementsEqual([self.m1, m4, self.m2], buf)
+        self.assertEqual([21.5, dict(min=0), 20],
+                         list(buf.column('temperature')))
+
+    def test_empty(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        self.assertEqual(3, len(buf))
+        buf.empty()
+        self.assertEqual(0, len(buf))
+        self.assertEqual([], list(buf))
+
+    def test_sort_chronologically(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        buf.sort_chronologically()
+        self._assertMeasurementsEqual([self.m3, self.m1, self.m2], buf)
+
+    def test_sort_reverse_chronologically(self):
+        buf = self._buffer(self.m1, self.m2, self.m3)
+        buf.sort_reverse_chronologically()
+        self._assertMeasurementsEqual([self.m2, self.m1, self.m3], buf)
+
+    def test_extend(self):
+        buf = self._buffer(self.m1)
+        buf.extend(self._buffer(self.m2, self.m3))
+        self._assertMeasurementsEqual([self.m1, self.m2, self.m3], buf)
+        m4 = Measurement(self.station_id, self.ts, temperature=dict(min=0))
+        buf.extend(self._buffer(m4))
+        self._assertMeasurementsEqual([self.m1, self.m2, self.m3, m4], buf)
+
+        buf = self._buffer(self.m3)
+        other = Buffer(self.station_id)
+        other.append(self.m1)
+        buf.extend(other)
+        buf.extend([self.m2])
+        self._assertMeasurementsEqual([self.m3, self.m1, self.m2], buf)
+
+        with self.assertRaises(AssertionError):
+            buf.extend(ColumnarBuffer('another_id'))
+
+    def test_add(self):
+        buf1 = self._buffer(self.m1)
+        buf2 = self._buffer(self.m2, self.m3)
+        result = buf1 + buf2
+        self._assertMeasurementsEqual([self.m1, self.m2, self.m3], result)
+        self.assertEqual(1, len(buf1))
+        buf1 += buf2
+        self._assertMeasurementsEqual([self.m1, self.m2, self.m3], buf1)
+
+    def test_to_buffer(self):
+        buf = self._buffer(self.m1, self.m2)
+        result = buf.to_buffer()
+        self.assertIsInstance(result, Buffer)
+        self.assertEqual(buf.created_at, result.created_at)
+        self._assertMeasurementsEqual([self.m1, self.m2], result)
+
+    def test_repr(self):
+        str(self._buffer(self.m2))
+
+
+class TestMerge(unittest.TestCase):
+
+    station_id = 'mytest'
+
+    def _buffer(self, *specs, kls=Buffer):
+        buf = kls(self.station_id)
+        for ts, temperature in specs:
+            buf.append(Measurement(self.station_id, ts,
+                                   temperature=temperature))
+        return buf
+
+    def _specs(self, buf):
+        return [(m.timestamp, m.temperature) for m in buf]
+
+    def test_merge_fails_with_wrong_parameters(self):
+        with self.assertRaises(ValueError):
+            merge([])
+        with self.assertRaises(ValueError):
+            merge([self._buffer()], on_duplicate='unknown')
+        with self.assertRaises(AssertionError):
+            merge([self._buffer(), Buffer('another')])
+
+    def test_merge(self):
+        b1 = self._buffer((1, 10), (4, 40), (7, 70))
+        b2 = self._buffer((2, 20), (5, 50))
+        b3 = self._buffer((3, 30), (6, 60), (8, 80), kls=ColumnarBuffer)
+        result = merge([b1, b2, b3])
+        self.assertTrue(isinstance(result, Buffer))
+        self.assertEqual(self.station_id, result.station_id)
+        self.assertEqual([(i, i * 10) for i in range(1, 9)],
+                         self._specs(result))
+        # measurements are not copied, nor buffers altered
+        self.assertIs(b1.measurements[0], result.measurements[0])
+        self.assertEqual(3, len(b1))
+
+    def test_merge_sorts_unsorted_buffers(self):
+        b1 = self._buffer((4, 40), (1, 10))
+        b2 = self._buffer((3, 30), (2, 20))
+        result = merge([b1, b2])
+        self.assertEqual([1, 2, 3, 4], [m.timestamp for m in result])
+        self.assertEqual([4, 1], [m.timestamp for m in b1])
+
+    def test_merge_duplicates_policies(self):
+        b1 = self._buffer((1, 10), (2, 20), (2, 21))
+        b2 = self._buffer((2, 22), (3, 30))
+        self.assertEqual([(1, 10), (2, 20), (3, 30)],
+                         self._specs(merge([b1, b2])))
+        self.assertEqual([(1, 10), (2, 22), (3, 30)],
+                         self._specs(merge([b1, b2], on_duplicate='last')))
+        self.assertEqual([(1, 10), (2, 20), (2, 21), (2, 22), (3, 30)],
+                         self._specs(merge([b1, b2],
+                                           on_duplicate='keep_all')))
+        hottest = lambda duplicates: max(duplicates,
+                                         key=lambda m: m.temperature)
+        self.assertEqual([(1, 10), (2, 22), (3, 30)],
+                         self._specs(merge([b1, b2], on_duplicate=hottest)))
+
+    def test_merge_single_and_empty_buffers(self):
+        self.assertEqual(0, len(merge([self._buffer(), self._buffer()])))
+        b1 = self._buffer((1, 10), (1, 11))
+        self.assertEqual([(1, 10)], self._specs(merge([b1])))
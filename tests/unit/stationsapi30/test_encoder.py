@@ -0,0 +1,99 @@
+import unittest
+import json
+from pyowm.stationsapi30.measurement import Measurement
+from pyowm.stationsapi30.buffer import Buffer, ColumnarBuffer
+from pyowm.stationsapi30.encoder import FIELDS, encode, iter_encode
+
+
+class TestEncoder(unittest.TestCase):
+
+    m1 = Measurement('mytest', 1378459200, temperature=dict(min=0, max=100),
+                     wind_speed=2.1, wind_gust=67, humidex=77,
+                     visibility_prefix='Né', clouds_condition='NSC',
+                     weather_other=dict(key='val'))
+    m2 = Measurement('mytest', 1378459260, temperature=12.5, humidity=80,
+                     pressure=1013.25, rain_1h=0.0, weather_intensity=True)
+    m3 = Measurement('mytest', 1378459320, wind_speed=float('inf'))
+
+    def expected(self, measurements):
+        # the payload, as obtained by JSON-encoding a dict per measurement
+        items = []
+        for m in measurements:
+            d = m.to_dict()
+            item = dict(station_id=d['station_id'], dt=d['timestamp'])
+            for field in FIELDS[2:19]:
+                item[field] = d[field]
+            item['clouds'] = [dict(distance=d['clouds_distance']),
+                              dict(condition=d['clouds_condition']),
+                              dict(cumulus=d['clouds_cumulus'])]
+            item['weather'] = [
+                dict(precipitation=d['weather_precipitation']),
+                dict(descriptor=d['weather_descriptor']),
+                dict(intensity=d['weather_intensity']),
+                dict(proximity=d['weather_proximity']),
+                dict(obscuration=d['weather_obscuration']),
+                dict(other=d['weather_other'])]
+            items.append(item)
+        return json.loads(json.dumps(items))
+
+    def test_encode(self):
+        msmts = [self.m1, self.m2, self.m3]
+        result = encode(msmts)
+        self.assertTrue(isinstance(result, bytes))
+        self.assertEqual(self.expected(msmts),
+                         json.loads(result.decode('utf-8')))
+
+    def test_encode_payload_structure(self):
+        result = json.loads(encode([self.m1]).decode('utf-8'))
+        self.assertEqual(1, len(result))
+        item = result[0]
+        self.assertEqual('mytest', item['station_id'])
+        self.assertEqual(1378459200, item['dt'])
+        self.assertEqual(dict(min=0, max=100), item['temperature'])
+        self.assertEqual(2.1, item['wind_speed'])
+        self.assertEqual(67, item['wind_gust'])
+        self.assertEqual(77, item['humidex'])
+        self.assertIsNone(item['pressure'])
+        self.assertEqual([dict(distance=None), dict(condition='NSC'),
+                          dict(cumulus=None)], item['clouds'])
+        self.assertEqual(dict(other=dict(key='val')), item['weather'][-1])
+
+    def test_encode_buffers(self):
+        for kls in (Buffer, ColumnarBuffer):
+            buffer = kls('mytest')
+            buffer.append(self.m1)
+            buffer.append(self.m2)
+            buffer.append(self.m3)
+            self.assertEqual(self.expected([self.m1, self.m2, self.m3]),
+                             json.loads(encode(buffer).decode('utf-8')))
+
+    def test_encode_columnar_buffer_missing_and_int_values(self):
+        buffer = ColumnarBuffer('mytest')
+        buffer.append(Measurement('mytest', 10, humidity=80))
+        buffer.append(Measurement('mytest', 20, pressure=1000.5))
+        result = encode(buffer).decode('utf-8')
+        self.assertIn('"humidity": 80,', result)
+        self.assertIn('"humidity": null,', result)
+        self.assertIn('"pressure": 1000.5,', result)
+        self.assertEqual(self.expected(list(buffer)), json.loads(result))
+        # encoding does not add columns for fields without values
+        self.assertEqual(('pressure', 'humidity'), buffer.fields())
+
+    def test_encode_nothing(self):
+        self.assertEqual(b'[]', encode([]))
+        self.assertEqual(b'[]', encode(ColumnarBuffer('mytest')))
+
+    def test_iter_encode(self):
+        msmts = [self.m1, self.m2, self.m3] * 3
+        for measurements in (msmts, iter(msmts)):
+            chunks = list(iter_encode(measurements, batch_size=4))
+            # 3 batches, plus the closing bracket
+            self.assertEqual(4, len(chunks))
+            self.assertEqual(self.expected(msmts),
+                             json.loads(b''.join(chunks).decode('utf-8')))
+
+    def test_iter_encode_fails_with_wrong_parameters(self):
+        with self.assertRaises(AssertionError):
+            list(iter_encode(None))
+        with self.assertRaises(AssertionError):
+            list(iter_encode([self.m1], batch_size=0))
@@ -0,0 +1,217 @@
+import unittest
+import threading
+from pyowm.stationsapi30.measurement import Measurement
+from pyowm.stationsapi30.buffer import Buffer
+from pyowm.stationsapi30.persistence_backend import PersistenceBackend
+from pyowm.stationsapi30.ingestion import IngestionPipeline
+from pyowm.stationsapi30.upload import ChunkedUploader
+from pyowm.exceptions.api_call_error import APICallError
+
+
+class MockStationsManager:
+
+    def __init__(self, failing=False, posts_before_failure=None):
+        self.failing = failing
+        self.posts_before_failure = posts_before_failure
+        self.sent = []
+        self.sent_event = threading.Event()
+
+    def send_buffer(self, buffer):
+        if self.failing or self.posts_before_failure == len(self.sent):
+            raise APICallError('unreachable')
+        self.sent.append([m.timestamp for m in buffer])
+        self.sent_event.set()
+
+    def send_buffer_in_chunks(self, buffer, chunk_size=500):
+        uploader = ChunkedUploader(self.send_buffer, chunk_size=chunk_size,
+                                   max_workers=1, retry_delay=0)
+        return uploader.upload(buffer)
+
+
+class MockPersistenceBackend(PersistenceBackend):
+
+    def __init__(self, station_id):
+        self.buffer = Buffer(station_id)
+
+    def load_to_buffer(self):
+        result = Buffer(self.buffer.station_id)
+        result.measurements = list(self.buffer.measurements)
+        return result
+
+    def persist_buffer(self, buffer):
+        self.buffer.measurements = list(buffer)
+
+
+class TestIngestionPipeline(unittest.TestCase):
+
+    station_id = 'mytest'
+
+    def msmt(self, timestamp):
+        return Measurement(self.station_id, timestamp, temperature=20)
+
+    def test_instantiation_fails_with_wrong_parameters(self):
+        mgr = MockStationsManager()
+        self.assertRaises(AssertionError, IngestionPipeline, None,
+                          self.station_id)
+        self.assertRaises(AssertionError, IngestionPipeline, mgr, None)
+        self.assertRaises(AssertionError, IngestionPipeline, mgr,
+                          self.station_id, max_size=0)
+        self.assertRaises(AssertionError, IngestionPipeline, mgr,
+                          self.station_id, max_age=0)
+
+    def test_flush(self):
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id)
+        self.assertEqual(0, instance.flush())
+        instance.append(self.msmt(1))
+        instance.append(self.msmt(2))
+        self.assertEqual(2, instance.queue_depth)
+        self.assertEqual(2, instance.flush())
+        self.assertEqual([[1, 2]], mgr.sent)
+        metrics = instance.metrics()
+        self.assertEqual(0, metrics['queue_depth'])
+        self.assertEqual(2, metrics['measurements_sent'])
+        self.assertEqual(1, metrics['flushes'])
+        self.assertEqual(0, metrics['failed_flushes'])
+        self.assertTrue(metrics['last_flush_latency'] >= 0)
+        self.assertTrue(metrics['max_flush_latency'] >= 0)
+
+    def test_flush_on_size(self):
+        mgr = MockStationsManager()
+        with IngestionPipeline(mgr, self.station_id, max_size=3,
+                               max_age=60) as instance:
+            self.assertTrue(instance.is_running())
+            for ts in range(1, 4):
+                instance.append(self.msmt(ts))
+            self.assertTrue(mgr.sent_event.wait(5))
+            self.assertEqual([1, 2, 3], mgr.sent[0])
+            instance.append(self.msmt(4))
+        self.assertFalse(instance.is_running())
+        # remaining measurements are sent upon stopping
+        self.assertEqual([[1, 2, 3], [4]], mgr.sent)
+
+    def test_flush_on_age(self):
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id, max_size=100,
+                                     max_age=0.05)
+        instance.start()
+        try:
+            instance.append(self.msmt(1))
+            self.assertTrue(mgr.sent_event.wait(5))
+            self.assertEqual([[1]], mgr.sent)
+        finally:
+            instance.stop(flush=False)
+
+    def test_stop_without_flush(self):
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id)
+        instance.start()
+        instance.append(self.msmt(1))
+        instance.stop(flush=False)
+        self.assertEqual([], mgr.sent)
+        self.assertEqual(1, instance.queue_depth)
+
+    def test_failures_are_dropped_without_persistence_backend(self):
+        mgr = MockStationsManager(failing=True)
+        instance = IngestionPipeline(mgr, self.station_id)
+        instance.append(self.msmt(1))
+        self.assertEqual(0, instance.flush())
+        metrics = instance.metrics()
+        self.assertEqual(1, metrics['measurements_dropped'])
+        self.assertEqual(1, metrics['failed_flushes'])
+        self.assertIsInstance(instance.last_error, APICallError)
+
+    def test_failures_are_spilled_and_replayed(self):
+        backend = MockPersistenceBackend(self.station_id)
+        mgr = MockStationsManager(failing=True)
+        instance = IngestionPipeline(mgr, self.station_id,
+                                     persistence_backend=backend)
+        instance.append(self.msmt(1))
+        instance.flush()
+        instance.append(self.msmt(2))
+        instance.flush()
+        self.assertEqual([1, 2], [m.timestamp for m in backend.buffer])
+        self.assertEqual(2, instance.metrics()['measurements_spilled'])
+
+        # replay fails as well: data stays into the backend
+        self.assertEqual(0, instance.replay())
+        self.assertEqual(2, len(backend.buffer))
+
+        # a restarted pipeline sends saved data first
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id,
+                                     persistence_backend=backend)
+        instance.start()
+        instance.stop()
+        self.assertEqual([[1, 2]], mgr.sent)
+        self.assertEqual(0, len(backend.buffer))
+        self.assertEqual(2, instance.metrics()['measurements_replayed'])
+        self.assertEqual(0, instance.replay())
+
+    def test_replay_sends_saved_data_in_batches(self):
+        backend = MockPersistenceBackend(self.station_id)
+        backend.persist_buffer([self.msmt(ts) for ts in range(10)])
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id, max_size=3,
+                                     persistence_backend=backend)
+        self.assertEqual(10, instance.replay())
+        self.assertEqual([[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]], mgr.sent)
+        self.assertEqual(0, len(backend.buffer))
+        self.assertEqual(10, instance.metrics()['measurements_replayed'])
+
+    def test_replay_keeps_unsent_data(self):
+        backend = MockPersistenceBackend(self.station_id)
+        backend.persist_buffer([self.msmt(ts) for ts in range(30)])
+        mgr = MockStationsManager(posts_before_failure=5)
+        instance = IngestionPipeline(mgr, self.station_id, max_size=3,
+                                     persistence_backend=backend)
+        self.assertEqual(15, instance.replay())
+        self.assertEqual(list(range(15)),
+                         [ts for batch in mgr.sent for ts in batch])
+        # sending stops at the first failure
+        self.assertEqual(list(range(15, 30)),
+                         [m.timestamp for m in backend.buffer])
+        self.assertIsInstance(instance.last_error, APICallError)
+        self.assertEqual(15, instance.metrics()['measurements_replayed'])
+
+    def test_replay_keeps_data_following_the_first_failure(self):
+        backend = MockPersistenceBackend(self.station_id)
+        backend.persist_buffer([self.msmt(ts) for ts in range(10)])
+        mgr = MockStationsManager()
+        send_buffer = mgr.send_buffer
+
+        def send_buffer_failing_on_3(buffer):
+            if buffer[0].timestamp == 3:
+                raise APICallError('bad request', status_code=400)
+            send_buffer(buffer)
+        mgr.send_buffer = send_buffer_failing_on_3
+        instance = IngestionPipeline(mgr, self.station_id, max_size=3,
+                                     persistence_backend=backend)
+        # batches following the failed one are sent, but kept as well
+        self.assertEqual(7, instance.replay())
+        self.assertEqual([[0, 1, 2], [6, 7, 8], [9]], mgr.sent)
+        self.assertEqual(list(range(3, 10)),
+                         [m.timestamp for m in backend.buffer])
+
+    def test_concurrent_appends(self):
+        mgr = MockStationsManager()
+        instance = IngestionPipeline(mgr, self.station_id, max_size=7)
+
+        def produce(offset):
+            for ts in range(offset, offset + 100):
+                instance.append(self.msmt(ts))
+
+        instance.start()
+        threads = [threading.Thread(target=produce, args=(i * 100,))
+                   for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        instance.stop()
+        timestamps = sorted(ts for batch in mgr.sent for ts in batch)
+        self.assertEqual(list(range(400)), timestamps)
+        self.assertEqual(400, instance.metrics()['measurements_sent'])
+
+    def test_repr(self):
+        print(IngestionPipeline(MockStationsManager(), self.station_id))
@@ -0,0 +1,64 @@
+import unittest
+from pyowm.stationsapi30.station import Station
+from pyowm.stationsapi30.station_registry import StationRegistry
+
+
+class TestStationRegistry(unittest.TestCase):
+
+    def station(self, id, external_id, name='station'):
+        return Station(id, '2016-11-22T12:15:25.967Z',
+                       '2016-11-22T12:15:25.967Z', external_id, name,
+                       -122.43, 37.76, 150, 0)
+
+    def test_instantiation_fails_with_wrong_ttl(self):
+        self.assertRaises(AssertionError, StationRegistry, -1)
+        self.assertRaises(AssertionError, StationRegistry, None)
+
+    def test_load(self):
+        instance = StationRegistry()
+        self.assertTrue(instance.is_stale())
+        self.assertEqual(0, len(instance))
+        s1 = self.station('id1', 'ext1')
+        s2 = self.station('id2', 'ext2')
+        instance.load([s1, s2])
+        self.assertFalse(instance.is_stale())
+        self.assertEqual(2, len(instance))
+        self.assertIs(s1, instance.get('id1'))
+        self.assertIs(s2, instance.get_by_external_id('ext2'))
+        self.assertIsNone(instance.get('id3'))
+        self.assertIsNone(instance.get_by_external_id('ext3'))
+        self.assertTrue('id1' in instance)
+
+        # loading replaces all of the stations
+        instance.load([s2])
+        self.assertEqual([s2], instance.stations())
+        self.assertIsNone(instance.get_by_external_id('ext1'))
+
+    def test_ttl(self):
+        instance = StationRegistry(ttl=0)
+        instance.load([])
+        self.assertTrue(instance.is_stale())
+        instance = StationRegistry(ttl=1000)
+        instance.load([])
+        self.assertFalse(instance.is_stale())
+        instance.invalidate()
+        self.assertTrue(instance.is_stale())
+
+    def test_put_and_remove(self):
+        instance = StationRegistry()
+        instance.put(self.station('id1', 'ext1'))
+        # replacing a station also updates its external ID
+        renamed = self.station('id1', 'ext1bis')
+        instance.put(renamed)
+        self.assertEqual(1, len(instance))
+        self.assertIs(renamed, instance.get_by_external_id('ext1bis'))
+        self.assertIsNone(instance.get_by_external_id('ext1'))
+        instance.remove('id1')
+        self.assertIsNone(instance.get('id1'))
+        self.assertIsNone(instance.get_by_external_id('ext1bis'))
+        instance.remove('id1')
+        # putting stations does not make the registry fresh
+        self.assertTrue(instance.is_stale())
+
+    def test_repr(self):
+        print(StationRegistry())
@@ -1,13 +1,17 @@
 import unittest
 import json
 import copy
+import types
 from pyowm.stationsapi30.station import Station
 from pyowm.stationsapi30.measurement import Measurement, AggregatedMeasurement
-from pyowm.stationsapi30.buffer import Buffer
+from pyowm.stationsapi30.buffer import Buffer, ColumnarBuffer
 from pyowm.stationsapi30.stations_manager import StationsManager
+from pyowm.stationsapi30 import encoder
+from pyowm.stationsapi30.uris import STATIONS_URI
 from pyowm.commons.http_client import HttpClient
 from pyowm.stationsapi30.parsers.station_parser import StationParser
 from pyowm.constants import STATIONS_API_VERSION
+from pyowm.exceptions.api_call_error import APICallError
 
 
 class MockHttpClient(HttpClient):
@@ -50,6 +54,32 @@ class MockHttpClientOneStation(HttpClient):
         return 200, json.loads(self.test_station_json)
 
 
+class MockHttpClientCountingCalls(MockHttpClient):
+    calls = []
+
+    def get_json(self, uri, params=None, headers=None):
+        self.calls.append(uri)
+        if uri == STATIONS_URI:
+            return super(MockHttpClientCountingCalls, self).get_json(
+                uri, params=params, headers=headers)
+        station = json.loads(self.test_station_json)
+        station['ID'] = uri.rsplit('/', 1)[-1]
+        station['external_id'] = 'EXT_' + station['ID']
+        return 200, station
+
+    def post(self, uri, params=None, data=None, headers=None):
+        station = json.loads(self.test_station_json)
+        station['ID'] = 'new'
+        station['external_id'] = data['external_id']
+        return 200, station
+
+    def put(self, uri, params=None, data=None, headers=None):
+        return 200, {}
+
+    def delete(self, uri, params=None, data=None, headers=None):
+        return 204, None
+
+
 class MockHttpClientMeasurements(HttpClient):
     msmt1 = Measurement('test_station', 1378459200,
         temperature=dict(min=0, max=100), wind_speed=2.1, wind_gust=67,
@@ -87,6 +117,27 @@ class MockHttpClientMeasurements(HttpClient):
         return 200, ''
 
 
+class MockHttpClientMinuteMeasurements(HttpClient):
+    """
+    Serves minute-aggregated measurements from timestamp 60 to 60000, in
+    reverse order and also including the minute before the requested window
+    """
+    calls = []
+
+    def get_json(self, uri, params=None, headers=None):
+        self.calls.append((params['from'], params['to']))
+        items = []
+        for ts in range(60, 60001, 60):
+            if params['from'] - 60 <= ts <= params['to']:
+                item = AggregatedMeasurement('id1', ts, 'm',
+                                             temp=dict(max=ts, min=0)).to_dict()
+                item['date'] = item.pop('timestamp')
+                item['type'] = item.pop('aggregated_on')
+                items.append(item)
+        items.reverse()
+        return 200, items[:params['limit']]
+
+
 class TestStationManager(unittest.TestCase):
 
     def factory(self, _kls):
@@ -160,6 +211,52 @@ class TestStationManager(unittest.TestCase):
         result = instance.delete_station(station)
         self.assertIsNone(result)
 
+    def test_lookup_stations(self):
+        MockHttpClientCountingCalls.calls = []
+        instance = self.factory(MockHttpClientCountingCalls)
+        results = instance.lookup_stations()
+        self.assertEqual(1, len(results))
+        self.assertEqual('583436dd9643a9000196b8d6', results[0].id)
+        station = instance.lookup_station('583436dd9643a9000196b8d6')
+        self.assertIs(results[0], station)
+        self.assertIs(station,
+                      instance.lookup_station_by_external_id('SF_TEST001'))
+        self.assertIsNone(instance.lookup_station_by_external_id('unknown'))
+        self.assertEqual([STATIONS_URI], MockHttpClientCountingCalls.calls)
+
+        # stale registries are refreshed
+        instance.stations_registry.invalidate()
+        instance.lookup_stations()
+        self.assertEqual(2, len(MockHttpClientCountingCalls.calls))
+
+    def test_lookup_station_missing_from_registry(self):
+        MockHttpClientCountingCalls.calls = []
+        instance = self.factory(MockHttpClientCountingCalls)
+        station = instance.lookup_station('another')
+        self.assertEqual('another', station.id)
+        self.assertEqual(2, len(MockHttpClientCountingCalls.calls))
+        self.assertIs(station,
+                      instance.lookup_station_by_external_id('EXT_another'))
+        self.assertEqual(2, len(MockHttpClientCountingCalls.calls))
+
+    def test_registry_is_updated_by_writes(self):
+        MockHttpClientCountingCalls.calls = []
+        instance = self.factory(MockHttpClientCountingCalls)
+        instance.get_stations()
+        created = instance.create_station('SF_TEST002', 'name', 37.76,
+                                          -122.43)
+        self.assertIs(created,
+                      instance.lookup_station_by_external_id('SF_TEST002'))
+        station = instance.lookup_station('583436dd9643a9000196b8d6')
+        updated = copy.copy(station)
+        updated.external_id = 'SF_TEST003'
+        instance.update_station(updated)
+        self.assertIs(updated, instance.lookup_station(station.id))
+        self.assertIsNone(instance.lookup_station_by_external_id('SF_TEST001'))
+        instance.delete_station(updated)
+        self.assertIsNone(instance.lookup_station_by_external_id('SF_TEST003'))
+        self.assertEqual([STATIONS_URI], MockHttpClientCountingCalls.calls)
+
     def test_delete_station_fails_when_id_is_none(self):
         instance = self.factory(MockHttpClient)
         parser = StationParser()
@@ -240,6 +337,42 @@ class TestStationManager(unittest.TestCase):
             self.assertEquals(item.station_id, station_id)
             self.assertTrue(from_ts <= item.timestamp <= to_ts)
 
+    def test_iter_measurements(self):
+        MockHttpClientMinuteMeasurements.calls = []
+        instance = self.factory(MockHttpClientMinuteMeasurements)
+        results = instance.iter_measurements('id1', 'm', 1, 60000, limit=100,
+                                             max_workers=3)
+        self.assertFalse(isinstance(results, list))
+        timestamps = [item.timestamp for item in results]
+        self.assertEqual(list(range(60, 60001, 60)), timestamps)
+        self.assertEqual(10, len(MockHttpClientMinuteMeasurements.calls))
+        self.assertEqual((1, 6000), MockHttpClientMinuteMeasurements.calls[0])
+
+    def test_iter_measurements_paginates_crowded_windows(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        results = list(instance.iter_measurements('id1', 'd', 1000, 4000,
+                                                  limit=1))
+        self.assertEqual([1200, 1500, 3000],
+                         [item.timestamp for item in results])
+        for item in results:
+            self.assertTrue(isinstance(item, AggregatedMeasurement))
+
+    def test_iter_measurements_failing(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        with self.assertRaises(AssertionError):
+            instance.iter_measurements(None, 'm', 123, 456)
+        with self.assertRaises(AssertionError):
+            instance.iter_measurements('test_station', 'm', -123, 456)
+        with self.assertRaises(AssertionError):
+            instance.iter_measurements('test_station', 'm', 123, 456, limit=0)
+        with self.assertRaises(AssertionError):
+            instance.iter_measurements('test_station', 'm', 123, 456,
+                                       max_workers=0)
+        with self.assertRaises(ValueError):
+            instance.iter_measurements('test_station', 'm', 456, 123)
+        with self.assertRaises(ValueError):
+            instance.iter_measurements('test_station', 'y', 123, 456)
+
     def test_get_measurements_failing(self):
         instance = self.factory(MockHttpClientMeasurements)
         with self.assertRaises(AssertionError):
@@ -263,44 +396,102 @@ class TestStationManager(unittest.TestCase):
         buffer.append(MockHttpClientMeasurements.msmt1)
         instance.send_buffer(buffer)
 
+    def test_send_columnar_buffer(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        buffer = ColumnarBuffer(MockHttpClientMeasurements.msmt1.station_id)
+        buffer.append(MockHttpClientMeasurements.msmt1)
+        instance.send_buffer(buffer)
+
+    def test_send_measurements_posts_encoded_payload(self):
+        posted = []
+
+        class MockHttpClientRecordingPosts(MockHttpClientMeasurements):
+            def post(self, uri, params=None, data=None, headers=None):
+                posted.append(data)
+                return 200, ''
+
+        instance = self.factory(MockHttpClientRecordingPosts)
+        msmts = [MockHttpClientMeasurements.msmt1,
+                 MockHttpClientMeasurements.msmt2]
+        instance.send_measurements(msmts)
+        instance.send_measurement(MockHttpClientMeasurements.msmt1)
+        # payloads are streamed as they are encoded
+        self.assertTrue(all(isinstance(d, types.GeneratorType)
+                            for d in posted))
+        self.assertEqual(encoder.encode(msmts), b''.join(posted[0]))
+        self.assertEqual(encoder.encode(msmts[:1]), b''.join(posted[1]))
+
     def test_send_buffer_failing(self):
         instance = self.factory(MockHttpClientMeasurements)
 
         with self.assertRaises(AssertionError):
             instance.send_buffer(None)
 
-    def test__structure_dict(self):
-        temp = dict(min=0, max=100)
-        msmt = Measurement('test_station', 1378459200,
-                            temperature=temp, wind_speed=2.1, wind_gust=67,
-                            humidex=77, weather_other=dict(key='val'))
-        expected =  {
-            'station_id': 'test_station',
-            'dt': 1378459200,
-            'temperature': temp,
-            'wind_speed': 2.1,
-            'wind_gust': 67,
-            'humidex': 77,
-            'weather': [
-                {
-                    'other': {
-                        'key': 'val'
-                    }
-                }
-            ]
-        }
-        instance = StationsManager('API-Key')
-        result = instance._structure_dict(msmt)
-        self.assertEqual(expected['station_id'], result['station_id'])
-        self.assertEqual(expected['dt'], result['dt'])
-        self.assertEqual(expected['wind_speed'], result['wind_speed'])
-        self.assertEqual(expected['wind_gust'], result['wind_gust'])
-        self.assertEqual(expected['humidex'], result['humidex'])
-        self.assertEqual(expected['temperature'], result['temperature'])
-        for item in result['weather']:
-            content = item.get('other')
-            if content:
-                self.assertEqual(expected['weather'][0]['other'], content)
-                return
-        self.fail()
+    def test_send_buffer_in_chunks(self):
+        posted = []
+
+        class MockHttpClientRecordingPosts(MockHttpClientMeasurements):
+            def post(self, uri, params=None, data=None, headers=None):
+                posted.append(json.loads(b''.join(data).decode('utf-8')))
+                return 200, ''
+
+        instance = self.factory(MockHttpClientRecordingPosts)
+        buffer = ColumnarBuffer(MockHttpClientMeasurements.msmt1.station_id)
+        for _ in range(5):
+            buffer.append(MockHttpClientMeasurements.msmt1)
+        results = instance.send_buffer_in_chunks(buffer, chunk_size=2)
+        self.assertEqual(3, len(results))
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertEqual([2, 2, 1], sorted([len(d) for d in posted],
+                                           reverse=True))
+        self.assertEqual(json.loads(encoder.encode(
+            [MockHttpClientMeasurements.msmt1]).decode('utf-8'))[0],
+            posted[0][0])
+
+    def test_send_buffer_in_chunks_failing(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        with self.assertRaises(AssertionError):
+            instance.send_buffer_in_chunks(None)
+        with self.assertRaises(ValueError):
+            instance.send_buffer_in_chunks(Buffer('test_station'),
+                                           chunk_size=0)
+
+    def test_send_measurements_in_chunks(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        msmts = [MockHttpClientMeasurements.msmt1,
+                 MockHttpClientMeasurements.msmt2]
+        results = instance.send_measurements_in_chunks(msmts, chunk_size=1,
+                                                       max_workers=2)
+        self.assertEqual([0, 1], [r.index for r in results])
+        self.assertTrue(all(r.succeeded for r in results))
 
+    def test_send_measurements_in_chunks_fails_with_wrong_parameters(self):
+        instance = self.factory(MockHttpClientMeasurements)
+        msmt = copy.deepcopy(MockHttpClientMeasurements.msmt1)
+        msmt.station_id = None
+        with self.assertRaises(AssertionError):
+            instance.send_measurements_in_chunks(None)
+        with self.assertRaises(AssertionError):
+            instance.send_measurements_in_chunks([msmt])
+        with self.assertRaises(AssertionError):
+            instance.send_measurements_in_chunks(iter([msmt]))
+
+    def test_send_measurements_in_chunks_reports_failures(self):
+
+        class MockHttpClientFailing(MockHttpClientMeasurements):
+            def post(self, uri, params=None, data=None, headers=None):
+                data = json.loads(b''.join(data).decode('utf-8'))
+                if data[0]['dt'] == MockHttpClientMeasurements.msmt2.timestamp:
+                    raise APICallError('server error', status_code=500)
+                return 200, ''
+
+        instance = self.factory(MockHttpClientFailing)
+        msmts = [MockHttpClientMeasurements.msmt1,
+                 MockHttpClientMeasurements.msmt2]
+        results = instance.send_measurements_in_chunks(
+            msmts, chunk_size=1, max_retries=1, retry_delay=0)
+        self.assertTrue(results[0].succeeded)
+        self.assertFalse(results[1].succeeded)
+        self.assertEqual(2, results[1].attempts)
+        self.assertEqual([MockHttpClientMeasurements.msmt2],
+                         results[1].measurements)
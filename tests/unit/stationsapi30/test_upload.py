@@ -0,0 +1,175 @@
+import unittest
+import threading
+import requests
+from pyowm.stationsapi30.upload import ChunkedUploader, ChunkUploadResult
+from pyowm.exceptions.api_call_error import APICallError, BadGatewayError, \
+    APICallTimeoutError, APIInvalidSSLCertificateError
+from pyowm.exceptions.api_response_error import UnauthorizedError
+
+
+class TestChunkUploadResult(unittest.TestCase):
+
+    def test_succeeded(self):
+        result = ChunkUploadResult(3, [1, 2], 1)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(3, result.index)
+        self.assertEqual(2, result.size)
+        self.assertEqual(1, result.attempts)
+        self.assertIsNone(result.error)
+        self.assertIsNone(result.measurements)
+
+    def test_failed(self):
+        error = APICallError('boom')
+        result = ChunkUploadResult(0, [1, 2], 3, error)
+        self.assertFalse(result.succeeded)
+        self.assertIs(error, result.error)
+        self.assertEqual([1, 2], result.measurements)
+
+    def test_repr(self):
+        print(ChunkUploadResult(0, [1], 1))
+
+
+class TestChunkedUploader(unittest.TestCase):
+
+    def post_nothing(self, chunk):
+        pass
+
+    def test_instantiation_fails_with_wrong_parameters(self):
+        self.assertRaises(AssertionError, ChunkedUploader, None)
+        self.assertRaises(ValueError, ChunkedUploader, self.post_nothing,
+                          chunk_size=0)
+        self.assertRaises(ValueError, ChunkedUploader, self.post_nothing,
+                          chunk_size=2.5)
+        self.assertRaises(ValueError, ChunkedUploader, self.post_nothing,
+                          max_workers=0)
+        self.assertRaises(ValueError, ChunkedUploader, self.post_nothing,
+                          max_retries=-1)
+        self.assertRaises(ValueError, ChunkedUploader, self.post_nothing,
+                          retry_delay=-1)
+
+    def test_chunks(self):
+        instance = ChunkedUploader(self.post_nothing, chunk_size=3)
+        self.assertEqual([[0, 1, 2], [3, 4, 5], [6]],
+                         list(instance.chunks(range(7))))
+        self.assertEqual([[0, 1, 2]], list(instance.chunks(range(3))))
+        self.assertEqual([], list(instance.chunks([])))
+
+    def test_upload(self):
+        posted = []
+        lock = threading.Lock()
+
+        def post(chunk):
+            with lock:
+                posted.append(chunk)
+
+        instance = ChunkedUploader(post, chunk_size=10, max_workers=3)
+        results = instance.upload(iter(range(95)))
+        self.assertEqual(10, len(results))
+        self.assertEqual(list(range(10)), [r.index for r in results])
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertTrue(all(r.attempts == 1 for r in results))
+        self.assertEqual([10] * 9 + [5], [r.size for r in results])
+        self.assertEqual(list(range(95)),
+                         sorted(item for chunk in posted for item in chunk))
+
+    def test_upload_nothing(self):
+        instance = ChunkedUploader(self.post_nothing)
+        self.assertEqual([], instance.upload([]))
+
+    def test_upload_retries_failed_chunks_only(self):
+        calls = dict()
+        lock = threading.Lock()
+
+        def post(chunk):
+            with lock:
+                calls[chunk[0]] = calls.get(chunk[0], 0) + 1
+                attempt = calls[chunk[0]]
+            if chunk[0] == 2 and attempt < 3:
+                raise BadGatewayError('temporary')
+
+        instance = ChunkedUploader(post, chunk_size=2, max_retries=2,
+                                   retry_delay=0)
+        results = instance.upload(range(6))
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertEqual([1, 3, 1], [r.attempts for r in results])
+        self.assertEqual({0: 1, 2: 3, 4: 1}, calls)
+
+    def test_upload_reports_chunks_failing_after_retries(self):
+        def post(chunk):
+            if 3 in chunk:
+                raise APICallError('down', status_code=503)
+
+        instance = ChunkedUploader(post, chunk_size=2, max_retries=1,
+                                   retry_delay=0)
+        results = instance.upload(range(6))
+        self.assertEqual([True, False, True], [r.succeeded for r in results])
+        failed = results[1]
+        self.assertEqual(2, failed.attempts)
+        self.assertIsInstance(failed.error, APICallError)
+        self.assertEqual([2, 3], failed.measurements)
+
+    def test_upload_does_not_retry_client_errors(self):
+        calls = []
+
+        def post(chunk):
+            calls.append(chunk)
+            raise UnauthorizedError('bad key')
+
+        instance = ChunkedUploader(post, chunk_size=5, max_workers=1,
+                                   max_retries=3, retry_delay=0)
+        results = instance.upload(range(5))
+        self.assertEqual(1, len(calls))
+        self.assertFalse(results[0].succeeded)
+        self.assertEqual(1, results[0].attempts)
+        self.assertIsInstance(results[0].error, UnauthorizedError)
+
+    def test_upload_retries_transient_errors_only(self):
+        transient = [APICallTimeoutError('timeout'),
+                     APIInvalidSSLCertificateError(
+                         'connection refused',
+                         requests.exceptions.ConnectionError('refused')),
+                     APICallError('too many requests', status_code=429),
+                     APICallError('unavailable', status_code=503),
+                     BadGatewayError('bad gateway', status_code=502)]
+        permanent = [APIInvalidSSLCertificateError(
+                         'certificate verify failed',
+                         requests.exceptions.SSLError('verify failed')),
+                     APIInvalidSSLCertificateError('invalid certificate'),
+                     APICallError('bad request', status_code=400),
+                     APICallError('unreadable response'),
+                     ValueError('unexpected')]
+        for error, expected_attempts in [(e, 3) for e in transient] + \
+                [(e, 1) for e in permanent]:
+            def post(chunk):
+                raise error
+
+            instance = ChunkedUploader(post, chunk_size=5, max_workers=1,
+                                       max_retries=2, retry_delay=0)
+            results = instance.upload(range(5))
+            self.assertEqual(expected_attempts, results[0].attempts)
+            self.assertIs(error, results[0].error)
+
+    def test_upload_bounds_chunks_in_memory(self):
+        consumed = []
+        release = threading.Event()
+
+        def measurements():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        def post(chunk):
+            release.wait()
+
+        instance = ChunkedUploader(post, chunk_size=1, max_workers=2)
+        thread = threading.Thread(target=instance.upload,
+                                  args=(measurements(),))
+        thread.start()
+        try:
+            thread.join(0.2)
+            # 2 chunks per worker are pending, plus the one being submitted
+            self.assertTrue(len(consumed) <= 2 * 2 + 1)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(100, len(consumed))
@@ -1,4 +1,7 @@
 import unittest
+import shutil
+import tempfile
+from pyowm.caches.imagecache import DiskImageCache
 from pyowm.commons.http_client import HttpClient
 from pyowm.tiles.tile_manager import TileManager
 from pyowm.commons.tile import Tile
@@ -9,7 +12,12 @@ class MockHttpClientReturningTile(HttpClient):
 
     d = b'1234567890'
 
+    def __init__(self):
+        super(MockHttpClientReturningTile, self).__init__()
+        self.calls = 0
+
     def get_png(self, uri, params=None, headers=None):
+        self.calls += 1
         return 200, self.d
 
 
@@ -27,3 +35,24 @@ class TestTileManager(unittest.TestCase):
         result = instance.get_tile(1, 2, 3)
         self.assertIsInstance(result, Tile)
         self.assertEqual(mocked.d, result.image.data)
+
+    def test_get_tile_uses_image_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            mocked = MockHttpClientReturningTile()
+            instance = TileManager('Api_key', 'a_layer', image_cache=DiskImageCache(cache_dir))
+            instance.http_client = mocked
+            first = instance.get_tile(1, 2, 3)
+            second = instance.get_tile(1, 2, 3)
+            self.assertEqual(1, mocked.calls)
+            self.assertEqual(first.image.data, second.image.data)
+            instance.get_tile(1, 2, 4)
+            self.assertEqual(2, mocked.calls)
+
+            # the cache is shared among API keys
+            other = TileManager('other_Api_key', 'a_layer', image_cache=instance.image_cache)
+            other.http_client = mocked
+            other.get_tile(1, 2, 3)
+            self.assertEqual(2, mocked.calls)
+        finally:
+            shutil.rmtree(cache_dir)
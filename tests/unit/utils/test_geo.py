@@ -1,5 +1,6 @@
 import unittest
 import json
+import math
 from pyowm.utils import geo
 
 
@@ -23,6 +24,19 @@ class TestGeo(unittest.TestCase):
 
     # -- Point --
 
+    def test_great_circle_distance_km(self):
+        self.assertEqual(0., geo.great_circle_distance_km(45.0, 9.0, 45.0, 9.0))
+        # one degree along a meridian
+        self.assertAlmostEqual(geo.EARTH_RADIUS_KM * math.pi / 180.,
+                               geo.great_circle_distance_km(10.0, 20.0, 11.0, 20.0))
+        # antipodal points
+        self.assertAlmostEqual(geo.EARTH_RADIUS_KM * math.pi,
+                               geo.great_circle_distance_km(0.0, 0.0, 0.0, 180.0))
+        # across the antimeridian
+        self.assertAlmostEqual(
+            geo.great_circle_distance_km(0.0, 179.5, 0.0, -179.5),
+            geo.great_circle_distance_km(0.0, 0.0, 0.0, 1.0))
+
     def test_point_geojson(self):
         expected = {
             "coordinates": [34, -56.3],
@@ -0,0 +1,64 @@
+import unittest
+import json
+from pyowm.utils import jsonutils
+
+
+class TestJSONUtils(unittest.TestCase):
+
+    def _chunked(self, text, size):
+        return [text[i:i+size] for i in range(0, len(text), size)]
+
+    def test_iter_array_items_with_top_level_array(self):
+        data = [{"a": 1}, [1, 2, 3], "text", 12345, None, 1.5e3]
+        text = json.dumps(data)
+        for size in (1, 2, 7, len(text)):
+            result = list(jsonutils.iter_array_items(self._chunked(text, size)))
+            self.assertEqual(data, result)
+
+    def test_iter_array_items_with_keyed_array(self):
+        data = {"cod": "200", "count": 123, "list": [{"id": i} for i in range(20)],
+                "trailing": {"x": [1, 2]}}
+        text = json.dumps(data, indent=2)
+        for size in (1, 3, 16, len(text)):
+            members = dict()
+            result = list(jsonutils.iter_array_items(self._chunked(text, size),
+                                                     key='list',
+                                                     members=members))
+            self.assertEqual(data['list'], result)
+            self.assertEqual(dict(cod="200", count=123, list=20,
+                                  trailing={"x": [1, 2]}), members)
+
+    def test_iter_array_items_with_bytes_chunks(self):
+        data = {"list": [{"name": "Città"}, {"name": "Zürich"}]}
+        encoded = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        chunks = [encoded[i:i+1] for i in range(len(encoded))]
+        result = list(jsonutils.iter_array_items(chunks, key='list'))
+        self.assertEqual(data['list'], result)
+
+    def test_iter_array_items_with_empty_and_missing_array(self):
+        members = dict()
+        self.assertEqual([], list(jsonutils.iter_array_items(
+            ['{"list": []}'], key='list', members=members)))
+        self.assertEqual(dict(list=0), members)
+        self.assertEqual([], list(jsonutils.iter_array_items(['[ ]'])))
+        members = dict()
+        self.assertEqual([], list(jsonutils.iter_array_items(
+            ['{"cod": "404"}'], key='list', members=members)))
+        self.assertEqual(dict(cod="404"), members)
+        self.assertEqual([], list(jsonutils.iter_array_items(['{}'],
+                                                             key='list')))
+
+    def test_iter_array_items_is_lazy(self):
+        def chunks():
+            yield '[{"a": 1}, '
+            raise AssertionError('More data requested than needed')
+        result = jsonutils.iter_array_items(chunks())
+        self.assertEqual({"a": 1}, next(result))
+
+    def test_iter_array_items_fails_with_malformed_data(self):
+        for text in ('[1, 2', '{"list": [1, 2}', '{"list": 3}', '[1 2]', '',
+                     '{"a" 1}'):
+            with self.assertRaises(ValueError):
+                list(jsonutils.iter_array_items([text], key='list'
+                                                if text.startswith('{')
+                                                else None))
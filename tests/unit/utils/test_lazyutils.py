@@ -0,0 +1,109 @@
+import unittest
+import sys
+import threading
+import time
+from pyowm.utils import lazyutils
+
+
+class TestLazyUtils(unittest.TestCase):
+
+    def test_lazy_module(self):
+        module = lazyutils.LazyModule('json')
+        self.assertIsNone(module._module)
+        self.assertEqual('[1]', module.dumps([1]))
+        self.assertIs(sys.modules['json'], module._module)
+
+    def test_lazy_module_sees_module_changes(self):
+        module = lazyutils.LazyModule('json')
+        original_dumps = sys.modules['json'].dumps
+        sys.modules['json'].dumps = lambda obj: 'patched'
+        try:
+            self.assertEqual('patched', module.dumps([1]))
+        finally:
+            sys.modules['json'].dumps = original_dumps
+
+    def test_lazy_module_fails_with_unknown_attributes_or_modules(self):
+        self.assertRaises(AttributeError, getattr,
+                          lazyutils.LazyModule('json'), 'non_existent')
+        self.assertRaises(ImportError, getattr,
+                          lazyutils.LazyModule('non_existent_module'), 'attr')
+
+    def test_instance_factory(self):
+        factory = lazyutils.instance_factory('collections.OrderedDict',
+                                             [('a', 1)])
+        result = factory()
+        self.assertEqual('OrderedDict', type(result).__name__)
+        self.assertEqual(dict(a=1), result)
+        self.assertIsNot(result, factory())
+
+    def test_lazy_dict(self):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            return object()
+
+        d = lazyutils.LazyDict(dict(a=factory, b=factory))
+        self.assertEqual(2, len(d))
+        self.assertEqual(['a', 'b'], sorted(d))
+        self.assertTrue('a' in d)
+        self.assertFalse('c' in d)
+        self.assertEqual([], calls)
+        value = d['a']
+        self.assertIs(value, d['a'])
+        self.assertEqual(1, len(calls))
+        self.assertEqual(['a', 'b'], sorted(d))
+        self.assertRaises(KeyError, d.__getitem__, 'c')
+
+        d['b'] = 'value'
+        d['c'] = 'other'
+        self.assertEqual('value', d['b'])
+        self.assertEqual(3, len(d))
+        self.assertEqual(1, len(calls))
+        del d['a']
+        del d['c']
+        self.assertEqual(dict(b='value'), dict(d))
+        self.assertRaises(KeyError, d.__delitem__, 'a')
+
+    def test_lazy_dict_retries_failing_factories(self):
+        attempts = []
+
+        def factory():
+            attempts.append(None)
+            if len(attempts) == 1:
+                raise ImportError('non_existent_module')
+            return 'value'
+
+        d = lazyutils.LazyDict(dict(a=factory))
+        self.assertRaises(ImportError, d.__getitem__, 'a')
+        self.assertTrue('a' in d)
+        self.assertEqual('value', d['a'])
+        self.assertEqual(2, len(attempts))
+
+    def test_lazy_dict_creates_values_once_across_threads(self):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            time.sleep(0.05)
+            return object()
+
+        d = lazyutils.LazyDict(dict(a=factory))
+        results = []
+        errors = []
+
+        def work():
+            try:
+                results.append(d['a'])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], errors)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(8, len(results))
+        self.assertTrue(all(r is results[0] for r in results))
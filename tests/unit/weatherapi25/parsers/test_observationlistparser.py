@@ -55,3 +55,42 @@ class TestObservationListParser(unittest.TestCase):
     def test_pparse_JSON_when_server_error(self):
         self.assertRaises(APIResponseError, self.__instance.parse_JSON,
                           INTERNAL_SERVER_ERROR_JSON)
+
+    def test_parse_JSON_stream(self):
+        chunks = [SEARCH_RESULTS_JSON[i:i+10]
+                  for i in range(0, len(SEARCH_RESULTS_JSON), 10)]
+        result = self.__instance.parse_JSON_stream(chunks)
+        self.assertFalse(isinstance(result, list))
+        result = list(result)
+        expected = self.__instance.parse_JSON(SEARCH_RESULTS_JSON)
+        self.assertEqual(len(expected), len(result))
+        for item, expected_item in zip(result, expected):
+            self.assertEqual(expected_item.get_location().get_ID(),
+                             item.get_location().get_ID())
+            self.assertEqual(expected_item.get_weather().get_reference_time(),
+                             item.get_weather().get_reference_time())
+
+    def test_parse_JSON_stream_fails_when_JSON_data_is_None(self):
+        self.assertRaises(ParseResponseError, list,
+                          self.__instance.parse_JSON_stream(None))
+
+    def test_parse_JSON_stream_with_malformed_JSON_data(self):
+        self.assertRaises(ParseResponseError, list,
+                          self.__instance.parse_JSON_stream([self.__bad_json]))
+        self.assertRaises(ParseResponseError, list,
+                          self.__instance.parse_JSON_stream([self.__bad_json_2]))
+        self.assertRaises(ParseResponseError, list,
+                          self.__instance.parse_JSON_stream(['{"list": [']))
+
+    def test_parse_JSON_stream_when_no_items_or_results(self):
+        self.assertEqual([], list(self.__instance.parse_JSON_stream(
+            [self.__no_items_json])))
+        self.assertEqual([], list(self.__instance.parse_JSON_stream(
+            [self.__404_json])))
+        self.assertEqual([], list(self.__instance.parse_JSON_stream(
+            [SEARCH_WITH_NO_RESULTS_JSON])))
+
+    def test_parse_JSON_stream_when_server_error(self):
+        self.assertRaises(APIResponseError, list,
+                          self.__instance.parse_JSON_stream(
+                              [INTERNAL_SERVER_ERROR_JSON]))
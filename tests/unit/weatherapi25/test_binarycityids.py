@@ -0,0 +1,89 @@
+"""
+Test case for binarycityids.py module
+"""
+
+import io
+import unittest
+from pyowm.weatherapi25 import binarycityids
+
+
+class TestBinaryCityIDs(unittest.TestCase):
+
+    _test_lines = ['Londinieres,2997784,49.831871,1.40232,FR\n',
+                   'London,2643743,51.50853,-0.12574,GB\n',
+                   'London,4119617,35.328972,-93.25296,US\n',
+                   '\n',
+                   'Thale, Stadt,6550950,51.7528,11.058,DE\n']
+
+    def _write(self):
+        fh = io.BytesIO()
+        count = binarycityids.write(self._test_lines, fh)
+        return count, fh.getvalue()
+
+    def test_write(self):
+        count, data = self._write()
+        self.assertEqual(4, count)
+        result_count, sections = binarycityids.read_header(data)
+        self.assertEqual(4, result_count)
+        self.assertEqual(set(binarycityids.SECTIONS), set(sections))
+        for offset, size in sections.values():
+            self.assertEqual(0, offset % binarycityids.ALIGNMENT)
+            self.assertTrue(offset + size <= len(data))
+        offset, size = sections['lines']
+        self.assertEqual('Londinieres,2997784,49.831871,1.40232,FR\n'
+                         'London,2643743,51.50853,-0.12574,GB\n'
+                         'London,4119617,35.328972,-93.25296,US\n'
+                         'Thale, Stadt,6550950,51.7528,11.058,DE\n',
+                         data[offset:offset + size].decode('utf-8'))
+        offset, size = sections['names']
+        self.assertEqual(b'londinieres\nlondon\nlondon\nthale, stadt\n',
+                         data[offset:offset + size])
+
+    def test_indexes_are_sorted(self):
+        _, data = self._write()
+        _, sections = binarycityids.read_header(data)
+        offset, size = sections['id_index']
+        id_index = memoryview(data)[offset:offset + size].cast('I').tolist()
+        self.assertEqual([1, 0, 2, 3], id_index)
+        offset, size = sections['name_index']
+        name_index = memoryview(data)[offset:offset + size].cast('I').tolist()
+        self.assertEqual([0, 1, 2, 3], name_index)
+
+    def test_countries_and_trigram_index(self):
+        _, data = self._write()
+        _, sections = binarycityids.read_header(data)
+        offset, size = sections['countries']
+        self.assertEqual(b'FRGBUSDE', data[offset:offset + size])
+
+        def column(name):
+            offset, size = sections[name]
+            return memoryview(data)[offset:offset + size].cast('I').tolist()
+
+        trigrams = column('trigrams')
+        offsets = column('trigram_offsets')
+        postings = column('trigram_postings')
+        self.assertEqual(sorted(trigrams), trigrams)
+        self.assertEqual(len(trigrams) + 1, len(offsets))
+        i = trigrams.index(int.from_bytes(b'ndo', 'big'))
+        self.assertEqual([1, 2], postings[offsets[i]:offsets[i + 1]])
+        i = trigrams.index(int.from_bytes(b'lon', 'big'))
+        self.assertEqual([0, 1, 2], postings[offsets[i]:offsets[i + 1]])
+
+    def test_trigrams_of(self):
+        self.assertEqual(set(), binarycityids.trigrams_of(b'ab'))
+        self.assertEqual({int.from_bytes(b'abc', 'big'),
+                          int.from_bytes(b'bca', 'big'),
+                          int.from_bytes(b'cab', 'big')},
+                         binarycityids.trigrams_of(b'abcabc'))
+
+    def test_read_header_fails_with_wrong_data(self):
+        _, data = self._write()
+        self.assertRaises(ValueError, binarycityids.read_header, b'')
+        self.assertRaises(ValueError, binarycityids.read_header,
+                          b'NOTMAGIC' + data[8:])
+        self.assertRaises(ValueError, binarycityids.read_header,
+                          data[:8] + b'\xff' + data[9:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,19 +2,26 @@
 Test case for cityidregistry.py module
 """
 
+import os
+import tempfile
 import unittest
 try:
     from StringIO import StringIO
 except ImportError:
     from io import StringIO
-from pyowm.weatherapi25.cityidregistry import CityIDRegistry
+from pyowm.weatherapi25 import binarycityids
+from pyowm.weatherapi25.cityidregistry import CityIDRegistry, \
+    _BinaryCityRecords, _TextCityRecords
 from pyowm.weatherapi25.location import Location
 from pyowm.utils.geo import Point
 
 
 class TestCityIDRegistry(unittest.TestCase):
 
-    _instance = CityIDRegistry('%03d-%03d.txt')
+    def setUp(self):
+        # the registry indexes the lines of files at first read, so mocked
+        # file contents need a fresh instance for each test
+        self._instance = CityIDRegistry('%03d-%03d.txt')
     _test_file_contents = """dongditou,1812600,39.261391,117.368332,CN
 dongdu,1812597,35.849998,117.699997,CN
 dongel,747912,40.693600,29.941540,TR
@@ -35,14 +42,6 @@ Bologna,2829449,30.57184,-83.250488,IT"""
     _test_file_contents_with_commas_in_names = """Thalassery,1254780,11.75,75.533333,IN
 Thale, Stadt,6550950,51.7528,11.058,DE"""
 
-    test_filelines = [
-        'Londinieres,2997784,49.831871,1.40232,FR\n',
-        'Londoko,2020707,49.033329,131.983337,RU\n',
-        'London Borough of Harrow,7535661,51.566669,-0.33333,GB\n',
-        'London Village,4030939,1.98487,-157.475021,KI\n',
-        'London,2643743,51.50853,-0.12574,GB\n',
-        'London,4119617,35.328972,-93.25296,US\n']
-
     # mocked functions and helpers
 
     def _mock_get_lines(self, filename):
@@ -111,6 +110,63 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
         self.assertFalse(self._instance._city_name_matches(
             'foo', 'bar', 'like'))
 
+    def test_files_are_read_once(self):
+        calls = []
+
+        def mock_get_lines(filename):
+            calls.append(filename)
+            return StringIO(self._test_file_contents_with_homonymies).readlines()
+
+        ref_to_original = CityIDRegistry._get_lines
+        CityIDRegistry._get_lines = staticmethod(mock_get_lines)
+        self._instance.ids_for('Abbeville')
+        self._instance.ids_for('abbans-dessus', matching='nocase')
+        self._instance.locations_for('Abbeville', country='US')
+        self._instance.id_for('abbeville')
+        CityIDRegistry._get_lines = ref_to_original
+        self.assertEqual(['097-102.txt'], calls)
+
+    def test_lookups_use_all_files_index_once_built(self):
+        original_get_lines = CityIDRegistry._get_lines
+        original_get_all_lines = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        self._instance.ids_for('abba', matching='like')
+
+        def fail(*args):
+            raise AssertionError('files must not be read again')
+
+        CityIDRegistry._get_lines = staticmethod(fail)
+        CityIDRegistry._get_all_lines = staticmethod(fail)
+        result = self._instance.ids_for('bologna')
+        CityIDRegistry._get_lines = original_get_lines
+        CityIDRegistry._get_all_lines = original_get_all_lines
+        self.assertEqual([(2829449, 'Bologna', 'IT')], result)
+
+    def test_ids_for_like_matching(self):
+        original_get_all_lines = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+
+        # short substrings
+        result = self._instance.ids_for("gn", matching='like')
+        self.assertEqual([(2829449, 'Bologna', 'IT')], result)
+
+        # substrings spanning many trigrams, results are in file order
+        result = self._instance.ids_for("BEVILL", matching='like')
+        self.assertEqual([3038789, 4178992, 4314295, 4568985, 4829449],
+                         [item[0] for item in result])
+
+        # restricted to country
+        result = self._instance.ids_for("bevil", country='FR', matching='like')
+        self.assertEqual([(3038789, 'Abbeville', 'FR')], result)
+        result = self._instance.ids_for("bevil", country='IT', matching='like')
+        self.assertEqual([], result)
+
+        # no matches, even if all trigrams are there
+        result = self._instance.ids_for("abbevilla", matching='like')
+        self.assertEqual([], result)
+
+        CityIDRegistry._get_all_lines = original_get_all_lines
+
     # tests for IDs retrieval
 
     def test_id_for(self):
@@ -152,34 +208,6 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
         self.assertRaises(ValueError, CityIDRegistry.location_for,
                           self._instance, '123abc')
 
-    def test_match_line(self):
-        instance = CityIDRegistry('test')
-
-        # no matches
-        result = instance._match_line('blabla', self.test_filelines)
-        self.assertIsNone(result)
-
-        # single exact matches
-        result = instance._match_line('Londoko', self.test_filelines)
-        self.assertEqual('Londoko,2020707,49.033329,131.983337,RU', result)
-        result = instance._match_line('London Borough of Harrow', self.test_filelines)
-        self.assertEqual('London Borough of Harrow,7535661,51.566669,-0.33333,GB',
-                         result)
-
-        # single match with different casing
-        result1 = instance._match_line('LONDOKO', self.test_filelines)
-        result2 = instance._match_line('londoko', self.test_filelines)
-        self.assertEquals(result1, result2)
-        self.assertEqual('Londoko,2020707,49.033329,131.983337,RU', result1)
-        result3 = instance._match_line('London borough of harrow', self.test_filelines)
-        result4 = instance._match_line('london BOROUGH of Harrow', self.test_filelines)
-        self.assertEquals(result3, result4)
-        self.assertEquals('London Borough of Harrow,7535661,51.566669,-0.33333,GB',
-                          result3)
-        # homonymies
-        result = instance._match_line('London', self.test_filelines)
-        self.assertEquals('London,2643743,51.50853,-0.12574,GB', result)
-
     def test_ids_for(self):
         ref_to_original = CityIDRegistry._get_lines
         CityIDRegistry._get_lines = self._mock_get_lines_with_homonymies
@@ -201,6 +229,67 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
 
         CityIDRegistry._get_lines = ref_to_original
 
+    def test_ids_for_many(self):
+        calls = []
+
+        def mock_get_lines(filename):
+            calls.append(filename)
+            return StringIO(self._test_file_contents_with_homonymies).readlines()
+
+        ref_to_original = CityIDRegistry._get_lines
+        CityIDRegistry._get_lines = staticmethod(mock_get_lines)
+        try:
+            self.assertEqual([], self._instance.ids_for_many([]))
+            result = self._instance.ids_for_many(
+                ['bologna', 'Abasolo', '', 'bologna', 'Cesena'])
+            self.assertEqual([[(2829449, 'Bologna', 'IT')],
+                              [(3533505, 'Abasolo', 'MX'),
+                               (4019867, 'Abasolo', 'MX'),
+                               (4019869, 'Abasolo', 'MX')],
+                              [],
+                              [(2829449, 'Bologna', 'IT')],
+                              []], result)
+            self.assertEqual(['097-102.txt'], calls)
+            result = self._instance.ids_for_many(['Abbeville', 'abbeville'],
+                                                 country='FR',
+                                                 matching='exact')
+            self.assertEqual([[(3038789, 'Abbeville', 'FR')], []], result)
+            self.assertEqual(['097-102.txt'], calls)
+        finally:
+            CityIDRegistry._get_lines = ref_to_original
+
+    def test_ids_for_many_reads_all_files_once(self):
+        calls = []
+
+        def mock_get_all_lines():
+            calls.append(None)
+            return StringIO(self._test_file_contents_with_homonymies).readlines()
+
+        def fail(*args):
+            raise AssertionError('files must be read all at once')
+
+        original_get_lines = CityIDRegistry._get_lines
+        original_get_all_lines = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_lines = staticmethod(fail)
+        CityIDRegistry._get_all_lines = staticmethod(mock_get_all_lines)
+        try:
+            names = ['Abasolo', 'Bologna', 'Milano', 'Siena']
+            result = self._instance.ids_for_many(names)
+            self.assertEqual(1, len(calls))
+            self.assertEqual([3, 1, 0, 0], [len(r) for r in result])
+            result = self._instance.ids_for_many(names, matching='like')
+            self.assertEqual(1, len(calls))
+            self.assertEqual([3, 1, 0, 0], [len(r) for r in result])
+        finally:
+            CityIDRegistry._get_lines = original_get_lines
+            CityIDRegistry._get_all_lines = original_get_all_lines
+
+    def test_ids_for_many_fails_with_wrong_input_values(self):
+        self.assertRaises(ValueError, CityIDRegistry.ids_for_many,
+                          self._instance, ['London'], matching='foo')
+        self.assertRaises(ValueError, CityIDRegistry.ids_for_many,
+                          self._instance, ['London'], country='foo')
+
     def test_ids_for_with_wrong_input_values(self):
         self.assertRaises(ValueError,
                           CityIDRegistry.ids_for, self._instance,
@@ -280,6 +369,60 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
 
         CityIDRegistry._get_lines = ref_to_original
 
+    # tests for geographic lookups
+
+    def test_nearest_ids(self):
+        original_get_all_lines = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+
+        result = self._instance.nearest_ids(47.12, 5.88)
+        self.assertEqual([(3038800, 'Abbans-Dessus', 'FR')], result)
+
+        result = self._instance.nearest_ids(31.6, -85.3, k=3)
+        self.assertEqual([4829449, 4178992, 2829449],
+                         [item[0] for item in result])
+
+        # more than available
+        result = self._instance.nearest_ids(-40.0, 170.0, k=100)
+        self.assertEqual(11, len(result))
+
+        CityIDRegistry._get_all_lines = original_get_all_lines
+
+    def test_nearest_ids_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, CityIDRegistry.nearest_ids,
+                          self._instance, 100.0, 5.88)
+        self.assertRaises(ValueError, CityIDRegistry.nearest_ids,
+                          self._instance, 47.12, 200.0)
+        self.assertRaises(ValueError, CityIDRegistry.nearest_ids,
+                          self._instance, 47.12, 5.88, 0)
+        self.assertRaises(AssertionError, CityIDRegistry.nearest_ids,
+                          self._instance, 47.12, 5.88, 'k')
+
+    def test_ids_within(self):
+        original_get_all_lines = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+
+        result = self._instance.ids_within(47.12, 5.88, 1.)
+        self.assertEqual([(3038800, 'Abbans-Dessus', 'FR'),
+                          (6452202, 'Abbans-Dessus', 'FR')], result)
+
+        result = self._instance.ids_within(31.6, -85.3, 250)
+        self.assertEqual([4829449, 4178992, 2829449],
+                         [item[0] for item in result])
+
+        result = self._instance.ids_within(-40.0, 170.0, 100)
+        self.assertEqual([], result)
+
+        CityIDRegistry._get_all_lines = original_get_all_lines
+
+    def test_ids_within_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, CityIDRegistry.ids_within,
+                          self._instance, -100.0, 5.88, 10)
+        self.assertRaises(ValueError, CityIDRegistry.ids_within,
+                          self._instance, 47.12, 5.88, -10)
+        self.assertRaises(AssertionError, CityIDRegistry.ids_within,
+                          self._instance, 47.12, 5.88, '10')
+
     # tests for locations retrieval
 
     def test_locations_for(self):
@@ -394,6 +537,102 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
 
         CityIDRegistry._get_lines = ref_to_original
 
+    def test_autocomplete(self):
+        ref_to_original = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        try:
+            self.assertEqual([], self._instance.autocomplete(''))
+            self.assertEqual([], self._instance.autocomplete('abc'))
+            self.assertEqual([(3533505, 'Abasolo', 'MX'),
+                              (4019867, 'Abasolo', 'MX'),
+                              (4019869, 'Abasolo', 'MX')],
+                             self._instance.autocomplete('aba'))
+            self.assertEqual([(3533505, 'Abasolo', 'MX'),
+                              (4019867, 'Abasolo', 'MX')],
+                             self._instance.autocomplete('AB', limit=2))
+            self.assertEqual([(3038800, 'Abbans-Dessus', 'FR'),
+                              (6452202, 'Abbans-Dessus', 'FR'),
+                              (3038789, 'Abbeville', 'FR')],
+                             self._instance.autocomplete('abb', country='FR'))
+            self.assertEqual([(3038789, 'Abbeville', 'FR'),
+                              (3038800, 'Abbans-Dessus', 'FR'),
+                              (3533505, 'Abasolo', 'MX')],
+                             self._instance.autocomplete('ab', limit=3,
+                                                         ranking='id'))
+        finally:
+            CityIDRegistry._get_all_lines = ref_to_original
+
+    def test_autocomplete_ranks_by_id_without_splitting_matches(self):
+        ref_to_original = CityIDRegistry._get_all_lines
+        ref_to_original_tokens = _TextCityRecords.tokens
+        split_lines = []
+
+        def counting_tokens(records, position):
+            split_lines.append(position)
+            return ref_to_original_tokens(records, position)
+
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        _TextCityRecords.tokens = counting_tokens
+        try:
+            # IDs are parsed once for all the lines
+            self._instance.autocomplete('a', limit=1, ranking='id')
+            del split_lines[:]
+            self.assertEqual([(3038789, 'Abbeville', 'FR'),
+                              (3038800, 'Abbans-Dessus', 'FR')],
+                             self._instance.autocomplete('a', limit=2,
+                                                         ranking='id'))
+            # only the returned lines are split
+            self.assertEqual(2, len(split_lines))
+        finally:
+            CityIDRegistry._get_all_lines = ref_to_original
+            _TextCityRecords.tokens = ref_to_original_tokens
+
+    def test_autocomplete_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, CityIDRegistry.autocomplete,
+                          self._instance, 'ab', ranking='population')
+        self.assertRaises(ValueError, CityIDRegistry.autocomplete,
+                          self._instance, 'ab', limit=0)
+        self.assertRaises(AssertionError, CityIDRegistry.autocomplete,
+                          self._instance, 'ab', limit='3')
+        self.assertRaises(ValueError, CityIDRegistry.autocomplete,
+                          self._instance, 'ab', country='FRA')
+
+    def test_location_for_id(self):
+        ref_to_original = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        try:
+            self._assertLocationsEqual(
+                Location('Abbeville', -83.306824, 31.992121, 4178992, 'US'),
+                self._instance.location_for_id(4178992))
+            self.assertIsNone(self._instance.location_for_id(1234))
+            self.assertRaises(AssertionError, CityIDRegistry.location_for_id,
+                              self._instance, '4178992')
+        finally:
+            CityIDRegistry._get_all_lines = ref_to_original
+
+    def test_locations_for_ids(self):
+        ref_to_original = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        try:
+            self.assertEqual([], self._instance.locations_for_ids([]))
+            result = self._instance.locations_for_ids(
+                [4829449, 1, 2829449, 3533505, 4829449, 99999999])
+            self.assertEqual(6, len(result))
+            self._assertLocationsEqual(
+                Location('Abbeville', -85.250488, 31.57184, 4829449, 'US'),
+                result[0])
+            self.assertIsNone(result[1])
+            self._assertLocationsEqual(
+                Location('Bologna', -83.250488, 30.57184, 2829449, 'IT'),
+                result[2])
+            self._assertLocationsEqual(
+                Location('Abasolo', -98.366669, 24.066669, 3533505, 'MX'),
+                result[3])
+            self._assertLocationsEqual(result[0], result[4])
+            self.assertIsNone(result[5])
+        finally:
+            CityIDRegistry._get_all_lines = ref_to_original
+
     def test_geopoints_for(self):
         ref_to_original = CityIDRegistry._get_lines
         CityIDRegistry._get_lines = self._mock_get_lines_with_homonymies
@@ -417,3 +656,91 @@ Thale, Stadt,6550950,51.7528,11.058,DE"""
         self._assertGeopointsEqual(expected2, result[1])
 
         CityIDRegistry._get_lines = ref_to_original
+
+    def test_lookups_on_binary_registry(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as fh:
+            binarycityids.write(
+                StringIO(self._test_file_contents_with_homonymies).readlines(),
+                fh)
+        ref_to_original_get_lines = CityIDRegistry._get_lines
+        ref_to_original = CityIDRegistry._get_all_lines
+        CityIDRegistry._get_lines = self._mock_get_lines_with_homonymies
+        CityIDRegistry._get_all_lines = self._mock_get_all_lines
+        try:
+            binary_instance = CityIDRegistry('%03d-%03d.txt',
+                                             binary_filepath=path)
+            for name in ('Abbeville', 'abbeville', 'bologna', 'ab', 'bb',
+                         'ville', 'dessus', 'Milano'):
+                for matching in ('exact', 'nocase', 'like'):
+                    for country in (None, 'FR', 'IT'):
+                        self.assertEqual(
+                            self._instance.ids_for(name, country, matching),
+                            binary_instance.ids_for(name, country, matching))
+            self.assertEqual(self._instance.nearest_ids(30., -90., k=3),
+                             binary_instance.nearest_ids(30., -90., k=3))
+            self.assertEqual(self._instance.ids_within(47., 5., 500),
+                             binary_instance.ids_within(47., 5., 500))
+            self._assertLocationsEqual(
+                Location('Abasolo', -98.366669, 24.066669, 3533505, 'MX'),
+                binary_instance.location_for('abasolo'))
+            for prefix in ('a', 'abb', 'bo', 'x'):
+                for ranking in ('name', 'id'):
+                    self.assertEqual(
+                        self._instance.autocomplete(prefix, limit=4,
+                                                    ranking=ranking),
+                        binary_instance.autocomplete(prefix, limit=4,
+                                                     ranking=ranking))
+            ids = [4829449, 1, 2829449, 3533505, 99999999]
+            for expected, result in zip(
+                    self._instance.locations_for_ids(ids),
+                    binary_instance.locations_for_ids(ids)):
+                if expected is None:
+                    self.assertIsNone(result)
+                else:
+                    self._assertLocationsEqual(expected, result)
+        finally:
+            CityIDRegistry._get_lines = ref_to_original_get_lines
+            CityIDRegistry._get_all_lines = ref_to_original
+            binary_instance = None
+            os.remove(path)
+
+    def test_like_on_binary_registry_reads_matching_lines_only(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as fh:
+            binarycityids.write(
+                StringIO(self._test_file_contents_with_homonymies).readlines(),
+                fh)
+        read_lines = []
+        ref_to_original_line = _BinaryCityRecords.line
+
+        def counting_line(records, position):
+            read_lines.append(position)
+            return ref_to_original_line(records, position)
+
+        _BinaryCityRecords.line = counting_line
+        try:
+            records = _BinaryCityRecords(path)
+            self.assertEqual([5, 6, 7, 8, 9], records.like('ville'))
+            self.assertEqual([5], records.like('ville', 'FR'))
+            self.assertEqual([], records.like('ville', 'IT'))
+            self.assertEqual([10], records.like('olo', 'IT'))
+            self.assertEqual([], records.like('xyz'))
+            self.assertEqual([10], records.like('na', 'IT'))
+            self.assertEqual([], read_lines)
+            self.assertEqual('IT', records.country(10))
+            records = None
+        finally:
+            _BinaryCityRecords.line = ref_to_original_line
+            os.remove(path)
+
+    def test_missing_binary_registry_falls_back_to_city_id_files(self):
+        ref_to_original = CityIDRegistry._get_lines
+        CityIDRegistry._get_lines = self._mock_get_lines_with_homonymies
+        try:
+            instance = CityIDRegistry('%03d-%03d.txt',
+                                      binary_filepath='non-existent.bin')
+            self.assertEqual([(2829449, 'Bologna', 'IT')],
+                             instance.ids_for('Bologna'))
+        finally:
+            CityIDRegistry._get_lines = ref_to_original
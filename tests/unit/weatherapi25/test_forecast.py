@@ -7,6 +7,7 @@ from datetime import datetime
 from pyowm.weatherapi25.location import Location
 from pyowm.weatherapi25.weather import Weather
 from pyowm.weatherapi25.forecast import Forecast
+from pyowm.weatherapi25.weathercoderegistry import WeatherCodeRegistry
 from pyowm.utils.timeformatutils import UTC
 from tests.unit.weatherapi25.json_test_dumps import FORECAST_JSON_DUMP
 from tests.unit.weatherapi25.xml_test_dumps import FORECAST_XML_DUMP
@@ -64,6 +65,48 @@ class TestForecast(unittest.TestCase):
 
 
 
+    def test_get_status_bitmasks(self):
+        registry = WeatherCodeRegistry({
+            "clouds": [{"start": 801, "end": 804}],
+            "sun": [{"start": 800, "end": 800}]
+        })
+        clouds = registry.bitmask_for("clouds")
+        sun = registry.bitmask_for("sun")
+        result = self.__test_instance.get_status_bitmasks(registry)
+        self.assertEqual([clouds, clouds], result)
+        self.assertEqual(clouds,
+                         self.__test_instance.get_status_summary(registry))
+        self.assertFalse(self.__test_instance.get_status_summary(registry)
+                         & sun)
+
+    def test_status_bitmasks_follow_changes_to_weathers(self):
+        registry = WeatherCodeRegistry({
+            "clouds": [{"start": 801, "end": 804}],
+            "sun": [{"start": 800, "end": 800}]
+        })
+        clouds = registry.bitmask_for("clouds")
+        sun = registry.bitmask_for("sun")
+        weathers = list(self.__test_weathers)
+        instance = Forecast("daily", self.__test_reception_time,
+                            self.__test_location, weathers)
+        self.assertEqual([clouds, clouds],
+                         instance.get_status_bitmasks(registry))
+        weathers.append(Weather(1378459690, 1378496480, 1378449510, 23,
+            {"all": 10}, {"all": 0}, {"deg": 103.4, "speed": 4.2}, 12,
+            {"press": 1070.119, "sea_level": 1078.589},
+            {"temp": 297.199, "temp_kf": -1.899, "temp_max": 299.0,
+             "temp_min": 295.6},
+            "Clear", "Sky is clear", 800, "01d", 1000, 300.0, 298.0, 296.0))
+        self.assertEqual([clouds, clouds, sun],
+                         instance.get_status_bitmasks(registry))
+        self.assertEqual(clouds | sun, instance.get_status_summary(registry))
+        weathers.pop(0)
+        self.assertEqual([clouds, sun], instance.get_status_bitmasks(registry))
+        # same-length replacements are detected as well
+        weathers[0] = weathers[1]
+        self.assertEqual([sun, sun], instance.get_status_bitmasks(registry))
+        self.assertEqual(sun, instance.get_status_summary(registry))
+
     def test_init_fails_when_reception_time_is_negative(self):
         self.assertRaises(ValueError, Forecast, "3h", -1234567,
                           self.__test_location, self.__test_weathers)
@@ -231,13 +231,70 @@ class TestHistorian(unittest.TestCase):
         self.assertRaises(ValueError, Historian.average_rain,
                           self.__empty_instance)
 
-    def test_purge_none_samples(self):
-        input_list = [("a", 1), ("b", 2), ("c", None), ("d", None), ("e", 5)]
-        expected = [("a", 1), ("b", 2), ("e", 5)]
-        self.assertEqual(set(expected),
-                         set(self.__instance._purge_none_samples(input_list)))
-    def test_average(self):
-        input_list = [("a", 1.0), ("b", 2.0), ("c", 3.0), ("d", 4.0)]
-        expected = 10.0/len(input_list)
+    def test_series_are_sorted_by_timestamp(self):
+        expected = [(1362933983, 27.3), (1362934043, 27.7)]
+        self.assertEqual(expected, self.__instance.humidity_series())
+        expected = [(1362933983, None), (1362934043, 2.5)]
+        self.assertEqual(expected, self.__instance.rain_series())
+        expected = [(1362933983, -6.9), (1362934043, -6.3)]
         self.assertEqual(expected,
-                         self.__instance._average(input_list))
\ No newline at end of file
+                         self.__instance.temperature_series(unit='celsius'))
+
+    def test_statistics(self):
+        result = self.__instance.statistics('humidity', percentiles=[0, 50, 100])
+        self.assertEqual(2, result['count'])
+        self.assertEqual((1362933983, 27.3), result['min'])
+        self.assertEqual((1362934043, 27.7), result['max'])
+        self.assertAlmostEqual(27.5, result['average'])
+        self.assertAlmostEqual(0.2, result['stddev'])
+        self.assertAlmostEqual(27.3, result['percentiles'][0])
+        self.assertAlmostEqual(27.5, result['percentiles'][50])
+        self.assertAlmostEqual(27.7, result['percentiles'][100])
+        self.assertNotIn('percentiles', self.__instance.statistics('wind'))
+
+    def test_statistics_skips_none_samples(self):
+        result = self.__instance.statistics('rain', percentiles=[25])
+        self.assertEqual(1, result['count'])
+        self.assertEqual((1362934043, 2.5), result['min'])
+        self.assertEqual((1362934043, 2.5), result['max'])
+        self.assertEqual(2.5, result['average'])
+        self.assertEqual(0., result['stddev'])
+        self.assertEqual(2.5, result['percentiles'][25])
+
+    def test_statistics_with_different_temperature_units(self):
+        result = self.__instance.statistics('temperature', unit='celsius')
+        self.assertEqual((1362933983, -6.9), result['min'])
+        self.assertEqual((1362934043, -6.3), result['max'])
+        self.assertEqual(-6.6, result['average'])
+        result = self.__instance.statistics('temperature', unit='fahrenheit')
+        self.assertEqual((1362934043, 20.66), result['max'])
+        self.assertAlmostEqual(0.3 * 1.8, result['stddev'])
+
+    def test_statistics_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, Historian.statistics,
+                          self.__instance, 'xyz')
+        self.assertRaises(ValueError, Historian.statistics,
+                          self.__instance, 'temperature', 'xyz')
+        self.assertRaises(ValueError, Historian.statistics,
+                          self.__instance, 'humidity', 'kelvin', [101])
+
+    def test_statistics_on_empty_measurements(self):
+        self.assertRaises(ValueError, Historian.statistics,
+                          self.__empty_instance, 'humidity')
+
+    def test_series_and_statistics_follow_station_history_changes(self):
+        measurements = dict(self.__test_measurements)
+        instance = Historian(StationHistory(self.__test_station_ID, 'tick',
+                                            self.__test_reception_time,
+                                            measurements))
+        self.assertAlmostEqual(4.7, instance.statistics('wind')['average'])
+        self.assertEqual(1010.09, instance.statistics('pressure')['max'][1])
+        measurements[1362934103] = {"temperature": 267.15, "humidity": 28.1,
+                                    "pressure": 1010.5, "rain": None,
+                                    "wind": 5.6}
+        self.assertEqual(3, len(instance.wind_series()))
+        self.assertAlmostEqual(5.0, instance.statistics('wind')['average'])
+        self.assertEqual((1362934103, 1010.5),
+                         instance.statistics('pressure')['max'])
+        self.assertEqual(5.6, instance.statistics(
+            'wind', percentiles=[100])['percentiles'][100])
@@ -13,6 +13,8 @@ Monkey patching pattern:
 """
 
 import unittest
+import warnings
+import json
 import time
 from tests.unit.weatherapi25.json_test_responses import (OBSERVATION_JSON,
                                                          SEARCH_RESULTS_JSON, THREE_HOURS_FORECAST_JSON, DAILY_FORECAST_JSON,
@@ -138,6 +140,14 @@ class TestOWM25(unittest.TestCase):
     def mock_api_call_returning_weather_at_places_in_bbox(self, uri, params=None, headers=None):
         return 200, WEATHER_AT_PLACES_IN_BBOX_JSON
 
+    def mock_get_json_stream_returning_weather_at_places_in_bbox(self, uri, params=None, headers=None):
+        for i in range(0, len(WEATHER_AT_PLACES_IN_BBOX_JSON), 64):
+            yield WEATHER_AT_PLACES_IN_BBOX_JSON[i:i+64]
+
+    def mock_get_json_stream_returning_multiple_obs(self, uri, params=None, headers=None):
+        for i in range(0, len(SEARCH_RESULTS_JSON), 64):
+            yield SEARCH_RESULTS_JSON[i:i+64]
+
     def mock_api_call_returning_station_at_coords(self, uri, params=None, headers=None):
         return 200, STATION_AT_COORDS_JSON
 
@@ -767,6 +777,65 @@ class TestOWM25(unittest.TestCase):
             self.assertTrue(isinstance(result.get_location(), Location))
             self.assertTrue(result.get_reception_time() is not None)
 
+    def test_iter_weather_at_places_in_bbox(self):
+        original_func = HttpClient.get_json_stream
+        HttpClient.get_json_stream = \
+            self.mock_get_json_stream_returning_weather_at_places_in_bbox
+        results = self.__test_instance\
+                .iter_weather_at_places_in_bbox(12, 32, 15, 37, 10)
+        self.assertFalse(isinstance(results, list))
+        results = list(results)
+        HttpClient.get_json_stream = original_func
+        self.assertEqual(len(json.loads(WEATHER_AT_PLACES_IN_BBOX_JSON)['list']),
+                         len(results))
+        for result in results:
+            self.assertTrue(isinstance(result, Observation))
+            self.assertTrue(isinstance(result.get_weather(), Weather))
+            self.assertTrue(isinstance(result.get_location(), Location))
+
+    def test_iter_weather_at_places_in_bbox_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, OWM25.iter_weather_at_places_in_bbox,
+                          self.__test_instance, 12, 32, 15, 37, -30)
+        self.assertRaises(ValueError, OWM25.iter_weather_at_places_in_bbox,
+                          self.__test_instance, 200, 32, 15, 37)
+
+    def test_iter_weather_at_stations_in_bbox(self):
+        original_func = HttpClient.get_json_stream
+        HttpClient.get_json_stream = \
+            self.mock_get_json_stream_returning_weather_at_places_in_bbox
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            results = list(self.__test_instance
+                           .iter_weather_at_stations_in_bbox(49.07, 8.87,
+                                                             61.26, 65.21))
+        HttpClient.get_json_stream = original_func
+        # the streaming variant is not deprecated
+        self.assertFalse([w for w in caught
+                          if issubclass(w.category, DeprecationWarning)])
+        self.assertTrue(len(results) > 0)
+        for result in results:
+            self.assertTrue(isinstance(result, Observation))
+
+    def test_iter_weather_at_stations_in_bbox_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, OWM25.iter_weather_at_stations_in_bbox,
+                          self.__test_instance, 49.07, 8.87, 61.26, 65.21,
+                          False, -3)
+
+    def test_iter_weather_around_coords(self):
+        original_func = HttpClient.get_json_stream
+        HttpClient.get_json_stream = \
+            self.mock_get_json_stream_returning_multiple_obs
+        results = list(self.__test_instance.iter_weather_around_coords(57.0, -2.15))
+        HttpClient.get_json_stream = original_func
+        self.assertEqual(2, len(results))
+        for result in results:
+            self.assertTrue(isinstance(result, Observation))
+
+    def test_iter_weather_around_coords_fails_with_wrong_params(self):
+        self.assertRaises(ValueError, OWM25.iter_weather_around_coords,
+                          self.__test_instance, 43.7, 200.0)
+        self.assertRaises(ValueError, OWM25.iter_weather_around_coords,
+                          self.__test_instance, 43.7, 20.0, -3)
 
     def test_station_tick_history(self):
         original_func = HttpClient.cacheable_get_json
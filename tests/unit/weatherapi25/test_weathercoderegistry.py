@@ -25,4 +25,42 @@ class TestWeatherCodeRegistry(unittest.TestCase):
     def test_status_for(self):
         self.assertTrue(self._test_instance.status_for(999) is None)
         self.assertEqual("abc", self._test_instance.status_for(150))
-        self.assertEqual("xyz", self._test_instance.status_for(345))
\ No newline at end of file
+        self.assertEqual("xyz", self._test_instance.status_for(345))
+
+    def test_status_for_with_out_of_range_codes(self):
+        self.assertIsNone(self._test_instance.status_for(-1))
+        self.assertIsNone(self._test_instance.status_for(0))
+        self.assertIsNone(self._test_instance.status_for(110))
+        self.assertIsNone(self._test_instance.status_for(None))
+        self.assertIsNone(self._test_instance.status_for('abc'))
+        self.assertIsNone(self._test_instance.status_for(float('nan')))
+
+    def test_status_for_with_float_codes(self):
+        self.assertEqual("abc", self._test_instance.status_for(150.0))
+        self.assertEqual("xyz", self._test_instance.status_for(345.0))
+        self.assertEqual(self._test_instance.bitmask_for_code(345),
+                         self._test_instance.bitmask_for_code(345.0))
+
+    def test_status_for_with_overlapping_ranges(self):
+        instance = WeatherCodeRegistry({
+            "first": [{"start": 10, "end": 20}],
+            "second": [{"start": 15, "end": 25}]
+        })
+        self.assertEqual("first", instance.status_for(15))
+        self.assertEqual("first", instance.status_for(20))
+        self.assertEqual("second", instance.status_for(21))
+
+    def test_bitmask_for(self):
+        abc = self._test_instance.bitmask_for("abc")
+        xyz = self._test_instance.bitmask_for("xyz")
+        self.assertNotEqual(0, abc)
+        self.assertNotEqual(0, xyz)
+        self.assertEqual(0, abc & xyz)
+        self.assertEqual(0, self._test_instance.bitmask_for("unknown"))
+
+    def test_bitmask_for_code(self):
+        self.assertEqual(self._test_instance.bitmask_for("abc"),
+                         self._test_instance.bitmask_for_code(150))
+        self.assertEqual(self._test_instance.bitmask_for("xyz"),
+                         self._test_instance.bitmask_for_code(345))
+        self.assertEqual(0, self._test_instance.bitmask_for_code(999))